@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Batch Categorization
+Vectorized (re)categorization of mail exports and the surveillance log
+
+Usage:
+    python bots/batch_categorize.py                  # recategorize the surveillance log
+    python bots/batch_categorize.py export.csv out.csv --subject Subject --sender From
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import re
+import sys
+import argparse
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from bots.domain_index import DomainSuffixIndex, sender_domain
+
+
+# From values whose address is unambiguous without a full RFC 5322 parse:
+# a bare address, or a plain display name followed by <address>
+SIMPLE_SENDER = re.compile(
+    r'^\s*(?:[^<>@,;:"()\\\[\]]*<)?[^\s<>@,;:"()\\\[\]]+@([A-Za-z0-9.-]+)>?\s*$')
+
+
+def sender_domains(senders: pd.Series) -> pd.Series:
+    """Vectorized `sender_domain` over a column of From values
+
+    Simple forms are handled with one regex over the column; only the
+    remaining distinct values go through email.utils.parseaddr.
+    """
+    senders = senders.fillna('').astype(str)
+    extracted = senders.str.extract(SIMPLE_SENDER, expand=False)
+    simple = extracted.notna() & (senders.str.count('<') == senders.str.count('>'))
+    domains = extracted.where(simple, '').str.lower().str.strip('.')
+    other = senders[~simple]
+    if len(other):
+        codes, uniques = pd.factorize(other)
+        parsed = np.array([sender_domain(sender) for sender in uniques], dtype=object)
+        domains[~simple] = parsed[codes]
+    return domains
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Optional[str]:
+    """Regex matching any of `keywords` as a literal substring (None if empty)"""
+    keywords = sorted({keyword.lower() for keyword in keywords if keyword}, key=len, reverse=True)
+    return '|'.join(re.escape(keyword) for keyword in keywords) or None
+
+
+def categorize_columns(subjects, senders, keywords: Dict[str, List[str]],
+                       media_domains: DomainSuffixIndex, precedence: List[str],
+                       media_category: str, default: str, snippets=None) -> pd.Series:
+    """Categorize whole columns at once, with the same rules as one email
+
+    A category applies if one of its `keywords` occurs in the subject
+    (or, when `snippets` are given, in the snippet), or for
+    `media_category` if the sender's address domain is in
+    `media_domains`. The first applicable category in `precedence` wins.
+
+    Mail repeats itself, so each distinct text and sender domain is
+    evaluated once (pandas.factorize) and the results are broadcast back
+    to every row; keyword groups are matched with one vectorized regex
+    each.
+    Returns a Series aligned with `subjects`.
+    """
+    subjects = pd.Series(subjects, dtype=object)
+    index = subjects.index
+    text = subjects.fillna('').astype(str).str.lower()
+    if snippets is not None:
+        snippets = pd.Series(snippets, dtype=object, index=index).fillna('').astype(str).str.lower()
+        # A newline keeps keywords from matching across the two fields
+        text = text + '\n' + snippets
+
+    text_codes, unique_texts = pd.factorize(text)
+    unique_texts = pd.Series(unique_texts, dtype=object)
+    matches = {}
+    for category, words in keywords.items():
+        pattern = keyword_pattern(words)
+        if pattern is None:
+            matches[category] = np.zeros(len(index), dtype=bool)
+            continue
+        found = unique_texts.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        matches[category] = found[text_codes]
+
+    domains = sender_domains(pd.Series(senders, dtype=object, index=index))
+    domain_codes, unique_domains = pd.factorize(domains)
+    is_media = np.fromiter((domain in media_domains for domain in unique_domains),
+                           dtype=bool, count=len(unique_domains))
+    matches[media_category] = is_media[domain_codes]
+
+    conditions = [matches[category] for category in precedence if category in matches]
+    choices = [category for category in precedence if category in matches]
+    return pd.Series(np.select(conditions, choices, default=default), index=index, dtype=object)
+
+
+def surveillance_frame(entries: Iterable[Dict]) -> pd.DataFrame:
+    """Flatten surveillance log email entries into incident_id/category/from/subject columns"""
+    rows = [{
+        'incident_id': entry.get('incident_id'),
+        'category': entry.get('category'),
+        'from': (entry.get('details') or {}).get('from'),
+        'subject': (entry.get('details') or {}).get('subject')
+    } for entry in entries if entry.get('source') == 'email']
+    return pd.DataFrame(rows, columns=['incident_id', 'category', 'from', 'subject'])
+
+
+def main():
+    """Command-line entry point"""
+    from bots.email_bot import EmailBot, get_surveillance_store
+
+    parser = argparse.ArgumentParser(description="Recategorize mail in bulk")
+    parser.add_argument('input', nargs='?', help="CSV export (default: the surveillance log)")
+    parser.add_argument('output', nargs='?', help="CSV to write with a 'new_category' column")
+    parser.add_argument('--subject', default='subject', help="subject column name")
+    parser.add_argument('--sender', default='from', help="sender column name")
+    parser.add_argument('--snippet', default=None, help="snippet column name (optional)")
+    args = parser.parse_args()
+
+    bot = EmailBot(os.getenv('GMAIL_CREDENTIALS_PATH', 'credentials.json'))
+    if args.input:
+        frame = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    else:
+        frame = surveillance_frame(get_surveillance_store().iter_entries())
+    frame['new_category'] = bot.categorize_many(
+        frame[args.subject], frame[args.sender],
+        frame[args.snippet] if args.snippet else None
+    )
+
+    print(frame['new_category'].value_counts().to_string())
+    if 'category' in frame:
+        changed = frame[frame['category'] != frame['new_category']]
+        print(f"{len(changed)} of {len(frame)} rows would change category")
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
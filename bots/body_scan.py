@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Body Scan
+Incremental decoding of the text parts of a Gmail message payload
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import base64
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List
+
+DEFAULT_MAX_BYTES = 16384
+# Base64 characters decoded per step; a multiple of 4 so steps align
+DECODE_STEP = 4096
+
+
+class _HtmlText(HTMLParser):
+    """Incremental HTML to text, skipping script and style contents"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip = 0
+        self._texts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._texts.append(data)
+
+    def pop_text(self) -> str:
+        """Text parsed since the last call"""
+        text, self._texts = ' '.join(self._texts), []
+        return text
+
+
+def text_parts(payload: Dict) -> List[Dict]:
+    """Inline text/plain parts in document order, else the text/html ones
+
+    Parts with a filename are attachments and are left out, as are parts
+    whose content is only available by attachmentId.
+    """
+    plain, html = [], []
+    parts = [payload]
+    while parts:
+        part = parts.pop(0)
+        parts[:0] = part.get('parts', [])
+        if part.get('filename') or not part.get('body', {}).get('data'):
+            continue
+        mime_type = part.get('mimeType', 'text/plain')
+        if mime_type.startswith('text/plain'):
+            plain.append(part)
+        elif mime_type.startswith('text/html'):
+            html.append(part)
+    return plain or html
+
+
+def iter_text(payload: Dict, max_bytes: int = DEFAULT_MAX_BYTES) -> Iterator[str]:
+    """Yield the message text piece by piece, decoding at most `max_bytes`
+
+    Each part's base64 data is decoded DECODE_STEP characters at a time
+    through an incremental UTF-8 decoder, so neither a long part nor a
+    multi-byte character split between steps is decoded all at once or
+    garbled. Stops as soon as the byte budget is spent; callers can also
+    simply stop iterating.
+    """
+    remaining = max_bytes
+    for part in text_parts(payload):
+        if remaining <= 0:
+            return
+        data = part['body']['data']
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        html = _HtmlText() if part.get('mimeType', '').startswith('text/html') else None
+        for start in range(0, len(data), DECODE_STEP):
+            piece = data[start:start + DECODE_STEP]
+            raw = base64.urlsafe_b64decode(piece + '=' * (-len(piece) % 4))[:remaining]
+            remaining -= len(raw)
+            final = remaining <= 0 or start + DECODE_STEP >= len(data)
+            text = decoder.decode(raw, final=final)
+            if html is not None:
+                html.feed(text)
+                if final:
+                    html.close()
+                text = html.pop_text()
+            if text:
+                yield text
+            if remaining <= 0:
+                return
+        yield '\n'
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Categorization Cache
+Bounded LRU/TTL memo of categories for near-identical messages
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+REPLY_WORDS = ('re', 'fwd', 'fw', 'aw', 'sv', 'antw')
+# "Re: ", "Fwd: ", "RE[2]: ", "AW: " ... repeated at the start of a subject
+REPLY_PREFIX = re.compile(r'^\s*(?:(?:%s)(?:\[\d+\])?\s*:\s*)+' % '|'.join(REPLY_WORDS),
+                          re.IGNORECASE)
+DIGITS = re.compile(r'\d+')
+
+
+def normalize_subject(subject: str, keep_digits: bool = False, keep_prefixes: bool = False) -> str:
+    """Fingerprint of a subject: lowercased, reply prefixes and digit runs removed
+
+    'Re: Invoice #4411 due 03/02' and 'Invoice #4412 due 04/02' share a
+    fingerprint. Inner whitespace is kept as is, since keyword matching
+    is sensitive to it. Pass `keep_digits` when some keyword contains a
+    digit or '#', so that digits can still change the category, and
+    `keep_prefixes` when some keyword `overlaps_reply_prefix`.
+    """
+    subject = (subject or '').lower()
+    if not keep_prefixes:
+        subject = REPLY_PREFIX.sub('', subject).strip()
+    return subject if keep_digits else DIGITS.sub('#', subject)
+
+
+def overlaps_reply_prefix(keyword: str) -> bool:
+    """Whether `keyword` could match text that `normalize_subject` strips
+
+    A match reaching into a reply prefix or the outer whitespace
+    contains a ':' or bracket, starts or ends with whitespace, or lies
+    inside a single reply word or counter such as 'fwd' or '2'.
+    """
+    keyword = keyword.lower()
+    return bool(keyword) and (keyword != keyword.strip() or any(char in keyword for char in ':[]')
+                              or keyword.isdigit() or any(keyword in word for word in REPLY_WORDS))
+
+
+class CategorizationCache:
+    """Thread-safe LRU cache with per-entry expiry, tied to a rule set version
+
+    Entries are looked up with the version of the rules in force; the
+    first lookup or store with a different version clears the cache, so
+    a rule change can never serve a category computed under old rules.
+    `max_entries` of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Create a cache of at most `max_entries`, each valid for `ttl` seconds"""
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: str) -> Optional[str]:
+        """Cached category for `key` under rules `version`, or None"""
+        if not self.max_entries:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            category, expires = entry
+            if self._clock() >= expires:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return category
+
+    def put(self, key: Hashable, category: str, version: str):
+        """Remember `category` for `key` under rules `version`"""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (category, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit rate and housekeeping counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
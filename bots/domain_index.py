@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Domain Index
+Suffix lookup of sender domains against a list of known domains
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import csv
+from email.utils import parseaddr
+from typing import Iterable, Iterator, Optional
+
+
+def normalize_domain(domain: str) -> str:
+    """Lowercase `domain` and drop wildcard, leading '@' and trailing dots"""
+    domain = domain.strip().lower()
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    return domain.lstrip('@.').rstrip('.')
+
+
+def sender_domain(sender: str) -> str:
+    """Domain of the address in a From header ('' if there is none)
+
+    Handles display names and angle brackets, e.g.
+    '"News Desk" <desk@news.cnn.com>' gives 'news.cnn.com'.
+    """
+    address = parseaddr(sender or '')[1]
+    if '@' not in address:
+        return ''
+    return normalize_domain(address.rsplit('@', 1)[1])
+
+
+class DomainSuffixIndex:
+    """Set of domains matched on whole-label suffixes
+
+    `cnn.com` matches `cnn.com` and `edition.cnn.com` but not `notcnn.com`
+    or `cnn.com.evil`. A lookup hashes each suffix of the sender domain,
+    so it costs O(number of labels) however long the list is.
+    """
+
+    def __init__(self, domains: Iterable[str] = ()):
+        """Index `domains` (normalized, blanks ignored)"""
+        self._domains = set()
+        for domain in domains:
+            domain = normalize_domain(domain)
+            if domain:
+                self._domains.add(domain)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DomainSuffixIndex':
+        """Load the first column of a CSV or plain list, one domain per row
+
+        Blank rows, '#' comments and a 'domain' header row are skipped.
+        A missing file gives an empty index.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', newline='') as f:
+            return cls(row[0] for row in csv.reader(f)
+                       if row and not row[0].lstrip().startswith('#')
+                       and row[0].strip().lower() != 'domain')
+
+    def match(self, domain: str) -> Optional[str]:
+        """The listed domain that `domain` is, or is a subdomain of"""
+        domain = normalize_domain(domain)
+        while domain:
+            if domain in self._domains:
+                return domain
+            dot = domain.find('.')
+            if dot < 0:
+                return None
+            domain = domain[dot + 1:]
+        return None
+
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._domains)
@@ -9,10 +9,15 @@ Operator: ENS Legis (Digital Clone)
 """
 
 import os
+import sys
 import json
+import base64
 import hashlib
+import threading
+from itertools import chain, islice
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -20,12 +25,44 @@ from googleapiclient.errors import HttpError
 # Get the absolute path to the repository root
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Allow running as a script (python bots/email_bot.py)
+sys.path.insert(0, REPO_ROOT)
+from bots.surveillance_store import (BACKEND_JSONL, FSYNC_FLUSH, BufferedSurveillanceWriter,
+                                     SurveillanceStore, create_surveillance_store)
+from bots.surveillance_stats import SurveillanceStatistics
+from bots.incident_ids import IncidentIdAllocator
+from bots.processed_index import ProcessedMessageIndex
+from bots.keyword_matcher import KeywordMatcher
+from bots.domain_index import DomainSuffixIndex, sender_domain
+from bots.category_cache import CategorizationCache, normalize_subject
+from bots.rule_set import RuleSet, RuleSetLoader
+from bots.batch_categorize import categorize_columns
+from bots.body_scan import DEFAULT_MAX_BYTES, iter_text
+from bots.pipeline import Stage, StagedExecutor
+from bots.gmail_quota import QUOTA_UNITS, QuotaRateLimiter, is_retryable
+from bots.gmail_sync import (SYNC_MODE_HISTORY, SYNC_MODE_UNREAD, HistoryExpired, SyncCheckpoint,
+                             current_history_id, list_added_message_ids)
+
 # Configuration - use absolute paths
 CONFIG_PATH = os.path.join(REPO_ROOT, "config", "email_config.json")
 TEMPLATES_PATH = os.path.join(REPO_ROOT, "templates", "email")
-SURVEILLANCE_LOG_PATH = os.path.join(REPO_ROOT, "data", "surveillance_log.json")
+SURVEILLANCE_LOG_PATH = os.path.join(REPO_ROOT, "data", "surveillance_log.jsonl")
+LEGACY_SURVEILLANCE_LOG_PATH = os.path.join(REPO_ROOT, "data", "surveillance_log.json")
+SURVEILLANCE_STATS_PATH = os.path.join(REPO_ROOT, "data", "surveillance_stats.json")
+INCIDENT_COUNTER_PATH = os.path.join(REPO_ROOT, "data", "incident_counter.json")
+GMAIL_SYNC_STATE_PATH = os.path.join(REPO_ROOT, "data", "gmail_sync_state.json")
+PROCESSED_INDEX_PATH = os.path.join(REPO_ROOT, "data", "processed_messages.db")
 MEDIA_LIST_PATH = os.path.join(REPO_ROOT, "config", "media_list.csv")
 
+# Surveillance storage backend: "jsonl" (default), "sqlite" or "segmented"
+SURVEILLANCE_BACKEND = os.getenv('SURVEILLANCE_BACKEND', BACKEND_JSONL)
+SURVEILLANCE_DB_URL = os.getenv(
+    'SURVEILLANCE_DB_URL',
+    "sqlite:///" + os.path.join(REPO_ROOT, "data", "surveillance_log.db")
+)
+# Gzip daily segments once sealed (segmented backend only)
+SURVEILLANCE_COMPRESS_SEALED = os.getenv('SURVEILLANCE_COMPRESS_SEALED', 'false').lower() == 'true'
+
 # Email categories
 CATEGORY_LEGAL = "Legal"
 CATEGORY_MEDIA = "Media"
@@ -34,18 +71,136 @@ CATEGORY_VENDOR = "Vendor"
 CATEGORY_SPAM = "Spam"
 CATEGORY_UNKNOWN = "Unknown"
 
+# Subject keywords per category, matched as case-insensitive substrings
+CATEGORY_KEYWORDS = {
+    CATEGORY_LEGAL: ['fcra', 'credit report', 'dispute', 'violation',
+                     'litigation', 'complaint', 'legal', 'attorney'],
+    CATEGORY_SUPPORTER: ['patreon', 'subscribe', 'support', 'donation', 'contribute'],
+    CATEGORY_VENDOR: ['invoice', 'payment', 'printful', 'stripe', 'billing']
+}
+# First applicable category wins
+CATEGORY_PRECEDENCE = [CATEGORY_LEGAL, CATEGORY_MEDIA, CATEGORY_SUPPORTER, CATEGORY_VENDOR]
+# Auto-response template per category
+CATEGORY_TEMPLATES = {
+    CATEGORY_LEGAL: "FCRA-Initial-Guidance",
+    CATEGORY_MEDIA: "Media-Inquiry-Response",
+    CATEGORY_SUPPORTER: "Thank-You-Patron"
+}
+# Used for any of these keys missing from the "rules" object in email_config.json
+DEFAULT_RULES = {
+    'keywords': CATEGORY_KEYWORDS,
+    'precedence': CATEGORY_PRECEDENCE,
+    'templates': CATEGORY_TEMPLATES
+}
+
+# Gmail accepts up to 100 calls per batch request but recommends at most 50
+GMAIL_MAX_BATCH_SIZE = 100
+DEFAULT_FETCH_BATCH_SIZE = 50
+# Fetch profiles: headers only by default, whole message when a category needs the body
+FETCH_FORMAT_METADATA = "metadata"
+FETCH_FORMAT_FULL = "full"
+METADATA_HEADERS = ['Subject', 'From']
+
+# messages.list returns at most 500 IDs per page
+GMAIL_MAX_PAGE_SIZE = 500
+DEFAULT_LIST_PAGE_SIZE = 100
+# messages.batchModify accepts at most 1000 IDs per call
+GMAIL_MAX_MODIFY_IDS = 1000
+
+_surveillance_store = None
+_surveillance_statistics = None
+_incident_id_allocator = None
+_processed_message_index = None
+_surveillance_store_lock = threading.Lock()
+
+
+def get_surveillance_store() -> SurveillanceStore:
+    """Return the process-wide surveillance store shared by bot and dashboard"""
+    global _surveillance_store
+    with _surveillance_store_lock:
+        if _surveillance_store is None:
+            _surveillance_store = create_surveillance_store(
+                SURVEILLANCE_BACKEND,
+                SURVEILLANCE_LOG_PATH,
+                legacy_path=LEGACY_SURVEILLANCE_LOG_PATH,
+                db_url=SURVEILLANCE_DB_URL,
+                compress_sealed=SURVEILLANCE_COMPRESS_SEALED
+            )
+        return _surveillance_store
+
+
+def get_surveillance_statistics() -> SurveillanceStatistics:
+    """Return the process-wide statistics aggregator for the shared store"""
+    global _surveillance_statistics
+    store = get_surveillance_store()
+    with _surveillance_store_lock:
+        if _surveillance_statistics is None:
+            _surveillance_statistics = SurveillanceStatistics(store, SURVEILLANCE_STATS_PATH)
+        return _surveillance_statistics
+
+
+def get_incident_id_allocator() -> IncidentIdAllocator:
+    """Return the process-wide incident ID allocator"""
+    global _incident_id_allocator
+    with _surveillance_store_lock:
+        if _incident_id_allocator is None:
+            _incident_id_allocator = IncidentIdAllocator(INCIDENT_COUNTER_PATH)
+        return _incident_id_allocator
+
+
+def get_processed_message_index() -> ProcessedMessageIndex:
+    """Return the process-wide index of already processed Gmail messages"""
+    global _processed_message_index
+    with _surveillance_store_lock:
+        if _processed_message_index is None:
+            _processed_message_index = ProcessedMessageIndex(PROCESSED_INDEX_PATH)
+        return _processed_message_index
+
 
 class EmailBot:
     """ENS Legis Email Automation Bot"""
     
-    def __init__(self, credentials_path: str):
-        """Initialize email bot with Gmail API credentials"""
-        self.creds = self._load_credentials(credentials_path)
-        self.service = None
-        if self.creds:
-            self.service = build('gmail', 'v1', credentials=self.creds)
-        self.config = self._load_config()
-        self.media_domains = self._load_media_list()
+    def __init__(self, credentials_path: str, store: Optional[SurveillanceStore] = None,
+                 incident_ids: Optional[IncidentIdAllocator] = None,
+                 sync_checkpoint: Optional[SyncCheckpoint] = None,
+                 quota: Optional[QuotaRateLimiter] = None, service=None,
+                 processed_index: Optional[ProcessedMessageIndex] = None):
+        """Initialize email bot with Gmail API credentials
+        
+        Passing `service` (any object with the Gmail API client
+        interface) skips credential loading, e.g. to run against a local
+        stand-in.
+        """
+        if store is None:
+            store = get_surveillance_store()
+            # Keep the shared statistics counters in step with this bot's writes
+            get_surveillance_statistics()
+        self.store = store
+        self.incident_ids = incident_ids or get_incident_id_allocator()
+        self.sync_checkpoint = sync_checkpoint or SyncCheckpoint(GMAIL_SYNC_STATE_PATH)
+        self.processed_index = processed_index or get_processed_message_index()
+        self._local = threading.local()
+        self.creds = None
+        self.service = service
+        if service is None:
+            self.creds = self._load_credentials(credentials_path)
+            if self.creds:
+                self.service = build('gmail', 'v1', credentials=self.creds)
+        # Config and compiled rules, swapped in again whenever the files change
+        self.rules_loader = RuleSetLoader(CONFIG_PATH, MEDIA_LIST_PATH, DEFAULT_RULES,
+                                          CATEGORY_MEDIA, CATEGORY_UNKNOWN)
+        self.config = self.rules_loader.config
+        # Repeat senders with near-identical subjects skip rule evaluation
+        cache_config = self.config.get('category_cache', {})
+        self.category_cache = CategorizationCache(
+            max_entries=int(cache_config.get('max_entries', 10000)),
+            ttl=float(cache_config.get('ttl_seconds', 3600))
+        )
+        # Gmail quota is per user, so one limiter covers every thread of this bot
+        self.quota = quota or QuotaRateLimiter(
+            units_per_second=float(self.config.get('quota_units_per_second', 250.0)),
+            max_retries=int(self.config.get('max_retries', 5))
+        )
         
     def _load_credentials(self, path: str) -> Optional[Credentials]:
         """Load Gmail API credentials"""
@@ -63,54 +218,99 @@ class EmailBot:
         print(f"Note: Credential loading not yet implemented for {path}")
         return None
     
-    def _load_config(self) -> Dict:
-        """Load email bot configuration"""
-        if os.path.exists(CONFIG_PATH):
-            with open(CONFIG_PATH, 'r') as f:
-                return json.load(f)
-        return {}
+    @property
+    def rules(self) -> RuleSet:
+        """The compiled categorization rules currently in force"""
+        return self.rules_loader.rules
+    
+    @property
+    def media_domains(self) -> DomainSuffixIndex:
+        """Known media outlet domains, from config/media_list.csv"""
+        return self.rules.media_domains
+    
+    @property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """Keyword automaton of the current rules"""
+        return self.rules.matcher
+    
+    def refresh_rules(self) -> bool:
+        """Pick up changes to email_config.json or the media list
+        
+        Cheap enough to call per chunk: two stat calls unless a file
+        changed. Returns True if new config and rules were swapped in.
+        """
+        if not self.rules_loader.refresh():
+            return False
+        self.config = self.rules_loader.config
+        print(f"Reloaded email config and rules (version {self.rules.version})")
+        return True
     
-    def _load_media_list(self) -> List[str]:
-        """Load list of known media outlet domains"""
-        if os.path.exists(MEDIA_LIST_PATH):
-            with open(MEDIA_LIST_PATH, 'r') as f:
-                return [line.strip() for line in f if line.strip()]
-        return []
+    def reload_media_list(self) -> int:
+        """Re-read config and media list now, returning how many media domains there are
+        
+        The new rules are compiled before they replace the old ones, so
+        categorization running meanwhile always sees a complete list.
+        """
+        self.rules_loader.refresh(force=True)
+        self.config = self.rules_loader.config
+        return len(self.media_domains)
     
     def categorize_email(self, email: Dict) -> str:
         """Categorize email based on subject, sender, and content
         
-        Rules per ENS Legis Master Prompt:
+        Rules per ENS Legis Master Prompt (defaults, overridable under
+        "rules" in email_config.json):
         - FCRA/credit report keywords → Legal
         - Media outlet domains → Media  
         - Patreon/support keywords → Supporter
         - Everything else → analyze further or mark Unknown
-        """
-        subject = email.get('subject', '').lower()
-        sender = email.get('from', '').lower()
         
-        # Legal category triggers
-        legal_keywords = ['fcra', 'credit report', 'dispute', 'violation', 
-                         'litigation', 'complaint', 'legal', 'attorney']
-        if any(keyword in subject for keyword in legal_keywords):
-            return CATEGORY_LEGAL
-        
-        # Media category - check sender domain
-        sender_domain = sender.split('@')[-1] if '@' in sender else ''
-        if any(media_domain in sender_domain for media_domain in self.media_domains):
-            return CATEGORY_MEDIA
-        
-        # Supporter category triggers
-        supporter_keywords = ['patreon', 'subscribe', 'support', 'donation', 'contribute']
-        if any(keyword in subject for keyword in supporter_keywords):
-            return CATEGORY_SUPPORTER
+        One pass over the subject finds every keyword category; the
+        first applicable category in the precedence list wins. Results
+        are cached by sender domain and subject fingerprint, for as long
+        as the rules stay the same.
+        """
+        rules = self.rules
+        subject = email.get('subject', '')
+        domain = sender_domain(email.get('from', ''))
+        key = (domain, normalize_subject(subject, keep_digits=rules.digit_sensitive,
+                                         keep_prefixes=rules.prefix_sensitive))
+        category = self.category_cache.get(key, rules.version)
+        if category is None:
+            category = rules.categorize(subject, email.get('from', ''), domain=domain)
+            self.category_cache.put(key, category, rules.version)
+        return category
+    
+    def categorize_body(self, payload: Dict) -> Optional[str]:
+        """Keyword category found in the text of a full-format payload
         
-        # Vendor category
-        vendor_keywords = ['invoice', 'payment', 'printful', 'stripe', 'billing']
-        if any(keyword in subject for keyword in vendor_keywords):
-            return CATEGORY_VENDOR
+        The text parts are decoded and scanned incrementally, stopping
+        after config `body_analysis.max_bytes` decoded bytes or as soon
+        as a keyword of the top-precedence category is found.
+        Attachments are never decoded. Returns the highest-precedence
+        keyword category seen, or None.
+        """
+        max_bytes = int((self.config.get('body_analysis') or {}).get('max_bytes', DEFAULT_MAX_BYTES))
+        rules = self.rules
+        scan = rules.matcher.scan(stop_at=rules.decisive)
+        for text in iter_text(payload, max_bytes):
+            if scan.feed(text):
+                break
+        return rules.first_keyword_category(scan.found)
+    
+    def categorize_many(self, subjects, senders, snippets=None):
+        """Categorize columns of subjects and senders (e.g. a DataFrame's)
         
-        return CATEGORY_UNKNOWN
+        Gives the same categories as `categorize_email` row by row, but
+        vectorized over the whole column, for backfills of mail exports
+        or the surveillance log. `snippets`, if given, are searched for
+        keywords as well as the subjects. Returns a pandas Series aligned
+        with `subjects`.
+        """
+        rules = self.rules
+        return categorize_columns(subjects, senders, rules.keywords, rules.media_domains,
+                                  rules.precedence, rules.media_category, rules.default_category,
+                                  snippets=snippets)
     
     def get_template(self, template_name: str) -> Optional[str]:
         """Load email response template"""
@@ -123,18 +323,12 @@ class EmailBot:
     def send_auto_response(self, email: Dict, category: str) -> bool:
         """Send automated response based on category
         
-        Per ENS Legis Master Prompt:
+        Per ENS Legis Master Prompt (rules.templates in email_config.json):
         - Legal → FCRA-Initial-Guidance template
         - Media → Media-Inquiry-Response template
         - Supporter → Thank-You-Patron template
         """
-        template_map = {
-            CATEGORY_LEGAL: "FCRA-Initial-Guidance",
-            CATEGORY_MEDIA: "Media-Inquiry-Response",
-            CATEGORY_SUPPORTER: "Thank-You-Patron"
-        }
-        
-        template_name = template_map.get(category)
+        template_name = self.rules.templates.get(category)
         if not template_name:
             return False
         
@@ -155,8 +349,8 @@ class EmailBot:
         
         return True
     
-    def log_to_surveillance(self, email: Dict, category: str, action_taken: str):
-        """Log email to surveillance database
+    def log_to_surveillance(self, email: Dict, category: str, action_taken: str) -> Dict:
+        """Log email to surveillance database, returning the log entry
         
         All inbound inquiries must be logged per ENS Legis protocol
         """
@@ -177,14 +371,11 @@ class EmailBot:
         
         # Append to surveillance log
         self._append_to_log(log_entry)
+        return log_entry
     
     def _generate_incident_id(self) -> str:
         """Generate unique incident ID in format SL-YYYY-MMDD-NNN"""
-        now = datetime.utcnow()
-        date_str = now.strftime("%Y-%m%d")
-        # In production, this would query existing logs to get next sequence number
-        seq = "001"
-        return f"SL-{date_str}-{seq}"
+        return self.incident_ids.next_id()
     
     def _hash_email(self, email: Dict) -> str:
         """Generate SHA-256 hash of email for chain of custody"""
@@ -192,20 +383,36 @@ class EmailBot:
         return hashlib.sha256(email_str.encode()).hexdigest()[:12]
     
     def _append_to_log(self, entry: Dict):
-        """Append entry to surveillance log file"""
-        # Ensure the directory exists
-        log_dir = os.path.dirname(SURVEILLANCE_LOG_PATH)
-        os.makedirs(log_dir, exist_ok=True)
-        
-        log_data = []
-        if os.path.exists(SURVEILLANCE_LOG_PATH):
-            with open(SURVEILLANCE_LOG_PATH, 'r') as f:
-                log_data = json.load(f)
-        
-        log_data.append(entry)
+        """Append entry to surveillance log (one O(1) append, no rewrite)"""
+        writer = getattr(self._local, 'log_writer', None)
+        if writer is not None:
+            writer.write(entry)
+        else:
+            self.store.append(entry)
+    
+    @contextmanager
+    def buffered_logging(self):
+        """Group surveillance log writes made by this thread into batches
         
-        with open(SURVEILLANCE_LOG_PATH, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        Thresholds come from config: `log_flush_entries`,
+        `log_flush_interval` (seconds) and `log_fsync`
+        ("never", "flush" or "close").
+        """
+        if getattr(self._local, 'log_writer', None) is not None:
+            yield self._local.log_writer
+            return
+        writer = BufferedSurveillanceWriter(
+            self.store,
+            max_entries=self.config.get('log_flush_entries', 100),
+            max_delay=self.config.get('log_flush_interval', 5.0),
+            fsync=self.config.get('log_fsync', FSYNC_FLUSH)
+        )
+        self._local.log_writer = writer
+        try:
+            with writer:
+                yield writer
+        finally:
+            self._local.log_writer = None
     
     def log_action(self, action: Dict):
         """Log bot action for audit trail"""
@@ -213,73 +420,475 @@ class EmailBot:
         action['operator'] = 'ENS_Legis_Email_Bot'
         print(json.dumps(action, indent=2))
     
-    def process_inbox(self, max_results: int = 10):
-        """Process unread emails in inbox
+    def process_inbox(self, max_results: Optional[int] = None) -> int:
+        """Process unread emails in inbox, returning how many were found
         
-        Main workflow:
-        1. Fetch unread emails
-        2. Categorize each email
-        3. Send auto-response if applicable
+        Main workflow, as a chain of generators so only one listing page
+        and one fetch chunk are held in memory at a time:
+        1. List unread emails, following nextPageToken to the end
+           (or until `max_results` IDs have been listed)
+        2. Fetch them in batches of `fetch_batch_size`
+        3. Categorize each email and send auto-response if applicable
         4. Log to surveillance database
-        5. Mark as processed
+        5. Mark each fetched chunk as processed (failed messages stay unread)
+        
+        With config `sync_mode` set to "history", step 1 instead asks
+        users.history.list for messages added since the stored historyId,
+        so messages already read in the Gmail UI are not missed.
         """
         if not self.service:
             print("Error: Gmail API service not initialized. Cannot process inbox.")
             print("Please set up credentials following the instructions in README.md")
-            return
+            return 0
         
+        self.refresh_rules()
+        handled = 0
+        writer = None
         try:
-            # Query for unread emails
-            results = self.service.users().messages().list(
+            # Surveillance entries for this run are written in groups
+            with self.buffered_logging() as writer:
+                if self.config.get('sync_mode', SYNC_MODE_UNREAD) == SYNC_MODE_HISTORY:
+                    return self._sync_history(max_results)
+                
+                handled = self._drain_unread(max_results)
+                if not handled:
+                    print('No unread emails found.')
+                
+        except HttpError as error:
+            print(f'An error occurred: {error}')
+        finally:
+            # Record what was handled only if every log entry was written;
+            # otherwise forget it, so those messages are handled again
+            if writer is not None and not writer.pending:
+                self.processed_index.flush()
+            else:
+                self.processed_index.discard()
+        return handled
+    
+    def _drain_unread(self, max_results: Optional[int], attempted: Optional[set] = None,
+                      failed: Optional[List[str]] = None) -> int:
+        """Process every unread message, returning how many were attempted
+        
+        Marking messages read while paging through `is:unread` can shift
+        later pages, so once a multi-page pass completes the listing is
+        repeated for anything it skipped. IDs already attempted in this
+        run (including failures, and any passed in `attempted`) are not
+        tried again until the next run. Failed IDs are added to `failed`
+        when given.
+        """
+        attempted = set() if attempted is None else attempted
+        while True:
+            before = len(attempted)
+            pages = []
+            message_ids = (message_id
+                           for message_id in self._iter_unread_ids(max_results, pages)
+                           if message_id not in attempted)
+            pass_failed = self._process_messages(self._track(message_ids, attempted))
+            if failed is not None:
+                failed.extend(pass_failed)
+            if len(attempted) == before or len(pages) <= 1 or max_results is not None:
+                return len(attempted)
+    
+    @staticmethod
+    def _track(message_ids: Iterable[str], seen: set) -> Iterator[str]:
+        """Pass IDs through, recording each in `seen`"""
+        for message_id in message_ids:
+            seen.add(message_id)
+            yield message_id
+    
+    def _iter_unread_ids(self, max_results: Optional[int] = None,
+                         pages: Optional[List[str]] = None) -> Iterator[str]:
+        """Yield unread message IDs page by page, following nextPageToken
+        
+        Pages are requested lazily as the consumer advances. The page
+        tokens seen are appended to `pages` when given.
+        """
+        page_size = int(self.config.get('list_page_size', DEFAULT_LIST_PAGE_SIZE))
+        page_size = max(1, min(page_size, GMAIL_MAX_PAGE_SIZE))
+        remaining = max_results
+        page_token = None
+        while remaining is None or remaining > 0:
+            results = self.quota.execute(self.service.users().messages().list(
                 userId='me',
                 q='is:unread',
-                maxResults=max_results
-            ).execute()
-            
-            messages = results.get('messages', [])
-            
-            if not messages:
-                print('No unread emails found.')
+                maxResults=page_size if remaining is None else min(page_size, remaining),
+                pageToken=page_token
+            ), 'messages.list')
+            if pages is not None:
+                pages.append(page_token)
+            for msg in results.get('messages', []):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield msg['id']
+            page_token = results.get('nextPageToken')
+            if not page_token:
                 return
-            
-            for msg in messages:
-                # Get full message details
-                message = self.service.users().messages().get(
-                    userId='me',
-                    id=msg['id']
-                ).execute()
-                
-                email_data = self._parse_email(message)
-                category = self.categorize_email(email_data)
-                
-                # Process based on category
-                if category in [CATEGORY_LEGAL, CATEGORY_MEDIA, CATEGORY_SUPPORTER]:
-                    self.send_auto_response(email_data, category)
-                    action_taken = f"auto_response_sent: {category}"
+    
+    def _sync_history(self, max_results: Optional[int]) -> int:
+        """Process messages added since the checkpoint, then advance it
+        
+        Without a usable checkpoint (first run, or Gmail answered 404 for
+        an expired historyId) this falls back to a full sync of unread
+        messages, starting the new checkpoint from the mailbox's current
+        historyId. Messages that fail are carried in the checkpoint and
+        retried on the next sync. Returns how many messages were attempted.
+        """
+        state = self.sync_checkpoint.load()
+        message_ids = None
+        history_id = None
+        if state['history_id']:
+            try:
+                message_ids, history_id = list_added_message_ids(self.service, state['history_id'],
+                                                                 limiter=self.quota)
+            except HistoryExpired:
+                print(f"History {state['history_id']} has expired, doing a full sync")
+        attempted = set()
+        if message_ids is None:
+            # Read the historyId first so nothing arriving during the sync is skipped
+            history_id = current_history_id(self.service, self.quota)
+            failed = self._process_messages(self._track(state['retry'], attempted))
+            # Messages skipped by shifting pages are behind the new checkpoint,
+            # so history.list would never return them: re-list until drained
+            self._drain_unread(max_results, attempted, failed)
+        else:
+            retry = set(state['retry'])
+            message_ids = (message_id for message_id in message_ids if message_id not in retry)
+            failed = self._process_messages(self._track(chain(state['retry'], message_ids), attempted))
+        self.sync_checkpoint.save(history_id, failed)
+        return len(attempted)
+    
+    def _process_messages(self, message_ids: Iterable[str]) -> List[str]:
+        """Fetch, handle and acknowledge messages chunk by chunk
+        
+        `message_ids` may be a lazy stream; it is consumed one fetch
+        chunk at a time. Returns the IDs that could not be fetched or
+        handled, leaving out messages that no longer exist. With config
+        `concurrency` set, chunks go through worker pools instead.
+        """
+        chunks = self._iter_chunks(message_ids)
+        if self.config.get('concurrency'):
+            return self._process_concurrently(chunks)
+        failed = []
+        for chunk in chunks:
+            categorized, chunk_failed, already_processed = self._fetch_chunk(chunk)
+            failed.extend(chunk_failed)
+            processed = already_processed
+            for message_id, email_data, category in categorized:
+                if self._try_handle(message_id, email_data, category):
+                    processed.append(message_id)
                 else:
-                    action_taken = f"categorized_only: {category}"
-                
-                # Log to surveillance database
-                self.log_to_surveillance(email_data, category, action_taken)
-                
-                # Mark as read/processed
-                self.service.users().messages().modify(
+                    failed.append(message_id)
+            
+            # Mark the chunk read/processed in one call
+            self._acknowledge(processed)
+        return failed
+    
+    def _iter_chunks(self, message_ids: Iterable[str]) -> Iterator[List[str]]:
+        """Group a stream of IDs into lists of `fetch_batch_size`"""
+        message_ids = iter(message_ids)
+        batch_size = self._fetch_batch_size()
+        while True:
+            chunk = list(islice(message_ids, batch_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _fetch_chunk(self, chunk: List[str]
+                     ) -> Tuple[List[Tuple[str, Dict, str]], List[str], List[str]]:
+        """Fetch and categorize one chunk
+        
+        Messages already in the processed index (handled by an earlier
+        run that died before marking them read, or by an overlapping
+        run) are not fetched again, only acknowledged.
+        Returns ([(message_id, email_data, category)], failed_ids,
+        already_processed_ids).
+        """
+        self.refresh_rules()
+        self.processed_index.refresh()
+        already_processed = [message_id for message_id in chunk
+                             if message_id in self.processed_index]
+        if already_processed:
+            print(f"Skipping {len(already_processed)} already processed messages")
+            done = set(already_processed)
+            chunk = [message_id for message_id in chunk if message_id not in done]
+        failed = []
+        categorized = []
+        # Categorize from metadata alone, then fetch bodies where needed
+        for message_id, message, error in self._fetch_messages(chunk):
+            if error is not None:
+                # Left unread, so the next run picks it up again
+                print(f"Failed to fetch message {message_id}: {error}")
+                if not (isinstance(error, HttpError) and error.resp.status == 404):
+                    failed.append(message_id)
+                continue
+            email_data = self._parse_email(message)
+            categorized.append((message_id, message, email_data, self.categorize_email(email_data)))
+        
+        categorized, body_failed = self._attach_bodies(categorized)
+        failed.extend(body_failed)
+        skip = set(failed)
+        return ([(message_id, email_data, category)
+                 for message_id, _, email_data, category in categorized
+                 if message_id not in skip], failed, already_processed)
+    
+    def _try_handle(self, message_id: str, email_data: Dict, category: str) -> bool:
+        """Handle one message, reporting (not raising) failures
+        
+        A message another run handled since it was fetched counts as
+        handled without being answered or logged again.
+        """
+        if message_id in self.processed_index:
+            return True
+        try:
+            self._handle_message(email_data, category)
+        except Exception as error:
+            print(f"Failed to process message {message_id}: {error}")
+            return False
+        return True
+    
+    def _process_concurrently(self, chunks: Iterable[List[str]]) -> List[str]:
+        """Run fetch, handle and acknowledge as a StagedExecutor
+        
+        Config `concurrency` sets workers per stage, e.g.
+        {"fetch": 4, "handle": 4, "acknowledge": 2}; each chunk's
+        results go to a single acknowledge worker.
+        Messages of one Gmail thread are handled by the same worker in
+        listing order, and each message is logged at most once, by the
+        handle stage, before its chunk is acknowledged.
+        Messages of a stage item that raised are returned as failed.
+        """
+        concurrency = self.config.get('concurrency', {})
+        writer = getattr(self._local, 'log_writer', None)
+        failed = []
+        
+        def worker_init(stage_name):
+            # Pool threads share the run's log writer but get their own Gmail client
+            self._local.log_writer = writer
+            if self.creds:
+                self._local.service = build('gmail', 'v1', credentials=self.creds)
+        
+        def fetch(numbered_chunk):
+            index, chunk = numbered_chunk
+            categorized, chunk_failed, already_processed = self._fetch_chunk(chunk)
+            state = {'chunk': index, 'processed': already_processed, 'failed': chunk_failed}
+            for message_id, email_data, category in categorized:
+                yield ('message', state, message_id, email_data, category)
+            yield ('chunk_end', state)
+        
+        def handle(item):
+            if item[0] == 'message':
+                _, state, message_id, email_data, category = item
+                ok = self._try_handle(message_id, email_data, category)
+                item = ('handled', state, message_id, ok)
+            yield item
+        
+        def acknowledge(item):
+            state = item[1]
+            if item[0] == 'handled':
+                state['processed' if item[3] else 'failed'].append(item[2])
+            else:
+                # Every message of the chunk has been handled by now (stages keep order)
+                self._acknowledge(state['processed'])
+                failed.extend(state['failed'])
+            return ()
+        
+        def thread_key(item):
+            return item[3].get('threadId') or item[2] if item[0] == 'message' else None
+        
+        executor = StagedExecutor([
+            Stage('fetch', fetch, workers=int(concurrency.get('fetch', 1))),
+            Stage('handle', handle, workers=int(concurrency.get('handle', 1)), key=thread_key),
+            # batchModify is a round trip per chunk, so chunks are acknowledged in parallel
+            Stage('acknowledge', acknowledge, workers=int(concurrency.get('acknowledge', 1)),
+                  key=lambda item: item[1]['chunk'])
+        ], queue_size=int(self.config.get('pipeline_queue_size', 16)), worker_init=worker_init)
+        executor.run(enumerate(chunks))
+        # A stage that raised dropped its item: keep those messages for a retry
+        for stage_name, item, error in executor.errors:
+            if stage_name == 'fetch':
+                failed.extend(item[1])
+            elif item[0] == 'chunk_end':
+                failed.extend(item[1]['processed'] + item[1]['failed'])
+            else:
+                failed.append(item[2])
+        return failed
+    
+    def _gmail(self):
+        """Gmail service for the current thread"""
+        return getattr(self._local, 'service', None) or self.service
+    
+    def _handle_message(self, email_data: Dict, category: str):
+        """Answer and log one categorized message"""
+        # Process based on category
+        if category in self.rules.templates:
+            self.send_auto_response(email_data, category)
+            action_taken = f"auto_response_sent: {category}"
+        else:
+            action_taken = f"categorized_only: {category}"
+        
+        # Log to surveillance database
+        entry = self.log_to_surveillance(email_data, category, action_taken)
+        self.processed_index.add(email_data.get('id'), entry['evidence_hash'],
+                                 entry['incident_id'], category)
+        
+        print(f"Processed: {email_data.get('subject')} - Category: {category}")
+    
+    def _attach_bodies(self, categorized: List[Tuple[str, Dict, Dict, str]]
+                       ) -> Tuple[List[Tuple[str, Dict, Dict, str]], List[str]]:
+        """Refine categories from the body and attach it where needed
+        
+        With config `body_analysis` set, messages in its `categories`
+        (default ["Unknown"]) are recategorized by `categorize_body`.
+        Messages then in `full_body_categories` get their decoded text
+        as 'body'. Metadata fetches carry no body, so these messages are
+        fetched again in the full format (as one more batch).
+        Returns (categorized, IDs whose full fetch failed).
+        """
+        needs_body = set(self.config.get('full_body_categories', []))
+        analysis = self.config.get('body_analysis')
+        analyze = set(analysis.get('categories', [CATEGORY_UNKNOWN])) if analysis else set()
+        wanted = [message_id for message_id, _, _, category in categorized
+                  if category in needs_body or category in analyze]
+        failed = []
+        if self._fetch_format() == FETCH_FORMAT_FULL:
+            payloads = {message_id: message.get('payload', {})
+                        for message_id, message, _, _ in categorized}
+        else:
+            payloads = {}
+            for message_id, message, error in self._fetch_messages(wanted, FETCH_FORMAT_FULL):
+                if error is not None:
+                    print(f"Failed to fetch body of message {message_id}: {error}")
+                    failed.append(message_id)
+                    continue
+                payloads[message_id] = message.get('payload', {})
+        
+        result = []
+        for message_id, message, email_data, category in categorized:
+            payload = payloads.get(message_id)
+            if payload is not None and category in analyze:
+                body_category = self.categorize_body(payload)
+                if body_category and body_category != category:
+                    print(f"Recategorized {message_id} from its body: {category} -> {body_category}")
+                    category = body_category
+            if payload is not None and category in needs_body:
+                email_data['body'] = self._extract_text(payload)
+            result.append((message_id, message, email_data, category))
+        return result, failed
+    
+    def _acknowledge(self, message_ids: List[str]) -> List[str]:
+        """Remove UNREAD from processed messages with batchModify
+        
+        Buffered surveillance entries are flushed first, so a message is
+        never marked read before its log entry is on disk. Returns the IDs
+        actually acknowledged; the rest stay unread and are retried.
+        """
+        if not message_ids:
+            return []
+        writer = getattr(self._local, 'log_writer', None)
+        logged = None
+        if writer is not None:
+            # Handle workers write a message's entry before staging its
+            # record, so every record staged before the writer is locked
+            # has its entry in this flush; records staged later wait
+            with writer.lock:
+                logged = self.processed_index.pending_ids()
+                writer.flush()
+        # Once logged, the messages are recorded as processed before being
+        # marked read, so a crash in between cannot get them answered twice
+        self.processed_index.flush(logged)
+        acknowledged = []
+        for start in range(0, len(message_ids), GMAIL_MAX_MODIFY_IDS):
+            ids = message_ids[start:start + GMAIL_MAX_MODIFY_IDS]
+            try:
+                self.quota.execute(self._gmail().users().messages().batchModify(
                     userId='me',
-                    id=msg['id'],
-                    body={'removeLabelIds': ['UNREAD']}
-                ).execute()
-                
-                print(f"Processed: {email_data.get('subject')} - Category: {category}")
-                
+                    body={'ids': ids, 'removeLabelIds': ['UNREAD']}
+                ), 'messages.batchModify')
+            except HttpError as error:
+                print(f"Failed to mark {len(ids)} messages as read: {error}")
+                continue
+            acknowledged.extend(ids)
+        return acknowledged
+    
+    def _fetch_batch_size(self) -> int:
+        """Configured `fetch_batch_size`, clamped to what Gmail accepts"""
+        batch_size = int(self.config.get('fetch_batch_size', DEFAULT_FETCH_BATCH_SIZE))
+        return max(1, min(batch_size, GMAIL_MAX_BATCH_SIZE))
+    
+    def _fetch_format(self) -> str:
+        """Configured `fetch_format`, "metadata" (default) or "full" messages"""
+        return self.config.get('fetch_format', FETCH_FORMAT_METADATA)
+    
+    def _fetch_messages(self, message_ids: List[str], format: Optional[str] = None
+                        ) -> Iterator[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """Fetch messages through Gmail batch requests
+        
+        `format` defaults to the configured fetch profile; the metadata
+        profile only asks for METADATA_HEADERS. Yields (message_id, message, error) in the order given, with
+        exactly one of message/error set. Up to `fetch_batch_size`
+        messages share one HTTP round trip; items that fail with a rate
+        limit or backend error are retried in a later batch after a
+        jittered backoff, up to `fetch_retries` times, before being
+        reported as failed.
+        """
+        format = format or self._fetch_format()
+        batch_size = self._fetch_batch_size()
+        retries = int(self.config.get('fetch_retries', 3))
+        
+        for start in range(0, len(message_ids), batch_size):
+            chunk = list(dict.fromkeys(message_ids[start:start + batch_size]))
+            results = {}
+            pending = chunk
+            for attempt in range(retries + 1):
+                results.update(self._execute_fetch_batch(pending, format))
+                pending = [message_id for message_id in pending
+                           if is_retryable(results[message_id][1])]
+                if not pending or attempt == retries:
+                    break
+                # Back off before resending the throttled or failed items
+                self.quota.pause(self.quota.backoff(attempt, results[pending[0]][1]))
+            for message_id in chunk:
+                message, error = results[message_id]
+                yield message_id, message, error
+    
+    def _execute_fetch_batch(self, message_ids: List[str], format: str) -> Dict[str, Tuple]:
+        """Run one batch request, returning {message_id: (message, error)}"""
+        results = {}
+        params = {'userId': 'me', 'format': format}
+        if format == FETCH_FORMAT_METADATA:
+            params['metadataHeaders'] = METADATA_HEADERS
+        
+        def on_response(request_id, response, exception):
+            results[request_id] = (None, exception) if exception is not None else (response, None)
+        
+        service = self._gmail()
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in message_ids:
+            batch.add(service.users().messages().get(id=message_id, **params),
+                      request_id=message_id)
+        # Each call inside a batch is charged separately
+        self.quota.acquire(QUOTA_UNITS['messages.get'] * len(message_ids))
+        try:
+            batch.execute()
         except HttpError as error:
-            print(f'An error occurred: {error}')
+            # The whole round trip failed: every item not yet answered shares the error
+            for message_id in message_ids:
+                results.setdefault(message_id, (None, error))
+        for message_id in message_ids:
+            results.setdefault(message_id, (None, RuntimeError('no response in batch')))
+        return results
     
     def _parse_email(self, message: Dict) -> Dict:
         """Parse Gmail message into simplified email dictionary"""
-        headers = message.get('payload', {}).get('headers', [])
+        # One pass over the headers; names are case-insensitive, first one wins
+        headers = {}
+        for header in message.get('payload', {}).get('headers', []):
+            headers.setdefault(header['name'].lower(), header['value'])
         
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-        from_addr = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
+        subject = headers.get('subject', 'No Subject')
+        from_addr = headers.get('from', 'Unknown')
         
         return {
             'id': message['id'],
@@ -288,6 +897,20 @@ class EmailBot:
             'threadId': message.get('threadId'),
             'snippet': message.get('snippet', '')
         }
+    
+    @staticmethod
+    def _extract_text(payload: Dict) -> str:
+        """Decode the text/plain parts of a full-format message payload"""
+        texts = []
+        parts = [payload]
+        while parts:
+            part = parts.pop(0)
+            parts[:0] = part.get('parts', [])
+            data = part.get('body', {}).get('data')
+            if data and part.get('mimeType', 'text/plain').startswith('text/plain'):
+                raw = base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+                texts.append(raw.decode('utf-8', errors='replace'))
+        return '\n'.join(texts)
 
 
 def main():
@@ -301,9 +924,9 @@ def main():
     
     # Process inbox
     print("Processing inbox...")
-    bot.process_inbox(max_results=50)
+    found = bot.process_inbox()
     
-    print("Email bot processing complete.")
+    print(f"Email bot processing complete ({found} messages).")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Gmail Quota
+Token-bucket limiter for Gmail quota units with jittered retry backoff
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+# Quota units charged per call (Gmail API usage limits)
+QUOTA_UNITS = {
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.modify': 5,
+    'messages.batchModify': 50,
+    'messages.send': 100,
+    'history.list': 2,
+    'getProfile': 1
+}
+DEFAULT_QUOTA_UNITS = 5
+# Per-user limit: 15,000 units per minute
+DEFAULT_UNITS_PER_SECOND = 250.0
+
+# Statuses worth retrying: rate limited or a transient backend error
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error: Optional[BaseException]) -> bool:
+    """Whether a Gmail error is worth another attempt"""
+    return isinstance(error, HttpError) and int(error.resp.status) in RETRYABLE_STATUSES
+
+
+class QuotaRateLimiter:
+    """Shared token bucket measured in Gmail quota units
+
+    Every call acquires its method's units before it is sent, so callers
+    on any thread (including whole batch requests) stay under
+    `units_per_second` while bursting up to `burst`. A 429 pauses all
+    callers for the backoff delay, since the quota is per user, not per
+    request; 5xx errors only delay the request that failed.
+    """
+
+    def __init__(self, units_per_second: float = DEFAULT_UNITS_PER_SECOND,
+                 burst: Optional[float] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 32.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """Create a limiter refilling `units_per_second` up to `burst`"""
+        self.units_per_second = units_per_second
+        self.burst = burst if burst is not None else units_per_second
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.retries = 0
+        self.last_error_status = None
+
+    def acquire(self, units: float):
+        """Block until `units` quota units may be spent"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            # Reserve now, possibly going negative; the debt is the wait
+            self._tokens -= units
+            wait = max(-self._tokens / self.units_per_second, self._paused_until - now, 0.0)
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+        if wait > 0:
+            self._sleep(wait)
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.units_per_second)
+        self._updated = now
+
+    def backoff(self, attempt: int, error: Optional[HttpError] = None) -> float:
+        """Delay before retry number `attempt` (0-based) after `error`
+
+        Exponential with jitter in [delay/2, delay], or the server's
+        Retry-After when it asks for longer. A 429 pauses every caller.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = self._rng.uniform(delay / 2, delay)
+        status = None
+        if error is not None:
+            status = int(error.resp.status)
+            try:
+                delay = max(delay, float(error.resp.get('retry-after', 0)))
+            except (TypeError, ValueError):
+                pass
+        with self._lock:
+            self.retries += 1
+            self.last_error_status = status
+            if status == 429:
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+        return delay
+
+    def execute(self, request, method: str):
+        """Execute a googleapiclient request charged as `method`, retrying on 429/5xx"""
+        attempt = 0
+        while True:
+            self.acquire(QUOTA_UNITS.get(method, DEFAULT_QUOTA_UNITS))
+            try:
+                return request.execute()
+            except HttpError as error:
+                if not is_retryable(error) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt, error)
+                attempt += 1
+                print(f"Gmail {method} returned {error.resp.status}, retrying in {delay:.1f}s")
+                self._sleep(delay)
+
+    def pause(self, delay: float):
+        """Sleep `delay` seconds (used between retry rounds of a batch)"""
+        self._sleep(delay)
+
+    def state(self) -> Dict:
+        """Current throttle state, for status reporting"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            paused_for = max(0.0, self._paused_until - now)
+            return {
+                'units_per_second': self.units_per_second,
+                'burst': self.burst,
+                'available_units': round(max(self._tokens, 0.0), 1),
+                'throttled': paused_for > 0 or self._tokens < 0,
+                'paused_for': round(paused_for, 3),
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 3),
+                'retries': self.retries,
+                'last_error_status': self.last_error_status
+            }
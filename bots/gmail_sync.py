@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Gmail Sync
+Incremental mailbox sync from a persisted Gmail historyId checkpoint
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from bots.gmail_quota import QuotaRateLimiter
+
+SYNC_MODE_UNREAD = "unread"
+SYNC_MODE_HISTORY = "history"
+
+
+class HistoryExpired(Exception):
+    """The stored historyId is too old for users.history.list (HTTP 404)"""
+
+
+class SyncCheckpoint:
+    """Last synced Gmail historyId plus messages still owed a retry
+
+    Saved atomically (temp file + rename) after every history sync, so a
+    crash leaves either the previous or the new checkpoint on disk.
+    """
+
+    def __init__(self, path: str):
+        """Create a checkpoint persisted at `path`"""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict:
+        """Return {'history_id': str or None, 'retry': [message IDs]}"""
+        state = {'history_id': None, 'retry': []}
+        if not os.path.exists(self.path):
+            return state
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            print(f"Warning: sync checkpoint {self.path} is unreadable, doing a full sync")
+            return state
+        if isinstance(saved, dict):
+            state['history_id'] = saved.get('history_id')
+            state['retry'] = list(saved.get('retry', []))
+        return state
+
+    def save(self, history_id: str, retry: Optional[List[str]] = None):
+        """Persist `history_id` and the IDs to retry on the next sync"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'history_id': str(history_id), 'retry': list(retry or [])}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget the checkpoint, forcing a full sync next time"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def _execute(request, method: str, limiter: Optional[QuotaRateLimiter]):
+    return limiter.execute(request, method) if limiter else request.execute()
+
+
+def current_history_id(service, limiter: Optional[QuotaRateLimiter] = None) -> str:
+    """Mailbox's current historyId, the starting point after a full sync"""
+    profile = _execute(service.users().getProfile(userId='me'), 'getProfile', limiter)
+    return str(profile['historyId'])
+
+
+def list_added_message_ids(service, start_history_id: str, label_id: str = 'INBOX',
+                           limiter: Optional[QuotaRateLimiter] = None) -> Tuple[List[str], str]:
+    """IDs of messages added to `label_id` since `start_history_id`
+
+    Follows nextPageToken to the end and returns (message_ids, history_id),
+    where history_id is the checkpoint to store for the next sync. Calls
+    go through `limiter` when given. Raises HistoryExpired when Gmail no
+    longer has history that far back.
+    """
+    message_ids: Dict[str, None] = {}
+    history_id = str(start_history_id)
+    page_token = None
+    while True:
+        try:
+            response = _execute(service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                labelId=label_id,
+                pageToken=page_token
+            ), 'history.list', limiter)
+        except HttpError as error:
+            if error.resp.status == 404:
+                raise HistoryExpired(str(start_history_id)) from error
+            raise
+        for record in response.get('history', []):
+            for added in record.get('messagesAdded', []):
+                message = added.get('message', {})
+                if label_id in message.get('labelIds', [label_id]):
+                    message_ids[message['id']] = None
+        history_id = str(response.get('historyId', history_id))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return list(message_ids), history_id
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Incident ID Allocator
+Collision-free SL-YYYY-MMDD-NNN incident IDs without scanning the log
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# The counter file keeps this many most recent days
+COUNTER_DAYS_KEPT = 7
+
+
+class IncidentIdAllocator:
+    """Per-day incident sequence numbers handed out in reserved blocks
+
+    The next free sequence number for each recent day is persisted in a
+    small counter file. Each process reserves `block_size` numbers at a
+    time under an exclusive file lock, then hands them out from memory, so
+    allocating an ID is O(1) and concurrent bots never share a number.
+    Numbers left in a block when a process exits are skipped, not reused.
+    """
+
+    def __init__(self, counter_path: str, block_size: int = 20):
+        """Create an allocator persisting its counter at `counter_path`"""
+        self.counter_path = counter_path
+        self.lock_path = counter_path + '.lock'
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._day = None
+        self._next = 0
+        self._limit = 0
+
+    def next_id(self, now: Optional[datetime] = None) -> str:
+        """Allocate the next incident ID for the (UTC) day of `now`"""
+        now = now or datetime.utcnow()
+        day = now.strftime("%Y-%m%d")
+        with self._lock:
+            if day != self._day or self._next >= self._limit:
+                self._next = self._reserve_block(day)
+                self._limit = self._next + self.block_size
+                self._day = day
+            seq = self._next
+            self._next += 1
+        return f"SL-{day}-{seq:03d}"
+
+    def _reserve_block(self, day: str) -> int:
+        """Reserve the next block for `day` and return its first number"""
+        os.makedirs(os.path.dirname(self.counter_path) or '.', exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                counters = self._read_counters()
+                start = counters.get(day, 1)
+                counters[day] = start + self.block_size
+                # Recent days stay, since a process can still be finishing
+                # yesterday's IDs after another has moved on to today
+                kept = sorted(counters)[-COUNTER_DAYS_KEPT:]
+                self._write_counters({key: counters[key] for key in kept})
+                return start
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_counters(self) -> dict:
+        if not os.path.exists(self.counter_path):
+            return {}
+        try:
+            with open(self.counter_path, 'r') as f:
+                counters = json.load(f)
+        except (OSError, ValueError):
+            print(f"Warning: incident counter {self.counter_path} is unreadable, restarting sequence")
+            return {}
+        return counters if isinstance(counters, dict) else {}
+
+    def _write_counters(self, counters: dict):
+        tmp_path = self.counter_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(counters, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.counter_path)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Keyword Matcher
+Aho-Corasick automaton reporting every keyword category in one pass
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher for labelled keyword groups
+
+    All keywords are compiled once into a single Aho-Corasick automaton,
+    so scanning a text costs O(len(text) + matches) however many keywords
+    there are, and overlapping keywords from different groups are all
+    found. States carry the set of labels of every keyword ending there,
+    not the keywords themselves.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """Compile `groups` ({label: [keyword, ...]}) into an automaton"""
+        self.labels = list(groups)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[set] = [set()]
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(label)
+
+        # Breadth-first failure links; each state inherits its fallback's labels
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+                queue.append(next_state)
+        self._output: List[FrozenSet[str]] = [frozenset(labels) for labels in outputs]
+
+    def categories(self, text: str, stop_at: Optional[str] = None) -> FrozenSet[str]:
+        """Labels of all groups with a keyword occurring in `text`
+
+        Scanning stops early once `stop_at` has been matched, for callers
+        that only need to know whether their top-precedence label applies.
+        """
+        scan = self.scan(stop_at)
+        scan.feed(text)
+        return scan.found
+
+    def scan(self, stop_at: Optional[str] = None) -> 'KeywordScan':
+        """Start an incremental scan over text that arrives in pieces"""
+        return KeywordScan(self, stop_at)
+
+    def first(self, text: str, precedence: Iterable[str]) -> Optional[str]:
+        """The highest-precedence label matching `text`, if any"""
+        precedence = list(precedence)
+        found = self.categories(text, stop_at=precedence[0] if precedence else None)
+        return next((label for label in precedence if label in found), None)
+
+
+class KeywordScan:
+    """Automaton state carried across `feed()` calls
+
+    Keywords split between two pieces of text are still found, so a
+    body can be scanned chunk by chunk without joining it first.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, stop_at: Optional[str] = None):
+        """Scan with `matcher`, finishing early once `stop_at` is found"""
+        self._matcher = matcher
+        self._state = 0
+        self._found = set()
+        self.stop_at = stop_at
+        self.done = False
+
+    @property
+    def found(self) -> FrozenSet[str]:
+        """Labels matched so far"""
+        return frozenset(self._found)
+
+    def feed(self, text: str) -> bool:
+        """Scan the next piece of text; returns True once `stop_at` was found"""
+        if self.done:
+            return True
+        goto, fail, output = self._matcher._goto, self._matcher._fail, self._matcher._output
+        found = self._found
+        state = self._state
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+                if self.stop_at in found:
+                    self.done = True
+                    break
+        self._state = state
+        return self.done
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Processing Pipeline
+Staged worker pools connected by bounded queues
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a StagedExecutor
+
+    `handler(item)` returns an iterable of items for the next stage (empty
+    to drop the item). With `key`, items sharing a key always go to the
+    same worker, so they are handled one at a time in arrival order.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Iterable], workers: int = 1,
+                 key: Optional[Callable[[Any], Hashable]] = None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.key = key
+
+
+class _StageRunner:
+    """Worker threads and input queues for one stage"""
+
+    def __init__(self, stage: Stage, queue_size: int, downstream, executor: 'StagedExecutor'):
+        self.stage = stage
+        self.downstream = downstream
+        self.executor = executor
+        count = stage.workers if stage.key else 1
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(count)]
+        self.threads: List[threading.Thread] = []
+        self._next_in = 0
+        self._next_out = 0
+        self._finished: Dict[int, List] = {}
+        self._order_lock = threading.Lock()
+        self._alive = stage.workers
+        self._alive_lock = threading.Lock()
+
+    def start(self):
+        for index in range(self.stage.workers):
+            inbox = self.queues[index % len(self.queues)]
+            thread = threading.Thread(target=self._work, args=(inbox,), daemon=True,
+                                      name=f"{self.stage.name}-{index}")
+            thread.start()
+            self.threads.append(thread)
+
+    def put(self, item):
+        """Queue an item (blocks while the worker's queue is full)
+
+        Called by a single producer at a time: the source, or the
+        previous stage while it releases results in order.
+        """
+        seq = self._next_in
+        self._next_in += 1
+        if self.stage.key:
+            inbox = self.queues[hash(self.stage.key(item)) % len(self.queues)]
+        else:
+            inbox = self.queues[0]
+        inbox.put((seq, item))
+
+    def close(self):
+        """Tell every worker no more items are coming"""
+        for index in range(self.stage.workers):
+            self.queues[index % len(self.queues)].put(_DONE)
+
+    def _work(self, inbox: queue.Queue):
+        if self.executor.worker_init:
+            self.executor.worker_init(self.stage.name)
+        while True:
+            entry = inbox.get()
+            if entry is _DONE:
+                break
+            seq, item = entry
+            try:
+                outputs = list(self.stage.handler(item))
+            except Exception as error:
+                outputs = []
+                self.executor._record_error(self.stage.name, item, error)
+            self._release(seq, outputs)
+        with self._alive_lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            self.downstream.close()
+
+    def _release(self, seq: int, outputs: List):
+        """Pass results downstream in input order, whichever worker finished first"""
+        with self._order_lock:
+            self._finished[seq] = outputs
+            while self._next_out in self._finished:
+                for output in self._finished.pop(self._next_out):
+                    self.downstream.put(output)
+                self._next_out += 1
+
+
+class _Sink:
+    """Collects the final stage's outputs"""
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+    def close(self):
+        pass
+
+
+class StagedExecutor:
+    """Run items through stages, each with its own pool of worker threads
+
+    Stages are linked by bounded queues, so a slow stage applies back
+    pressure all the way to the source instead of letting work pile up in
+    memory. Every stage hands its results on in the order the source
+    produced them; together with keyed stages this keeps related items
+    (e.g. messages of one thread) in order while unrelated ones overlap.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 16,
+                 worker_init: Optional[Callable[[str], None]] = None):
+        """`worker_init(stage_name)` runs at the start of each worker thread"""
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.worker_init = worker_init
+        self.errors: List[Tuple[str, Any, Exception]] = []
+        self._errors_lock = threading.Lock()
+
+    def _record_error(self, stage_name: str, item, error: Exception):
+        print(f"Pipeline stage {stage_name} failed: {error}")
+        with self._errors_lock:
+            self.errors.append((stage_name, item, error))
+
+    def run(self, source: Iterable) -> List:
+        """Feed `source` through all stages and return the final outputs
+
+        The source is consumed lazily on the calling thread. If it raises,
+        the items already queued are still drained before the error
+        propagates.
+        """
+        sink = _Sink()
+        runners = []
+        downstream = sink
+        for stage in reversed(self.stages):
+            downstream = _StageRunner(stage, self.queue_size, downstream, self)
+            runners.append(downstream)
+        runners.reverse()
+        for runner in runners:
+            runner.start()
+        first = runners[0]
+        try:
+            for item in source:
+                first.put(item)
+        finally:
+            first.close()
+            for runner in runners:
+                for thread in runner.threads:
+                    thread.join()
+        return sink.items
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Poll Scheduler
+Adaptive inbox polling interval with immediate wake-ups
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+WAKE_TIMER = "timer"
+WAKE_PUSH = "push"
+WAKE_PROCESS_NOW = "process-now"
+WAKE_STOP = "stop"
+
+
+class PollScheduler:
+    """Decides when the bot checks the inbox next
+
+    The interval drops to `min_interval` while runs keep finding mail and
+    grows by `backoff_factor` after each idle run, up to `max_interval`.
+    Failed runs back off the same way, starting from `error_interval`.
+    `wake()` ends the current wait at once, for push notifications,
+    manual triggers and stop requests.
+    """
+
+    def __init__(self, min_interval: float = 30.0, max_interval: float = 300.0,
+                 backoff_factor: float = 2.0, error_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Create a scheduler that starts at `min_interval`"""
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.error_interval = error_interval
+        self.interval = self.min_interval
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._reason: Optional[str] = None
+        self._next_run = clock()
+        self.last_reason: Optional[str] = None
+        self.consecutive_errors = 0
+
+    def record_run(self, found: int):
+        """Adjust the interval after a run that found `found` messages"""
+        with self._condition:
+            self.consecutive_errors = 0
+            if found > 0:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval,
+                                    max(self.interval, 1.0) * self.backoff_factor)
+            self._next_run = self._clock() + self.interval
+
+    def record_error(self):
+        """Back off after a failed run"""
+        with self._condition:
+            delay = self.error_interval * (self.backoff_factor ** self.consecutive_errors)
+            self.consecutive_errors += 1
+            self.interval = min(self.max_interval, max(self.min_interval, delay))
+            self._next_run = self._clock() + self.interval
+
+    def wait(self) -> str:
+        """Block until the next run is due or a wake-up arrives; returns why"""
+        with self._condition:
+            while self._reason is None:
+                remaining = self._next_run - self._clock()
+                if remaining <= 0:
+                    self.last_reason = WAKE_TIMER
+                    return WAKE_TIMER
+                self._condition.wait(remaining)
+            reason, self._reason = self._reason, None
+            self.last_reason = reason
+            return reason
+
+    def wake(self, reason: str = WAKE_PROCESS_NOW):
+        """End the current wait now; a pending stop is never overridden"""
+        with self._condition:
+            if self._reason != WAKE_STOP:
+                self._reason = reason
+            self._condition.notify_all()
+
+    def state(self) -> Dict:
+        """Current interval and time until the next scheduled run"""
+        with self._condition:
+            return {
+                'interval': self.interval,
+                'next_run_in': round(max(0.0, self._next_run - self._clock()), 3),
+                'last_reason': self.last_reason,
+                'consecutive_errors': self.consecutive_errors
+            }
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Processed Message Index
+Persistent record of handled Gmail messages, so reprocessing is idempotent
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import math
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings
+
+    Answers "definitely not added" or "maybe added" with a false positive
+    rate close to `error_rate` while at most `capacity` items are added.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        """Size the bit array and hash count for `capacity` items"""
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        """Add `item` to the filter"""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+class ProcessedMessageIndex:
+    """Gmail message IDs (with evidence hashes) that have been handled
+
+    The exact record lives in a SQLite table keyed by message ID. A Bloom
+    filter in front of it answers "never processed" for new mail without
+    touching the database, so checking a message costs O(1) either way.
+    Rows committed by other processes reach the filter on `refresh()`,
+    which reads only rows added since the last refresh.
+
+    `add()` stages a record, visible to this process at once; `flush()`
+    commits staged records in one transaction. The bot flushes right
+    after the surveillance log and before marking messages read, so the
+    index never claims a message whose log entry was lost.
+    """
+
+    def __init__(self, path: str, error_rate: float = 0.001):
+        """Create an index stored at `path` (opened on first use)"""
+        self.path = path
+        self.error_rate = error_rate
+        self._lock = threading.RLock()
+        self._conn = None
+        self._bloom = None
+        self._last_rowid = 0
+        self._pending: Dict[str, Tuple[Optional[str], Optional[str], Optional[str], str]] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets other bot processes check the index while one commits
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS processed_messages (
+                message_id TEXT PRIMARY KEY,
+                evidence_hash TEXT,
+                incident_id TEXT,
+                category TEXT,
+                processed_at TEXT NOT NULL)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_processed_messages_evidence_hash '
+                         'ON processed_messages (evidence_hash)')
+            conn.commit()
+            self._conn = conn
+            self._rebuild_bloom()
+        return self._conn
+
+    def _rebuild_bloom(self, min_capacity: int = 0):
+        count = self._conn.execute('SELECT COUNT(*) FROM processed_messages').fetchone()[0]
+        # Headroom so a growing mailbox does not force a rebuild every run
+        self._bloom = BloomFilter(max(100000, min_capacity, 2 * count), self.error_rate)
+        self._last_rowid = 0
+        self._load_new_rows()
+
+    def _load_new_rows(self):
+        rows = self._conn.execute(
+            'SELECT rowid, message_id FROM processed_messages WHERE rowid > ? ORDER BY rowid',
+            (self._last_rowid,))
+        for rowid, message_id in rows:
+            self._bloom.add(message_id)
+            self._last_rowid = rowid
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild_bloom(2 * self._bloom.count)
+
+    def refresh(self):
+        """Pick up messages committed by other processes since the last refresh"""
+        with self._lock:
+            if self._conn is None:
+                self._open()
+            else:
+                self._load_new_rows()
+
+    def __contains__(self, message_id: str) -> bool:
+        """Whether `message_id` has been processed (as of the last refresh)"""
+        with self._lock:
+            if message_id in self._pending:
+                return True
+            self._open()
+            if message_id not in self._bloom:
+                return False
+        # Possibly a false positive: confirm against the exact store
+        return self._lookup_committed(message_id) is not None
+
+    def lookup(self, message_id: str) -> Optional[Dict]:
+        """Return the record for `message_id`, or None if it was never processed"""
+        with self._lock:
+            if message_id in self._pending:
+                return self._record(message_id, *self._pending[message_id])
+        return self._lookup_committed(message_id)
+
+    def _lookup_committed(self, message_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._open().execute(
+                'SELECT message_id, evidence_hash, incident_id, category, processed_at '
+                'FROM processed_messages WHERE message_id = ?', (message_id,)).fetchone()
+        return self._record(*row) if row else None
+
+    def find_by_hash(self, evidence_hash: str) -> List[str]:
+        """Message IDs whose logged evidence hash is `evidence_hash`"""
+        with self._lock:
+            rows = self._open().execute(
+                'SELECT message_id FROM processed_messages WHERE evidence_hash = ?',
+                (evidence_hash,)).fetchall()
+            ids = [message_id for message_id, record in self._pending.items()
+                   if record[0] == evidence_hash]
+        return ids + [message_id for (message_id,) in rows if message_id not in ids]
+
+    def add(self, message_id: str, evidence_hash: Optional[str] = None,
+            incident_id: Optional[str] = None, category: Optional[str] = None):
+        """Stage `message_id` as processed until the next `flush()`"""
+        with self._lock:
+            self._pending[message_id] = (evidence_hash, incident_id, category,
+                                         datetime.utcnow().isoformat() + 'Z')
+
+    def pending_ids(self) -> List[str]:
+        """IDs staged but not yet committed"""
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self, message_ids: Optional[List[str]] = None):
+        """Commit staged records in a single transaction
+
+        With `message_ids`, only those staged records are committed and
+        the rest stay staged.
+        """
+        with self._lock:
+            if message_ids is None:
+                message_ids = list(self._pending)
+            records = [(message_id,) + self._pending[message_id]
+                       for message_id in message_ids if message_id in self._pending]
+            if not records:
+                return
+            conn = self._open()
+            with conn:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO processed_messages '
+                    '(message_id, evidence_hash, incident_id, category, processed_at) '
+                    'VALUES (?, ?, ?, ?, ?)', records)
+            for record in records:
+                del self._pending[record[0]]
+            self._load_new_rows()
+
+    def discard(self):
+        """Drop staged records without committing them"""
+        with self._lock:
+            self._pending.clear()
+
+    def close(self):
+        """Flush staged records and close the database"""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._bloom = None
+
+    @staticmethod
+    def _record(message_id, evidence_hash, incident_id, category, processed_at) -> Dict:
+        return {
+            'message_id': message_id,
+            'evidence_hash': evidence_hash,
+            'incident_id': incident_id,
+            'category': category,
+            'processed_at': processed_at
+        }
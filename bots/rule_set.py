@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Rule Set
+Compiled categorization rules, hot-reloaded from email_config.json
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from bots.keyword_matcher import KeywordMatcher
+from bots.domain_index import DomainSuffixIndex, sender_domain
+from bots.category_cache import overlaps_reply_prefix
+
+
+class RuleSet:
+    """Immutable, compiled categorization rules
+
+    Built once per configuration change and then shared: the keyword
+    automaton and the media domain index are never rebuilt per email.
+    `version` identifies the sources it was compiled from.
+    """
+
+    def __init__(self, rules: Dict, media_domains: DomainSuffixIndex, media_category: str,
+                 default_category: str, version: str = ''):
+        """Compile `rules` ({keywords, precedence, templates}); raises ValueError if malformed"""
+        keywords = rules.get('keywords', {})
+        precedence = rules.get('precedence', [])
+        templates = rules.get('templates', {})
+        if not isinstance(keywords, dict) or not all(
+                isinstance(words, list) and all(isinstance(word, str) for word in words)
+                for words in keywords.values()):
+            raise ValueError("rules.keywords must map categories to lists of keywords")
+        if not isinstance(precedence, list) or not all(isinstance(c, str) for c in precedence):
+            raise ValueError("rules.precedence must be a list of categories")
+        if not isinstance(templates, dict) or not all(isinstance(t, str) for t in templates.values()):
+            raise ValueError("rules.templates must map categories to template names")
+
+        self.keywords: Dict[str, List[str]] = {category: list(words) for category, words in keywords.items()}
+        # Keyword categories missing from the precedence list rank last, in config order
+        self.precedence: List[str] = list(precedence) + [c for c in keywords if c not in precedence]
+        self.templates: Dict[str, str] = dict(templates)
+        self.media_domains = media_domains
+        self.media_category = media_category
+        self.default_category = default_category
+        self.version = version
+        self.matcher = KeywordMatcher(self.keywords)
+        # Scanning can stop at the top keyword category if nothing outranks it
+        self.decisive = self.precedence[0] if self.precedence and self.precedence[0] in keywords else None
+        # Whether digits in a subject can affect its category
+        self.digit_sensitive = any(char.isdigit() or char == '#'
+                                   for words in self.keywords.values() for word in words for char in word)
+        # Whether reply prefixes or outer whitespace in a subject can affect its category
+        self.prefix_sensitive = any(overlaps_reply_prefix(word)
+                                    for words in self.keywords.values() for word in words)
+
+    def categorize(self, subject: str, sender: str, domain: Optional[str] = None) -> str:
+        """Category for a subject and From header, by precedence
+
+        `domain` is the sender's domain if the caller already parsed it.
+        """
+        matched = self.matcher.categories(subject or '', stop_at=self.decisive)
+        for category in self.precedence:
+            if category == self.media_category:
+                if domain is None:
+                    domain = sender_domain(sender or '')
+                if domain in self.media_domains:
+                    return category
+            elif category in matched:
+                return category
+        return self.default_category
+
+    def first_keyword_category(self, found) -> Optional[str]:
+        """Highest-precedence keyword category among `found`"""
+        return next((category for category in self.precedence
+                     if category in found and category != self.media_category), None)
+
+
+class RuleSetLoader:
+    """Reloads config and rules when email_config.json or the media list changes
+
+    `refresh()` costs two os.stat calls when nothing changed. On a change
+    the files are hashed, and only if their contents differ is a new
+    RuleSet compiled and swapped in, as a single reference assignment,
+    so readers see either the old rules or the new ones, never a mix.
+    A config that fails to parse or compile is reported and the previous
+    rules stay in force.
+    """
+
+    def __init__(self, config_path: str, media_list_path: str, default_rules: Dict,
+                 media_category: str, default_category: str):
+        """Watch `config_path` (its "rules" key overrides `default_rules`) and `media_list_path`"""
+        self.config_path = config_path
+        self.media_list_path = media_list_path
+        self.default_rules = default_rules
+        self.media_category = media_category
+        self.default_category = default_category
+        self._lock = threading.Lock()
+        self._signature = None
+        self._digest = None
+        self.config: Dict = {}
+        self.rules: Optional[RuleSet] = None
+        self.reloads = 0
+        self.refresh(force=True)
+
+    def _stat(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return b''
+
+    def refresh(self, force: bool = False) -> bool:
+        """Swap in new rules if the sources changed; returns True if swapped"""
+        signature = (self._stat(self.config_path), self._stat(self.media_list_path))
+        if not force and signature == self._signature:
+            return False
+        with self._lock:
+            if not force and signature == self._signature:
+                return False
+            config_bytes = self._read(self.config_path)
+            digest = hashlib.sha256(config_bytes + b'\0' +
+                                    self._read(self.media_list_path)).hexdigest()
+            self._signature = signature
+            if not force and digest == self._digest:
+                return False
+            try:
+                config = json.loads(config_bytes) if config_bytes.strip() else {}
+                if not isinstance(config, dict):
+                    raise ValueError("config must be a JSON object")
+                rules = compile_rules(config, self.default_rules,
+                                      DomainSuffixIndex.from_file(self.media_list_path),
+                                      self.media_category, self.default_category, digest[:12])
+            except ValueError as error:
+                print(f"Warning: ignoring invalid config {self.config_path}: {error}")
+                if self.rules is not None:
+                    return False
+                config = {}
+                rules = compile_rules({}, self.default_rules, DomainSuffixIndex(),
+                                      self.media_category, self.default_category, '')
+            self._digest = digest
+            self.config, self.rules = config, rules
+            self.reloads += 1
+            return True
+
+
+def compile_rules(config: Dict, default_rules: Dict, media_domains: DomainSuffixIndex,
+                  media_category: str, default_category: str, version: str = '') -> RuleSet:
+    """RuleSet from a config dict, each rules key falling back to `default_rules`"""
+    rules = config.get('rules') or {}
+    if not isinstance(rules, dict):
+        raise ValueError("rules must be a JSON object")
+    return RuleSet(dict(default_rules, **rules), media_domains, media_category,
+                   default_category, version)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Surveillance Statistics
+Incrementally maintained counters for the surveillance log
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from bots.surveillance_store import SurveillanceStore, entry_date
+
+SNAPSHOT_VERSION = 1
+
+
+class SurveillanceStatistics:
+    """Running totals by category and date, kept in step with the store
+
+    Counters advance as entries are appended (via a store listener), and
+    a small snapshot with the key of the last counted entry is saved to
+    disk, so a restart only replays the entries written after it.
+    """
+
+    def __init__(self, store: SurveillanceStore, snapshot_path: str,
+                 recent_count: int = 10, snapshot_every: int = 100,
+                 snapshot_interval: float = 30.0):
+        """Load the snapshot at `snapshot_path` and catch up with `store`"""
+        self.store = store
+        self.snapshot_path = snapshot_path
+        self.recent_count = recent_count
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_snapshot()
+        self.refresh()
+        store.add_listener(self.refresh)
+
+    def _reset(self):
+        self.last_key = -1
+        self.total = 0
+        self.by_category: Dict[str, int] = {}
+        self.by_date: Dict[str, int] = {}
+        self.recent = deque(maxlen=self.recent_count)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+
+    def refresh(self):
+        """Count entries written since the last counted key
+
+        Also picks up entries appended by other processes, so it is called
+        both from the store listener and before answering a query.
+        """
+        with self._lock:
+            for key, entry in self.store.iter_after(self.last_key):
+                self._record(key, entry)
+            if self._unsaved and (self._unsaved >= self.snapshot_every or
+                                  time.monotonic() - self._saved_at >= self.snapshot_interval):
+                self._save_snapshot()
+
+    def _record(self, key: int, entry: Dict):
+        self.last_key = key
+        self.total += 1
+        category = entry.get('category', 'Unknown')
+        self.by_category[category] = self.by_category.get(category, 0) + 1
+        date = entry_date(entry)
+        self.by_date[date] = self.by_date.get(date, 0) + 1
+        self.recent.append(entry)
+        self._unsaved += 1
+
+    def statistics(self) -> Dict:
+        """Return the current statistics without scanning the log"""
+        self.refresh()
+        with self._lock:
+            recent_activity = list(self.recent)
+            recent_activity.reverse()
+            return {
+                'total': self.total,
+                'by_category': dict(self.by_category),
+                'by_date': dict(self.by_date),
+                'recent_activity': recent_activity
+            }
+
+    def save(self):
+        """Persist the snapshot now"""
+        with self._lock:
+            self._save_snapshot()
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('store_id') != self.store.store_id:
+            return
+        # A snapshot ahead of the log means the log was replaced; rebuild instead
+        if snapshot.get('last_key', -1) > self.store.last_key():
+            return
+        self.last_key = snapshot['last_key']
+        self.total = snapshot['total']
+        self.by_category = snapshot['by_category']
+        self.by_date = snapshot['by_date']
+        self.recent.extend(snapshot['recent'])
+
+    def _save_snapshot(self):
+        """Atomically write the snapshot (caller holds the lock)"""
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'store_id': self.store.store_id,
+            'last_key': self.last_key,
+            'total': self.total,
+            'by_category': self.by_category,
+            'by_date': self.by_date,
+            'recent': list(self.recent)
+        }
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
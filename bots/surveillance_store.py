@@ -0,0 +1,1068 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Surveillance Store
+Append-only storage for surveillance log entries
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import gzip
+import base64
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import (Column, Index, Integer, MetaData, String, Table, Text,
+                        case, create_engine, event, func, select)
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+BACKEND_JSONL = "jsonl"
+BACKEND_SQLITE = "sqlite"
+BACKEND_SEGMENTED = "segmented"
+
+# fsync policies for BufferedSurveillanceWriter
+FSYNC_NEVER = "never"
+FSYNC_FLUSH = "flush"
+FSYNC_CLOSE = "close"
+
+
+class SurveillanceStore:
+    """Storage backend interface for surveillance log entries
+
+    Every entry is addressed by a monotonically increasing integer key
+    assigned by the backend (-1 means "before the first entry"). Backends
+    must implement `_write_entries`, `iter_after` and `last_key`; the query
+    helpers below fall back to a streaming scan and should be overridden
+    by backends that can answer them from an index.
+    """
+
+    store_id = "surveillance"
+
+    def __init__(self):
+        self._listeners: List[Callable[[], None]] = []
+
+    def append(self, entry: Dict):
+        """Append a single entry to the log"""
+        self.append_many([entry])
+
+    def append_many(self, entries: List[Dict], fsync: bool = False):
+        """Append entries to the log as one group and notify listeners
+
+        With `fsync`, the write is forced to stable storage before returning.
+        """
+        if not entries:
+            return
+        self._write_entries(entries, fsync=fsync)
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                # A failing listener must never lose a log write
+                print(f"Surveillance store listener error: {e}")
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call `callback` after every successful append"""
+        self._listeners.append(callback)
+
+    def _write_entries(self, entries: List[Dict], fsync: bool = False):
+        raise NotImplementedError
+
+    def iter_after(self, key: int = -1) -> Iterator[Tuple[int, Dict]]:
+        """Stream (key, entry) pairs written after `key`, oldest first"""
+        raise NotImplementedError
+
+    def last_key(self) -> int:
+        """Return the key of the newest entry, or -1 if the log is empty"""
+        raise NotImplementedError
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Stream entries from oldest to newest"""
+        for _, entry in self.iter_after(-1):
+            yield entry
+
+    def iter_filtered(self, category: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> Iterator[Dict]:
+        """Stream matching entries from oldest to newest without buffering them"""
+        for entry in self.iter_entries():
+            if entry_matches(entry, category, since, until):
+                yield entry
+
+    def page(self, category: Optional[str] = None, limit: int = 100,
+             before: Optional[int] = None, after: Optional[int] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        """Return up to `limit` (key, entry) pairs, newest first
+
+        With `after`, returns the oldest matching entries written after that
+        key (for polling); otherwise the newest entries before `before`.
+        `since`/`until` bound the entry timestamp (see `entry_matches`).
+        """
+        if after is not None:
+            logs = []
+            for key, entry in self.iter_after(after):
+                if not entry_matches(entry, category, since, until):
+                    continue
+                logs.append((key, entry))
+                if 0 < limit <= len(logs):
+                    break
+            logs.reverse()
+            return logs
+
+        recent = deque(maxlen=limit if limit > 0 else None)
+        for key, entry in self.iter_after(-1):
+            if before is not None and key >= before:
+                break
+            if not entry_matches(entry, category, since, until):
+                continue
+            recent.append((key, entry))
+        logs = list(recent)
+        logs.reverse()
+        return logs
+
+    def query(self, category: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Return the most recent `limit` entries, newest first"""
+        return [entry for _, entry in self.page(category=category, limit=limit)]
+
+    def statistics(self, recent_count: int = 10) -> Dict:
+        """Return totals by category and by date plus the latest entries"""
+        stats = {
+            'total': 0,
+            'by_category': {},
+            'by_date': {},
+            'recent_activity': []
+        }
+        recent = deque(maxlen=recent_count)
+        for entry in self.iter_entries():
+            stats['total'] += 1
+            category = entry.get('category', 'Unknown')
+            stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
+            date = entry_date(entry)
+            stats['by_date'][date] = stats['by_date'].get(date, 0) + 1
+            recent.append(entry)
+        stats['recent_activity'] = list(recent)
+        stats['recent_activity'].reverse()
+        return stats
+
+
+def encode_cursor(key: int) -> str:
+    """Encode an entry key as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(f"k{key}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor from `encode_cursor`, raising ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not raw.startswith('k'):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(raw[1:])
+
+
+def entry_date(entry: Dict) -> str:
+    """Extract the YYYY-MM-DD date of an entry's timestamp"""
+    timestamp = entry.get('timestamp') or ''
+    return timestamp.split('T')[0] if 'T' in timestamp else 'Unknown'
+
+
+def entry_matches(entry: Dict, category: Optional[str] = None,
+                  since: Optional[str] = None, until: Optional[str] = None) -> bool:
+    """Check an entry against a category and an ISO timestamp range
+
+    `since` is inclusive and `until` exclusive; both compare as strings, so
+    a bare date such as "2026-01-14" works as a day boundary.
+    """
+    if category and entry.get('category') != category:
+        return False
+    timestamp = entry.get('timestamp') or ''
+    if since and timestamp < since:
+        return False
+    if until and timestamp >= until:
+        return False
+    return True
+
+
+def encode_entry(entry: Dict) -> bytes:
+    """Serialize an entry as one compact JSONL line"""
+    return (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def decode_entry(line: bytes) -> Optional[Dict]:
+    """Parse a JSONL line, returning None for blank or torn lines"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def category_needle(category: Optional[str]) -> Optional[bytes]:
+    """Bytes every compact JSONL line of `category` contains, for a cheap pre-check"""
+    if not category:
+        return None
+    return json.dumps({'category': category}, separators=(',', ':'))[1:-1].encode()
+
+
+def iter_lines_after(f, key: int = -1) -> Iterator[Tuple[int, bytes]]:
+    """Yield complete (offset, line) pairs of a binary file after the line at `key`"""
+    offset = 0
+    if key >= 0:
+        f.seek(key)
+        offset = key + len(f.readline())
+    for line in f:
+        if not line.endswith(b'\n'):
+            break  # Still being written by another process
+        yield offset, line
+        offset += len(line)
+
+
+def iter_lines_reversed(f, end: Optional[int] = None,
+                        block_size: int = 65536) -> Iterator[Tuple[int, bytes]]:
+    """Yield complete (offset, line) pairs of a binary file ending before `end`, newest first"""
+    pos = f.seek(0, os.SEEK_END) if end is None else end
+    pending = b''
+    terminated = False
+    while pos > 0:
+        size = min(block_size, pos)
+        pos -= size
+        f.seek(pos)
+        pending = f.read(size) + pending
+        if not terminated:
+            # Ignore a trailing line that is still being written
+            cut = pending.rfind(b'\n')
+            if cut == -1:
+                continue
+            pending = pending[:cut + 1]
+            terminated = True
+        start = pending.rfind(b'\n', 0, len(pending) - 1)
+        while start != -1:
+            yield pos + start + 1, pending[start + 1:]
+            pending = pending[:start + 1]
+            start = pending.rfind(b'\n', 0, len(pending) - 1)
+    if terminated and pending:
+        yield 0, pending
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive advisory lock on `path` (created if needed)"""
+    with open(path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class JsonlSurveillanceStore(SurveillanceStore):
+    """Append-only newline-delimited JSON surveillance log
+
+    Each entry is written as a single line at the end of the file, so an
+    append costs the same no matter how much history exists, and a crash
+    mid-write can at worst leave one torn trailing line (skipped by readers).
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        """Create a store at `path`, migrating `legacy_path` on first use"""
+        super().__init__()
+        self.path = path
+        self.legacy_path = legacy_path
+        self.store_id = f"jsonl:{os.path.abspath(path)}"
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _write_entries(self, entries: List[Dict], fsync: bool = False):
+        """Append entries to the log with one write call"""
+        data = b''.join(encode_entry(entry) for entry in entries)
+        with self._lock:
+            self._ensure_ready()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def iter_after(self, key: int = -1) -> Iterator[Tuple[int, Dict]]:
+        """Stream (key, entry) pairs written after `key`, one line at a time
+
+        A key is the byte offset at which the entry's line starts, so
+        resuming after a known key is a single seek.
+        """
+        if not self._exists():
+            return
+        with open(self.path, 'rb') as f:
+            for offset, line in iter_lines_after(f, key):
+                entry = decode_entry(line)
+                if entry is not None:
+                    yield offset, entry
+
+    def last_key(self) -> int:
+        """Return the offset of the newest entry by reading back from the end"""
+        if not self._exists():
+            return -1
+        for offset, line in self._iter_lines_reversed():
+            if decode_entry(line) is not None:
+                return offset
+        return -1
+
+    def page(self, category: Optional[str] = None, limit: int = 100,
+             before: Optional[int] = None, after: Optional[int] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        """Return up to `limit` (key, entry) pairs, newest first
+
+        Newest-first pages are read backwards from `before` (or the end of
+        the file), so their cost depends on the page, not the log size.
+        """
+        if after is not None or limit <= 0:
+            return super().page(category=category, limit=limit, before=before, after=after,
+                                since=since, until=until)
+        if not self._exists():
+            return []
+
+        # Cheap byte check before decoding; entries are written as compact JSON
+        needle = category_needle(category)
+        logs = []
+        for offset, line in self._iter_lines_reversed(end=before):
+            if needle and needle not in line:
+                continue
+            entry = decode_entry(line)
+            if entry is None or not entry_matches(entry, category, since, until):
+                continue
+            logs.append((offset, entry))
+            if len(logs) >= limit:
+                break
+        return logs
+
+    def _exists(self) -> bool:
+        with self._lock:
+            self._ensure_ready()
+        return os.path.exists(self.path)
+
+    def _iter_lines_reversed(self, end: Optional[int] = None,
+                             block_size: int = 65536) -> Iterator[Tuple[int, bytes]]:
+        """Yield complete (offset, line) pairs ending before `end`, newest first"""
+        with open(self.path, 'rb') as f:
+            yield from iter_lines_reversed(f, end=end, block_size=block_size)
+
+    def migrate_legacy(self) -> int:
+        """One-time conversion of a legacy JSON array log into JSONL
+
+        Returns the number of migrated entries. The legacy file is renamed
+        with a `.migrated` suffix once the new log is in place, so the
+        migration never runs twice.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return 0
+        if os.path.exists(self.path):
+            print(f"Note: {self.path} already exists, skipping migration of {self.legacy_path}")
+            return 0
+
+        with open(self.legacy_path, 'r') as f:
+            try:
+                legacy_entries = json.load(f)
+            except ValueError:
+                legacy_entries = []
+        if not isinstance(legacy_entries, list):
+            legacy_entries = []
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for entry in legacy_entries:
+                f.write(encode_entry(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        os.replace(self.legacy_path, self.legacy_path + '.migrated')
+
+        print(f"Migrated {len(legacy_entries)} surveillance log entries to {self.path}")
+        return len(legacy_entries)
+
+    def _ensure_ready(self):
+        """Run migration and repair a torn trailing line (caller holds the lock)"""
+        if self._ready:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.migrate_legacy()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    # Terminate a torn write so the next append starts on a fresh line
+                    f.write(b'\n')
+        self._ready = True
+
+
+class BufferedSurveillanceWriter:
+    """Group-commit writer for a processing run
+
+    Entries are buffered and handed to the store as one `append_many`
+    group (a single append or transaction) once `max_entries` are pending
+    or the oldest has waited `max_delay` seconds, and on exit. Use as a
+    context manager around a run::
+
+        with BufferedSurveillanceWriter(store) as writer:
+            writer.write(entry)
+    """
+
+    def __init__(self, store: SurveillanceStore, max_entries: int = 100,
+                 max_delay: float = 5.0, fsync: str = FSYNC_FLUSH):
+        if fsync not in (FSYNC_NEVER, FSYNC_FLUSH, FSYNC_CLOSE):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.store = store
+        self.max_entries = max(1, max_entries)
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.flush_count = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Held by `write()` and `flush()`; hold it to keep writes out meanwhile"""
+        return self._lock
+
+    @property
+    def pending(self) -> int:
+        """Number of entries buffered and not yet written"""
+        with self._lock:
+            return len(self._buffer)
+
+    def __enter__(self) -> 'BufferedSurveillanceWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, entry: Dict):
+        """Buffer an entry, flushing the group if the count threshold is hit"""
+        with self._lock:
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.max_entries:
+                self.flush()
+            elif self._timer is None and self.max_delay is not None:
+                # Bound how long an entry can sit unwritten during a slow run
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self, fsync: Optional[bool] = None):
+        """Write all buffered entries as one group
+
+        If the store raises, the entries stay buffered for the next flush
+        and the error propagates.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            if fsync is None:
+                fsync = self.fsync == FSYNC_FLUSH
+            self.store.append_many(self._buffer, fsync=fsync)
+            self._buffer = []
+            self.flush_count += 1
+
+    def close(self):
+        """Flush remaining entries, honouring the close-time fsync policy"""
+        self.flush(fsync=self.fsync != FSYNC_NEVER)
+
+
+metadata = MetaData()
+
+surveillance_log_table = Table(
+    'surveillance_log', metadata,
+    Column('seq', Integer, primary_key=True, autoincrement=True),
+    Column('incident_id', String(64)),
+    Column('timestamp', String(64)),
+    Column('category', String(64)),
+    Column('entry', Text, nullable=False),
+    Index('ix_surveillance_log_category_seq', 'category', 'seq'),
+    Index('ix_surveillance_log_timestamp', 'timestamp'),
+    Index('ix_surveillance_log_incident_id', 'incident_id'),
+)
+
+
+class SqliteSurveillanceStore(SurveillanceStore):
+    """SQLite surveillance log indexed on category, timestamp and incident ID
+
+    Entries are kept verbatim as JSON alongside the indexed columns, and
+    `seq` preserves insertion order, so newest-first and category-filtered
+    queries are answered from an index instead of a full scan.
+    """
+
+    def __init__(self, url: str, legacy_path: Optional[str] = None):
+        """Open (and create if needed) the database at SQLAlchemy `url`
+
+        The flat JSONL log at `legacy_path` is imported once, while the
+        table is still empty.
+        """
+        super().__init__()
+        self.store_id = f"sqlite:{url}"
+        self.legacy_path = legacy_path
+        if url.startswith('sqlite:///'):
+            db_dir = os.path.dirname(url[len('sqlite:///'):])
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        self.engine = create_engine(url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._configure_connection)
+        metadata.create_all(self.engine)
+        self.migrate_legacy()
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, connection_record):
+        # WAL lets the dashboard read while the bot writes
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    def _write_entries(self, entries: List[Dict], fsync: bool = False):
+        """Append entries in a single transaction
+
+        Durability of a commit follows the connection's synchronous pragma,
+        so `fsync` needs no extra work here.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(surveillance_log_table.insert(), self._rows(entries))
+
+    @staticmethod
+    def _rows(entries: List[Dict]) -> List[Dict]:
+        return [{
+            'incident_id': entry.get('incident_id'),
+            'timestamp': entry.get('timestamp'),
+            'category': entry.get('category'),
+            'entry': json.dumps(entry, separators=(',', ':'))
+        } for entry in entries]
+
+    def migrate_legacy(self) -> int:
+        """One-time import of a flat JSONL log into the table
+
+        Runs only while the table is still empty, in a single transaction;
+        the flat log is renamed with a `.migrated` suffix afterwards.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return 0
+        count = 0
+        with file_lock(self.legacy_path + '.lock'):
+            if not os.path.exists(self.legacy_path):
+                return 0
+            with self.engine.begin() as conn:
+                if conn.execute(select(func.count()).select_from(surveillance_log_table)).scalar():
+                    print(f"Note: {self.store_id} is not empty, skipping import of {self.legacy_path}")
+                    return 0
+                batch: List[Dict] = []
+                for entry in JsonlSurveillanceStore(self.legacy_path).iter_entries():
+                    batch.append(entry)
+                    count += 1
+                    if len(batch) >= 1000:
+                        conn.execute(surveillance_log_table.insert(), self._rows(batch))
+                        batch = []
+                if batch:
+                    conn.execute(surveillance_log_table.insert(), self._rows(batch))
+            os.replace(self.legacy_path, self.legacy_path + '.migrated')
+        print(f"Imported {count} surveillance log entries into {self.store_id}")
+        return count
+
+    def iter_after(self, key: int = -1) -> Iterator[Tuple[int, Dict]]:
+        """Stream (seq, entry) pairs written after `key`, oldest first"""
+        table = surveillance_log_table
+        stmt = select(table.c.seq, table.c.entry).where(table.c.seq > key).order_by(table.c.seq)
+        with self.engine.connect() as conn:
+            for row in conn.execution_options(stream_results=True).execute(stmt):
+                yield row.seq, json.loads(row.entry)
+
+    def iter_filtered(self, category: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> Iterator[Dict]:
+        """Stream matching entries oldest first, filtered by the indexes"""
+        table = surveillance_log_table
+        stmt = select(table.c.entry).order_by(table.c.seq)
+        if category:
+            stmt = stmt.where(table.c.category == category)
+        if since:
+            stmt = stmt.where(table.c.timestamp >= since)
+        if until:
+            stmt = stmt.where(table.c.timestamp < until)
+        with self.engine.connect() as conn:
+            for row in conn.execution_options(stream_results=True).execute(stmt):
+                yield json.loads(row.entry)
+
+    def last_key(self) -> int:
+        """Return the seq of the newest entry, or -1 if the log is empty"""
+        with self.engine.connect() as conn:
+            last = conn.execute(select(func.max(surveillance_log_table.c.seq))).scalar()
+        return last if last is not None else -1
+
+    def page(self, category: Optional[str] = None, limit: int = 100,
+             before: Optional[int] = None, after: Optional[int] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        """Return up to `limit` (seq, entry) pairs, newest first"""
+        table = surveillance_log_table
+        stmt = select(table.c.seq, table.c.entry)
+        if category:
+            stmt = stmt.where(table.c.category == category)
+        if since:
+            stmt = stmt.where(table.c.timestamp >= since)
+        if until:
+            stmt = stmt.where(table.c.timestamp < until)
+        if after is not None:
+            stmt = stmt.where(table.c.seq > after).order_by(table.c.seq)
+        else:
+            if before is not None:
+                stmt = stmt.where(table.c.seq < before)
+            stmt = stmt.order_by(table.c.seq.desc())
+        if limit > 0:
+            stmt = stmt.limit(limit)
+        with self.engine.connect() as conn:
+            logs = [(row.seq, json.loads(row.entry)) for row in conn.execute(stmt)]
+        if after is not None:
+            logs.reverse()
+        return logs
+
+    def statistics(self, recent_count: int = 10) -> Dict:
+        """Return totals by category and by date plus the latest entries"""
+        table = surveillance_log_table
+        date_expr = case(
+            (func.instr(table.c.timestamp, 'T') > 0,
+             func.substr(table.c.timestamp, 1, func.instr(table.c.timestamp, 'T') - 1)),
+            else_='Unknown'
+        )
+        with self.engine.connect() as conn:
+            by_category = {
+                (category if category is not None else 'Unknown'): count
+                for category, count in conn.execute(
+                    select(table.c.category, func.count()).group_by(table.c.category))
+            }
+            by_date = {
+                date: count
+                for date, count in conn.execute(
+                    select(date_expr, func.count()).group_by(date_expr))
+            }
+        return {
+            'total': sum(by_category.values()),
+            'by_category': by_category,
+            'by_date': by_date,
+            'recent_activity': self.query(limit=recent_count)
+        }
+
+
+SEGMENT_OFFSET_BITS = 40
+SEGMENT_OFFSET_MASK = (1 << SEGMENT_OFFSET_BITS) - 1
+MANIFEST_VERSION = 1
+
+
+class SegmentedSurveillanceStore(SurveillanceStore):
+    """Surveillance log split into daily JSONL segments with a manifest
+
+    Entries go to the segment for the current UTC day. A small manifest
+    records each segment's timestamp range, entry count and per-category
+    and per-date counts, so filtered queries open only segments that can
+    match and statistics never read a segment at all. When the day rolls
+    over, the previous segment is sealed read-only and, with
+    `compress_sealed`, gzipped.
+
+    A key is the segment ordinal in the high bits and the byte offset of
+    the entry inside the (uncompressed) segment in the low 40 bits.
+    """
+
+    def __init__(self, directory: str, legacy_path: Optional[str] = None,
+                 compress_sealed: bool = False, clock: Callable[[], datetime] = datetime.utcnow):
+        """Open the segment directory, importing the flat JSONL log at `legacy_path` once"""
+        super().__init__()
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.compress_sealed = compress_sealed
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.lock_path = os.path.join(directory, 'manifest.lock')
+        self.store_id = f"segmented:{os.path.abspath(directory)}"
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._segments: List[Dict] = []
+        self._manifest_mtime = None
+        self._ready = False
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _write_entries(self, entries: List[Dict], fsync: bool = False):
+        """Append entries to today's segment and update the manifest"""
+        day = self._clock().strftime('%Y-%m-%d')
+        self._prepare()
+        with self._lock, file_lock(self.lock_path):
+            self._load_manifest()
+            self._reconcile_active()
+            self._append_to_day(day, entries, fsync)
+            self._save_manifest()
+
+    def _append_to_day(self, day: str, entries: List[Dict], fsync: bool = False):
+        """Append to the active segment for `day`, sealing a stale one (lock held)"""
+        active = self._segments[-1] if self._segments and not self._segments[-1]['sealed'] else None
+        if active is not None and active['day'] != day:
+            self._seal(active)
+            active = None
+        if active is None:
+            ordinal = len(self._segments)
+            active = {
+                'ordinal': ordinal,
+                'name': f"segment-{ordinal:06d}-{day}.jsonl",
+                'day': day,
+                'count': 0,
+                'size': 0,
+                'last_offset': -1,
+                'first_timestamp': None,
+                'last_timestamp': None,
+                'by_category': {},
+                'by_date': {},
+                'sealed': False,
+                'compressed': False
+            }
+            self._segments.append(active)
+
+        lines = [encode_entry(entry) for entry in entries]
+        with open(self._segment_path(active), 'ab') as f:
+            f.write(b''.join(lines))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        for entry, line in zip(entries, lines):
+            self._count(active, active['size'], entry)
+            active['size'] += len(line)
+
+    @staticmethod
+    def _count(segment: Dict, offset: int, entry: Dict):
+        segment['count'] += 1
+        segment['last_offset'] = offset
+        timestamp = entry.get('timestamp') or ''
+        if segment['first_timestamp'] is None or timestamp < segment['first_timestamp']:
+            segment['first_timestamp'] = timestamp
+        if segment['last_timestamp'] is None or timestamp > segment['last_timestamp']:
+            segment['last_timestamp'] = timestamp
+        category = entry.get('category', 'Unknown')
+        segment['by_category'][category] = segment['by_category'].get(category, 0) + 1
+        date = entry_date(entry)
+        segment['by_date'][date] = segment['by_date'].get(date, 0) + 1
+
+    def _reconcile_active(self):
+        """Count lines a crashed writer appended after the last manifest save (lock held)"""
+        if not self._segments or self._segments[-1]['sealed']:
+            return
+        active = self._segments[-1]
+        path = self._segment_path(active)
+        if not os.path.exists(path) or os.path.getsize(path) == active['size']:
+            return
+        with open(path, 'rb+') as f:
+            if f.seek(0, os.SEEK_END) < active['size']:
+                # Segment shrank underneath us; recount it from scratch
+                active.update(count=0, size=0, last_offset=-1, first_timestamp=None,
+                              last_timestamp=None, by_category={}, by_date={})
+            f.seek(active['size'])
+            for line in f:
+                if line.endswith(b'\n'):
+                    entry = decode_entry(line)
+                    if entry is not None:
+                        self._count(active, active['size'], entry)
+                else:
+                    # Terminate a torn write so the next append starts on a fresh line
+                    f.write(b'\n')
+                    line += b'\n'
+                active['size'] += len(line)
+
+    def _seal(self, segment: Dict):
+        """Make a finished segment read-only, compressing it if configured (lock held)"""
+        path = self._segment_path(segment)
+        if self.compress_sealed and os.path.exists(path):
+            gz_path = path + '.gz'
+            with open(path, 'rb') as src, gzip.open(gz_path + '.tmp', 'wb') as dst:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.replace(gz_path + '.tmp', gz_path)
+            os.remove(path)
+            segment['name'] += '.gz'
+            segment['compressed'] = True
+            path = gz_path
+        if os.path.exists(path):
+            os.chmod(path, 0o444)
+        segment['sealed'] = True
+
+    def seal_active(self):
+        """Seal the active segment now instead of waiting for the day to roll over"""
+        self._prepare()
+        with self._lock, file_lock(self.lock_path):
+            self._load_manifest()
+            if self._segments and not self._segments[-1]['sealed']:
+                self._reconcile_active()
+                self._seal(self._segments[-1])
+                self._save_manifest()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _prepare(self):
+        """Create the directory and run the one-time import (idempotent)"""
+        with self._lock:
+            if not self._ready:
+                os.makedirs(self.directory, exist_ok=True)
+                self.migrate_legacy()
+                self._ready = True
+
+    def _load_manifest(self):
+        """Reload the manifest if another process saved a newer one (lock held)"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._manifest_mtime:
+            return
+        segments = []
+        if mtime is not None:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                segments = manifest['segments']
+        self._segments = segments
+        self._manifest_mtime = mtime
+
+    def _save_manifest(self):
+        """Atomically replace the manifest (lock held)"""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'segments': self._segments}, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def segments(self) -> List[Dict]:
+        """Return a copy of the manifest's segment records, oldest first"""
+        self._prepare()
+        with self._lock:
+            self._load_manifest()
+            return [dict(segment) for segment in self._segments]
+
+    def migrate_legacy(self) -> int:
+        """One-time import of a flat JSONL log into daily segments
+
+        Entries are split into segments by their own timestamp date. Runs
+        only while the segmented store is still empty; the flat log is
+        renamed with a `.migrated` suffix afterwards.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return 0
+        if os.path.exists(self.manifest_path):
+            return 0
+        count = 0
+        with self._lock, file_lock(self.lock_path):
+            self._load_manifest()
+            batch: List[Dict] = []
+            batch_day = None
+            for entry in JsonlSurveillanceStore(self.legacy_path).iter_entries():
+                day = entry_date(entry)
+                if day == 'Unknown':
+                    day = batch_day or self._clock().strftime('%Y-%m-%d')
+                if batch and (day != batch_day or len(batch) >= 1000):
+                    self._append_to_day(batch_day, batch)
+                    batch = []
+                batch_day = day
+                batch.append(entry)
+                count += 1
+            if batch:
+                self._append_to_day(batch_day, batch)
+            self._save_manifest()
+        os.replace(self.legacy_path, self.legacy_path + '.migrated')
+        print(f"Imported {count} surveillance log entries into {self.directory}")
+        return count
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment: Dict) -> str:
+        return os.path.join(self.directory, segment['name'])
+
+    def _open_segment(self, segment: Dict):
+        path = self._segment_path(segment)
+        return gzip.open(path, 'rb') if segment['compressed'] else open(path, 'rb')
+
+    @staticmethod
+    def _segment_matches(segment: Dict, category: Optional[str],
+                         since: Optional[str], until: Optional[str]) -> bool:
+        """Decide from the manifest alone whether a segment can hold matches"""
+        if not segment['count']:
+            return False
+        if category and not segment['by_category'].get(category):
+            return False
+        if since and (segment['last_timestamp'] or '') < since:
+            return False
+        if until and (segment['first_timestamp'] or '') >= until:
+            return False
+        return True
+
+    def iter_after(self, key: int = -1) -> Iterator[Tuple[int, Dict]]:
+        """Stream (key, entry) pairs written after `key`, skipping older segments"""
+        start_ordinal, start_offset = split_segment_key(key)
+        for segment in self.segments():
+            if segment['ordinal'] < start_ordinal:
+                continue
+            after = start_offset if segment['ordinal'] == start_ordinal else -1
+            yield from self._iter_segment(segment, after)
+
+    def iter_filtered(self, category: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> Iterator[Dict]:
+        """Stream matching entries oldest first, opening only matching segments"""
+        for segment in self.segments():
+            if not self._segment_matches(segment, category, since, until):
+                continue
+            for _, entry in self._iter_segment(segment):
+                if entry_matches(entry, category, since, until):
+                    yield entry
+
+    def _iter_segment(self, segment: Dict, after: int = -1) -> Iterator[Tuple[int, Dict]]:
+        if not os.path.exists(self._segment_path(segment)):
+            return
+        with self._open_segment(segment) as f:
+            for offset, line in iter_lines_after(f, after):
+                entry = decode_entry(line)
+                if entry is not None:
+                    yield make_segment_key(segment['ordinal'], offset), entry
+
+    def last_key(self) -> int:
+        """Return the key of the newest entry from the manifest"""
+        for segment in reversed(self.segments()):
+            if segment['count']:
+                return make_segment_key(segment['ordinal'], segment['last_offset'])
+        return -1
+
+    def page(self, category: Optional[str] = None, limit: int = 100,
+             before: Optional[int] = None, after: Optional[int] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        """Return up to `limit` (key, entry) pairs, newest first
+
+        Only segments whose manifest record can match the category and
+        timestamp range are opened.
+        """
+        segments = [
+            segment for segment in self.segments()
+            if self._segment_matches(segment, category, since, until)
+        ]
+        if after is not None:
+            start_ordinal, start_offset = split_segment_key(after)
+            logs = []
+            for segment in segments:
+                if segment['ordinal'] < start_ordinal:
+                    continue
+                segment_after = start_offset if segment['ordinal'] == start_ordinal else -1
+                for key, entry in self._iter_segment(segment, segment_after):
+                    if entry_matches(entry, category, since, until):
+                        logs.append((key, entry))
+                        if 0 < limit <= len(logs):
+                            break
+                if 0 < limit <= len(logs):
+                    break
+            logs.reverse()
+            return logs
+
+        end_ordinal, end_offset = split_segment_key(before) if before is not None else (None, None)
+        logs = []
+        for segment in reversed(segments):
+            if end_ordinal is not None and segment['ordinal'] > end_ordinal:
+                continue
+            end = end_offset if segment['ordinal'] == end_ordinal else None
+            remaining = limit - len(logs) if limit > 0 else 0
+            logs.extend(self._page_segment(segment, category, since, until, remaining, end))
+            if 0 < limit <= len(logs):
+                break
+        return logs
+
+    def _page_segment(self, segment: Dict, category: Optional[str], since: Optional[str],
+                      until: Optional[str], limit: int, end: Optional[int]) -> List[Tuple[int, Dict]]:
+        """Newest-first matches from one segment, ending before offset `end`"""
+        if not os.path.exists(self._segment_path(segment)):
+            return []
+        if segment['compressed'] or limit <= 0:
+            # gzip cannot be read backwards; sealed segments are bounded to a day
+            recent = deque(maxlen=limit if limit > 0 else None)
+            for key, entry in self._iter_segment(segment):
+                if end is not None and key & SEGMENT_OFFSET_MASK >= end:
+                    break
+                if entry_matches(entry, category, since, until):
+                    recent.append((key, entry))
+            logs = list(recent)
+            logs.reverse()
+            return logs
+
+        needle = category_needle(category)
+        logs = []
+        with self._open_segment(segment) as f:
+            for offset, line in iter_lines_reversed(f, end=end):
+                if needle and needle not in line:
+                    continue
+                entry = decode_entry(line)
+                if entry is None or not entry_matches(entry, category, since, until):
+                    continue
+                logs.append((make_segment_key(segment['ordinal'], offset), entry))
+                if len(logs) >= limit:
+                    break
+        return logs
+
+    def statistics(self, recent_count: int = 10) -> Dict:
+        """Return totals straight from the manifest plus the latest entries"""
+        by_category: Dict[str, int] = {}
+        by_date: Dict[str, int] = {}
+        for segment in self.segments():
+            for category, count in segment['by_category'].items():
+                by_category[category] = by_category.get(category, 0) + count
+            for date, count in segment['by_date'].items():
+                by_date[date] = by_date.get(date, 0) + count
+        return {
+            'total': sum(by_category.values()),
+            'by_category': by_category,
+            'by_date': by_date,
+            'recent_activity': self.query(limit=recent_count)
+        }
+
+
+def make_segment_key(ordinal: int, offset: int) -> int:
+    """Combine a segment ordinal and an offset into a store key"""
+    return (ordinal << SEGMENT_OFFSET_BITS) | offset
+
+
+def split_segment_key(key: int) -> Tuple[int, int]:
+    """Split a store key into (segment ordinal, offset); -1 maps to (-1, -1)"""
+    if key < 0:
+        return -1, -1
+    return key >> SEGMENT_OFFSET_BITS, key & SEGMENT_OFFSET_MASK
+
+
+def create_surveillance_store(backend: str, path: str, legacy_path: Optional[str] = None,
+                              db_url: Optional[str] = None,
+                              compress_sealed: bool = False) -> SurveillanceStore:
+    """Create a surveillance store for the named backend"""
+    if backend == BACKEND_JSONL:
+        return JsonlSurveillanceStore(path, legacy_path=legacy_path)
+    # Other backends bring an old JSON array log up to flat JSONL first, then import that
+    if backend == BACKEND_SQLITE:
+        JsonlSurveillanceStore(path, legacy_path=legacy_path).migrate_legacy()
+        return SqliteSurveillanceStore(db_url or f"sqlite:///{os.path.splitext(path)[0]}.db",
+                                       legacy_path=path)
+    if backend == BACKEND_SEGMENTED:
+        JsonlSurveillanceStore(path, legacy_path=legacy_path).migrate_legacy()
+        return SegmentedSurveillanceStore(os.path.splitext(path)[0], legacy_path=path,
+                                          compress_sealed=compress_sealed)
+    raise ValueError(f"Unknown surveillance backend: {backend}")
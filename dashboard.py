@@ -12,17 +12,28 @@ Features:
 """
 
 import os
+import io
+import base64
+import csv
+import hmac
 import json
+import zlib
+import queue
 import threading
-import time
 from datetime import datetime, timezone
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import (Flask, Response, render_template, jsonify, request, send_from_directory,
+                   stream_with_context)
 from pathlib import Path
 
 # Import bot components
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from bots.email_bot import EmailBot, SURVEILLANCE_LOG_PATH
+from bots.email_bot import (CATEGORY_MEDIA, CATEGORY_UNKNOWN, DEFAULT_RULES, EmailBot,
+                            get_surveillance_store, get_surveillance_statistics)
+from bots.domain_index import DomainSuffixIndex
+from bots.rule_set import compile_rules
+from bots.surveillance_store import decode_cursor, encode_cursor
+from bots.poll_scheduler import PollScheduler, WAKE_PROCESS_NOW, WAKE_PUSH, WAKE_STOP
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -33,11 +44,118 @@ bot_state = {
     'last_run': None,
     'processed_count': 0,
     'error_count': 0,
-    'status': 'stopped'
+    'status': 'stopped',
+    'next_check_in': None
 }
 
 bot_thread = None
 email_bot = None
+poll_scheduler = None
+
+# Shared secret for the Gmail push endpoint (?token=...); the endpoint is off without it
+GMAIL_PUSH_TOKEN = os.getenv('GMAIL_PUSH_TOKEN')
+
+def create_poll_scheduler() -> PollScheduler:
+    """Scheduler checking every EMAIL_CHECK_MIN_INTERVAL seconds while mail
+    arrives, backing off to EMAIL_CHECK_INTERVAL when the inbox is idle"""
+    return PollScheduler(
+        min_interval=float(os.getenv('EMAIL_CHECK_MIN_INTERVAL', 30)),
+        max_interval=float(os.getenv('EMAIL_CHECK_INTERVAL', 300)),
+        error_interval=60.0
+    )
+
+# ============================================================================
+# Live Events (Server-Sent Events)
+# ============================================================================
+
+SSE_KEEPALIVE_SECONDS = 15
+SSE_REPLAY_LIMIT = 500
+
+class EventBroadcaster:
+    """Fan-out of dashboard events to every connected SSE client
+    
+    Each client gets a bounded queue; a client that falls too far behind
+    is flagged for a resync instead of slowing down publishers.
+    """
+    
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        subscriber.overflowed = False
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+    
+    def publish(self, event: str, data, key=None):
+        """Queue an event for every subscriber; `key` orders entry events"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data, key))
+            except queue.Full:
+                subscriber.overflowed = True
+
+class SurveillanceFeed:
+    """Publishes surveillance entries as they reach the store
+    
+    Registered as a store listener, so entries written by this process are
+    pushed as soon as `log_to_surveillance` flushes them; `poll` picks up
+    entries appended by other processes (called on SSE keepalives).
+    """
+    
+    def __init__(self, store, broadcaster: EventBroadcaster):
+        self.store = store
+        self.broadcaster = broadcaster
+        self.last_key = store.last_key()
+        self._lock = threading.Lock()
+        store.add_listener(self.poll)
+    
+    def poll(self):
+        with self._lock:
+            entries = []
+            for key, entry in self.store.iter_after(self.last_key):
+                entries.append(entry)
+                self.last_key = key
+            if not entries:
+                return
+            self.broadcaster.publish('entries', {
+                'entries': entries,
+                'cursor': encode_cursor(self.last_key)
+            }, key=self.last_key)
+            self.broadcaster.publish('statistics', get_surveillance_statistics().statistics())
+
+broadcaster = EventBroadcaster()
+_surveillance_feed = None
+_surveillance_feed_lock = threading.Lock()
+
+def get_surveillance_feed() -> SurveillanceFeed:
+    """Return the live feed, attaching it to the store on first use"""
+    global _surveillance_feed
+    with _surveillance_feed_lock:
+        if _surveillance_feed is None:
+            _surveillance_feed = SurveillanceFeed(get_surveillance_store(), broadcaster)
+        return _surveillance_feed
+
+def update_bot_state(**changes):
+    """Apply changes to the bot state and push them to live clients"""
+    bot_state.update(changes)
+    broadcaster.publish('status', dict(bot_state))
+
+def format_sse(event: str, data, event_id: str = None) -> str:
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\n"
+    if event_id:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
 
 # Configuration paths
 REPO_ROOT = Path(__file__).parent
@@ -62,40 +180,116 @@ def index():
 
 @app.route('/api/status')
 def get_status():
-    """Get current bot status"""
+    """Get current bot status, polling schedule, Gmail quota throttling and cache hit rate"""
     return jsonify({
         'bot_state': bot_state,
+        'schedule': poll_scheduler.state() if poll_scheduler else None,
+        'throttle': email_bot.quota.state() if email_bot else None,
+        'categorization_cache': email_bot.category_cache.stats() if email_bot else None,
         'timestamp': datetime.now(timezone.utc).isoformat()
     })
 
+@app.route('/api/events')
+def stream_events():
+    """Push bot state changes and new surveillance entries (SSE)
+    
+    Sends a `status` event on connect, then `status`, `entries` and
+    `statistics` events as they happen. Entry events carry the log cursor
+    as their id, so a reconnecting EventSource resumes via Last-Event-ID;
+    everything it missed is replayed, SSE_REPLAY_LIMIT entries per event.
+    """
+    feed = get_surveillance_feed()
+    resume = request.headers.get('Last-Event-ID') or request.args.get('after')
+    try:
+        resume_key = decode_cursor(resume) if resume else None
+    except ValueError:
+        resume_key = None
+    subscriber = broadcaster.subscribe()
+    
+    def stream():
+        try:
+            yield format_sse('status', dict(bot_state))
+            replayed_key = -1
+            if resume_key is not None:
+                # Replay in pages of SSE_REPLAY_LIMIT until caught up
+                replayed_key = resume_key
+                while True:
+                    page = feed.store.page(limit=SSE_REPLAY_LIMIT, after=replayed_key)
+                    if not page:
+                        break
+                    replayed_key = page[0][0]
+                    entries = [entry for _, entry in reversed(page)]
+                    cursor = encode_cursor(replayed_key)
+                    yield format_sse('entries', {'entries': entries, 'cursor': cursor}, cursor)
+                    if len(page) < SSE_REPLAY_LIMIT:
+                        break
+            while True:
+                if subscriber.overflowed:
+                    yield format_sse('resync', {})
+                    return
+                try:
+                    event, data, key = subscriber.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    feed.poll()
+                    continue
+                if event == 'entries':
+                    if key <= replayed_key:
+                        continue
+                    yield format_sse(event, data, data['cursor'])
+                else:
+                    yield format_sse(event, data)
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/logs')
 def get_logs():
-    """Get surveillance logs with optional filtering"""
+    """Get surveillance logs with optional filtering
+    
+    Pass `before=<next_cursor>` to page back through history, or
+    `after=<latest_cursor>` to fetch only entries written since the last poll.
+    `since`/`until` (ISO dates or timestamps) bound the entry timestamp.
+    """
     limit = request.args.get('limit', 100, type=int)
     category = request.args.get('category', None)
+    since = request.args.get('since') or None
+    until = request.args.get('until') or None
     
     try:
-        if os.path.exists(SURVEILLANCE_LOG_PATH):
-            with open(SURVEILLANCE_LOG_PATH, 'r') as f:
-                logs = json.load(f)
-            
-            # Filter by category if specified
-            if category and category != 'all':
-                logs = [log for log in logs if log.get('category') == category]
-            
-            # Return most recent logs
-            logs = logs[-limit:] if len(logs) > limit else logs
-            logs.reverse()  # Most recent first
-            
-            return jsonify({
-                'logs': logs,
-                'total': len(logs)
-            })
-        else:
-            return jsonify({
-                'logs': [],
-                'total': 0
-            })
+        before = request.args.get('before')
+        after = request.args.get('after')
+        before = decode_cursor(before) if before else None
+        after = decode_cursor(after) if after else None
+    except ValueError as e:
+        return jsonify({'error': str(e), 'logs': [], 'total': 0}), 400
+    
+    try:
+        # Filter by category if specified; the store returns most recent first
+        if category == 'all':
+            category = None
+        store = get_surveillance_store()
+        mark = after if after is not None else store.last_key()
+        page = store.page(category=category, limit=limit, before=before, after=after,
+                          since=since, until=until)
+        logs = [entry for _, entry in page]
+        
+        next_cursor = None
+        if after is None and page and len(page) == limit:
+            next_cursor = encode_cursor(page[-1][0])
+        latest_key = max(page[0][0], mark) if page and before is None else mark
+        
+        return jsonify({
+            'logs': logs,
+            'total': len(logs),
+            'next_cursor': next_cursor,
+            'latest_cursor': encode_cursor(latest_key)
+        })
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -103,51 +297,96 @@ def get_logs():
             'total': 0
         }), 500
 
+# Columns of the CSV export, flattened from a surveillance entry
+EXPORT_CSV_COLUMNS = ['incident_id', 'timestamp', 'source', 'event_type', 'category',
+                      'from', 'subject', 'message_id', 'action_taken', 'evidence_hash']
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def _export_ndjson(entries):
+    """Serialize entries as newline-delimited JSON, one chunk at a time"""
+    buffer = []
+    size = 0
+    for entry in entries:
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def _export_csv(entries):
+    """Serialize entries as CSV rows, one chunk at a time"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    for entry in entries:
+        details = entry.get('details') or {}
+        writer.writerow([
+            entry.get(column, details.get(column, '')) for column in EXPORT_CSV_COLUMNS
+        ])
+        if out.tell() >= EXPORT_CHUNK_SIZE:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue()
+
+def _gzip_stream(chunks):
+    """Compress a stream of text chunks into a single gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.route('/api/logs/export')
+def export_logs():
+    """Stream the full surveillance log for download
+    
+    Query parameters: `format` (ndjson or csv), `category`, `since`/`until`
+    (ISO dates or timestamps) and `gzip=1`. Entries are streamed from the
+    store as they are read, so memory use does not grow with the log.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+    category = request.args.get('category') or None
+    if category == 'all':
+        category = None
+    since = request.args.get('since') or None
+    until = request.args.get('until') or None
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+    
+    entries = get_surveillance_store().iter_filtered(category=category, since=since, until=until)
+    if export_format == 'csv':
+        body, mimetype, filename = _export_csv(entries), 'text/csv', 'surveillance_log.csv'
+    else:
+        body, mimetype, filename = _export_ndjson(entries), 'application/x-ndjson', 'surveillance_log.ndjson'
+    if compress:
+        body, mimetype, filename = _gzip_stream(body), 'application/gzip', filename + '.gz'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 @app.route('/api/statistics')
 def get_statistics():
     """Get email processing statistics"""
     try:
-        if os.path.exists(SURVEILLANCE_LOG_PATH):
-            with open(SURVEILLANCE_LOG_PATH, 'r') as f:
-                logs = json.load(f)
-            
-            # Calculate statistics
-            stats = {
-                'total': len(logs),
-                'by_category': {},
-                'by_date': {},
-                'recent_activity': []
-            }
-            
-            # Count by category
-            for log in logs:
-                category = log.get('category', 'Unknown')
-                stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
-                
-                # Extract date
-                timestamp = log.get('timestamp', '')
-                date = timestamp.split('T')[0] if 'T' in timestamp else 'Unknown'
-                stats['by_date'][date] = stats['by_date'].get(date, 0) + 1
-            
-            # Get recent activity (last 10 entries)
-            stats['recent_activity'] = logs[-10:] if len(logs) >= 10 else logs
-            stats['recent_activity'].reverse()
-            
-            return jsonify(stats)
-        else:
-            return jsonify({
-                'total': 0,
-                'by_category': {},
-                'by_date': {},
-                'recent_activity': []
-            })
+        # Answered from incrementally maintained counters, not a log scan
+        return jsonify(get_surveillance_statistics().statistics())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/bot/start', methods=['POST'])
 def start_bot():
     """Start the email bot"""
-    global bot_state, bot_thread, email_bot
+    global bot_state, bot_thread, email_bot, poll_scheduler
     
     if bot_state['running']:
         return jsonify({'error': 'Bot is already running'}), 400
@@ -158,27 +397,31 @@ def start_bot():
         email_bot = EmailBot(credentials_path)
         
         # Start bot in background thread
-        bot_state['running'] = True
-        bot_state['status'] = 'running'
-        bot_state['last_run'] = datetime.now(timezone.utc).isoformat()
+        update_bot_state(running=True, status='running',
+                         last_run=datetime.now(timezone.utc).isoformat())
         
-        # Get check interval from environment or use default (5 minutes)
-        check_interval = int(os.getenv('EMAIL_CHECK_INTERVAL', 300))
+        # Each start gets its own scheduler, so a loop left over from a
+        # previous start exits instead of polling alongside the new one
+        scheduler = poll_scheduler = create_poll_scheduler()
         
         def run_bot():
             global bot_state
-            while bot_state['running']:
+            while bot_state['running'] and poll_scheduler is scheduler:
                 try:
+                    found = 0
                     if email_bot and email_bot.service:
-                        email_bot.process_inbox(max_results=50)
-                        bot_state['processed_count'] += 1
-                    bot_state['last_run'] = datetime.now(timezone.utc).isoformat()
-                    # Wait between checks (configurable via EMAIL_CHECK_INTERVAL env var)
-                    time.sleep(check_interval)
+                        found = email_bot.process_inbox()
+                        update_bot_state(processed_count=bot_state['processed_count'] + found)
+                    scheduler.record_run(found)
+                    update_bot_state(last_run=datetime.now(timezone.utc).isoformat(),
+                                     next_check_in=scheduler.interval)
                 except Exception as e:
-                    bot_state['error_count'] += 1
+                    scheduler.record_error()
+                    update_bot_state(error_count=bot_state['error_count'] + 1,
+                                     next_check_in=scheduler.interval)
                     print(f"Bot error: {e}")
-                    time.sleep(60)  # Wait 1 minute on error
+                # Sleeps until the next check, a push notification, process-now or stop
+                scheduler.wait()
         
         bot_thread = threading.Thread(target=run_bot, daemon=True)
         bot_thread.start()
@@ -189,8 +432,7 @@ def start_bot():
             'bot_state': bot_state
         })
     except Exception as e:
-        bot_state['running'] = False
-        bot_state['status'] = 'error'
+        update_bot_state(running=False, status='error')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/bot/stop', methods=['POST'])
@@ -201,8 +443,9 @@ def stop_bot():
     if not bot_state['running']:
         return jsonify({'error': 'Bot is not running'}), 400
     
-    bot_state['running'] = False
-    bot_state['status'] = 'stopped'
+    update_bot_state(running=False, status='stopped', next_check_in=None)
+    if poll_scheduler:
+        poll_scheduler.wake(WAKE_STOP)
     
     return jsonify({
         'success': True,
@@ -212,19 +455,31 @@ def stop_bot():
 
 @app.route('/api/bot/process-now', methods=['POST'])
 def process_now():
-    """Manually trigger email processing"""
+    """Manually trigger email processing
+    
+    While the bot loop is running this just wakes it, so runs never
+    overlap; otherwise the inbox is processed in this request.
+    """
     global email_bot
     
+    if bot_state['running'] and poll_scheduler:
+        poll_scheduler.wake(WAKE_PROCESS_NOW)
+        return jsonify({
+            'success': True,
+            'message': 'Email processing triggered'
+        }), 202
+    
     try:
         credentials_path = os.getenv('GMAIL_CREDENTIALS_PATH', 'credentials.json')
         if not email_bot:
             email_bot = EmailBot(credentials_path)
         
         if email_bot.service:
-            email_bot.process_inbox(max_results=50)
+            found = email_bot.process_inbox()
             return jsonify({
                 'success': True,
-                'message': 'Email processing completed'
+                'message': f'Email processing completed ({found} messages)',
+                'processed': found
             })
         else:
             return jsonify({
@@ -238,9 +493,43 @@ def process_now():
             'help': 'Check logs and verify Gmail API credentials are configured correctly'
         }), 500
 
+@app.route('/api/gmail/push', methods=['POST'])
+def gmail_push():
+    """Receive Gmail watch notifications (Cloud Pub/Sub push format)
+    
+    The notification only says the mailbox changed; the running bot is
+    woken to sync right away instead of waiting for its next poll.
+    Always acknowledged with 204 once validated, so Pub/Sub does not
+    redeliver notifications that arrive while the bot is stopped.
+    Disabled (404) unless GMAIL_PUSH_TOKEN is set.
+    """
+    if not GMAIL_PUSH_TOKEN:
+        return jsonify({'error': 'Gmail push is not configured'}), 404
+    if not hmac.compare_digest(request.args.get('token', '').encode(), GMAIL_PUSH_TOKEN.encode()):
+        return jsonify({'error': 'Invalid push token'}), 403
+    
+    envelope = request.get_json(silent=True) or {}
+    message = envelope.get('message')
+    if not isinstance(message, dict) or 'data' not in message:
+        return jsonify({'error': 'Expected a Pub/Sub push message'}), 400
+    try:
+        notification = json.loads(base64.b64decode(message['data']))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Undecodable message data'}), 400
+    
+    print(f"Gmail push for {notification.get('emailAddress')} at history {notification.get('historyId')}")
+    if bot_state['running'] and poll_scheduler:
+        poll_scheduler.wake(WAKE_PUSH)
+    return '', 204
+
 @app.route('/api/config', methods=['GET', 'POST'])
 def manage_config():
-    """Get or update bot configuration"""
+    """Get or update bot configuration
+    
+    Updates are validated (including compiling the "rules" object) and
+    written atomically, so a running bot never reads a half-written file;
+    it picks the new config up before its next chunk of mail.
+    """
     config_path = CONFIG_DIR / 'email_config.json'
     
     if request.method == 'GET':
@@ -256,10 +545,23 @@ def manage_config():
             })
     
     elif request.method == 'POST':
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'error': 'Configuration must be a JSON object'}), 400
+        try:
+            compile_rules(config, DEFAULT_RULES, DomainSuffixIndex(), CATEGORY_MEDIA, CATEGORY_UNKNOWN)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid rules: {e}'}), 400
+        
         try:
-            config = request.get_json()
-            with open(config_path, 'w') as f:
+            tmp_path = config_path.with_name(config_path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
                 json.dump(config, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, config_path)
+            if email_bot:
+                email_bot.refresh_rules()
             return jsonify({'success': True, 'message': 'Configuration updated'})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
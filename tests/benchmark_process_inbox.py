@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ENS Legis Email Bot Benchmark
+Measure process_inbox throughput offline against the fake Gmail service
+
+Reports messages/second, p50/p99 per-message latency (listed to marked
+read) and API calls per message. Example:
+
+    python tests/benchmark_process_inbox.py --messages 500 --latency 0.05 \\
+        --concurrency 4 --error-rate 0.01
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from bots.email_bot import EmailBot
+from bots.surveillance_store import JsonlSurveillanceStore
+from bots.incident_ids import IncidentIdAllocator
+from bots.gmail_sync import SyncCheckpoint
+from bots.gmail_quota import DEFAULT_UNITS_PER_SECOND, QuotaRateLimiter
+from bots.processed_index import ProcessedMessageIndex
+from tests.fake_gmail import FakeGmailService
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of `values` (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_benchmark(messages: int = 500, latency: float = 0.05, error_rate: float = 0.0,
+                  quota: float = None, concurrency: int = 0, config: Dict = None,
+                  seed: int = 0, verbose: bool = False) -> Dict:
+    """Process a synthetic backlog once and return the measurements"""
+    config = dict(config or {})
+    service = FakeGmailService(latency=latency, error_rate=error_rate,
+                               quota_units_per_second=quota, seed=seed)
+    service.populate(messages)
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = EmailBot("nonexistent_credentials.json",
+                       store=JsonlSurveillanceStore(os.path.join(tmp, 'log.jsonl')),
+                       incident_ids=IncidentIdAllocator(os.path.join(tmp, 'counter.json')),
+                       sync_checkpoint=SyncCheckpoint(os.path.join(tmp, 'sync.json')),
+                       quota=QuotaRateLimiter(units_per_second=config.get('quota_units_per_second',
+                                                                          DEFAULT_UNITS_PER_SECOND)),
+                       service=service,
+                       processed_index=ProcessedMessageIndex(os.path.join(tmp, 'processed.db')))
+        bot.config.update(config)
+        if concurrency:
+            bot.config['concurrency'] = {'fetch': concurrency, 'handle': concurrency,
+                                         'acknowledge': concurrency}
+
+        start = time.monotonic()
+        if verbose:
+            bot.process_inbox()
+        else:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                bot.process_inbox()
+        elapsed = time.monotonic() - start
+        logged = sum(1 for _ in bot.store.iter_entries())
+
+    latencies = [service.acknowledged_at[m] - service.listed_at[m]
+                 for m in service.acknowledged if m in service.listed_at]
+    calls = sum(service.calls.values())
+    return {
+        'messages': messages,
+        'processed': len(service.acknowledged),
+        'logged': logged,
+        'elapsed_seconds': elapsed,
+        'messages_per_second': len(service.acknowledged) / elapsed if elapsed else 0.0,
+        'p50_latency': percentile(latencies, 0.50),
+        'p99_latency': percentile(latencies, 0.99),
+        'api_calls': calls,
+        'calls_per_message': calls / messages if messages else 0.0,
+        'round_trips': service.round_trips,
+        'round_trips_per_message': service.round_trips / messages if messages else 0.0,
+        'quota_rejections': service.quota_rejections,
+        'calls_by_method': dict(service.calls)
+    }
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark EmailBot.process_inbox offline")
+    parser.add_argument('--messages', type=int, default=500, help="synthetic backlog size")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per HTTP round trip")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="chance each call fails with 503")
+    parser.add_argument('--quota', type=float, default=None, help="quota units per second (default: unlimited)")
+    parser.add_argument('--bot-quota', type=float, default=None,
+                        help="bot's own limiter in units per second (default: Gmail's 250)")
+    parser.add_argument('--concurrency', type=int, default=0, help="workers per stage (0: sequential)")
+    parser.add_argument('--batch-size', type=int, default=50, help="fetch_batch_size")
+    parser.add_argument('--sync-mode', default='unread', choices=['unread', 'history'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="show the bot's own output")
+    args = parser.parse_args()
+    config = {'fetch_batch_size': args.batch_size, 'sync_mode': args.sync_mode}
+    if args.bot_quota:
+        config['quota_units_per_second'] = args.bot_quota
+
+    result = run_benchmark(
+        messages=args.messages, latency=args.latency, error_rate=args.error_rate,
+        quota=args.quota, concurrency=args.concurrency, seed=args.seed, verbose=args.verbose,
+        config=config
+    )
+    print(f"Processed {result['processed']}/{result['messages']} messages "
+          f"in {result['elapsed_seconds']:.2f}s ({result['logged']} logged)")
+    print(f"  throughput:        {result['messages_per_second']:.1f} msgs/s")
+    print(f"  latency p50 / p99: {result['p50_latency'] * 1000:.0f} ms / {result['p99_latency'] * 1000:.0f} ms")
+    print(f"  API calls/message: {result['calls_per_message']:.2f} ({result['api_calls']} calls)")
+    print(f"  round trips/msg:   {result['round_trips_per_message']:.3f} ({result['round_trips']} round trips)")
+    print(f"  quota rejections:  {result['quota_rejections']}")
+    for method, count in sorted(result['calls_by_method'].items()):
+        print(f"    {method:22s} {count}")
+
+
+if __name__ == "__main__":
+    main()
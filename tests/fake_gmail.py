@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+In-memory Gmail API stand-in for tests and benchmarks
+
+Mimics the googleapiclient resource interface used by EmailBot
+(`users().messages()`, `users().history()`, `getProfile`, batch
+requests) over a synthetic mailbox, with optional per-round-trip
+latency, random backend errors and per-user quota enforcement.
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from httplib2 import Response
+from googleapiclient.errors import HttpError
+
+from bots.gmail_quota import DEFAULT_QUOTA_UNITS, QUOTA_UNITS
+
+GMAIL_MAX_BATCH_SIZE = 100
+FIRST_HISTORY_ID = 1000
+
+# (subject, sender) shapes for synthetic mail, roughly one per category
+SYNTHETIC_MAIL = [
+    ('FCRA dispute about my credit report', 'consumer{n}@example.com'),
+    ('Interview request about the campaign', 'reporter{n}@nytimes.com'),
+    ('Happy to support you on Patreon', 'fan{n}@example.org'),
+    ('Invoice #{n} from Printful', 'billing@printful.com'),
+    ('Hello there', 'someone{n}@example.net')
+]
+
+
+def http_error(status: int, reason: str = 'error') -> HttpError:
+    """Build an HttpError shaped like Gmail's JSON error responses"""
+    content = json.dumps({'error': {'code': status, 'message': reason,
+                                    'errors': [{'reason': reason}]}}).encode()
+    return HttpError(Response({'status': status}), content)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on or set by hand (`now`)"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    __call__ = time
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeRequest:
+    """A single API call, sent by execute() or as part of a batch"""
+
+    def __init__(self, service: 'FakeGmailService', method: str, handler: Callable, params: Dict):
+        self.service = service
+        self.method = method
+        self.handler = handler
+        self.params = params
+
+    def execute(self):
+        self.service._round_trip()
+        return self.service._call(self)
+
+
+class FakeBatchRequest:
+    """Stand-in for googleapiclient's BatchHttpRequest"""
+
+    def __init__(self, service: 'FakeGmailService', callback: Optional[Callable]):
+        self.service = service
+        self.callback = callback
+        self._requests: Dict[str, tuple] = {}
+
+    def add(self, request: FakeRequest, callback: Optional[Callable] = None,
+            request_id: Optional[str] = None):
+        request_id = request_id or str(len(self._requests) + 1)
+        if request_id in self._requests:
+            raise KeyError(f"Duplicate batch request id {request_id}")
+        if len(self._requests) >= GMAIL_MAX_BATCH_SIZE:
+            raise ValueError(f"Batch requests are limited to {GMAIL_MAX_BATCH_SIZE} calls")
+        self._requests[request_id] = (request, callback)
+
+    def execute(self):
+        self.service._round_trip()
+        self.service._record_batch([request.params.get('id') for request, _ in self._requests.values()])
+        for request_id, (request, callback) in self._requests.items():
+            try:
+                response, exception = self.service._call(request), None
+            except HttpError as error:
+                response, exception = None, error
+            callback = callback or self.callback
+            if callback:
+                callback(request_id, response, exception)
+
+
+class _Resource:
+    """Resource object whose methods build FakeRequests"""
+
+    def __init__(self, service: 'FakeGmailService', prefix: str, handlers: Dict[str, Callable]):
+        self._service = service
+        self._prefix = prefix
+        self._handlers = handlers
+
+    def __getattr__(self, name):
+        if name not in self._handlers:
+            raise AttributeError(name)
+        method = self._prefix + name
+        handler = self._handlers[name]
+        return lambda **params: FakeRequest(self._service, method, handler, params)
+
+
+class FakeGmailService:
+    """In-memory Gmail mailbox behind the googleapiclient interface
+
+    Messages are listed oldest first. Page tokens are offsets into the
+    current result set, so marking messages read while paging shifts
+    later pages as it can with the real API. Every call is counted in
+    `calls` by method, and `round_trips` counts HTTP requests (a batch is
+    one round trip).
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 quota_units_per_second: Optional[float] = None, seed: int = 0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Create an empty mailbox
+
+        `latency` is added to every round trip, `error_rate` is the chance
+        that any single call fails with a 503, and with
+        `quota_units_per_second` calls beyond the per-user quota fail
+        with a 429.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_units_per_second = quota_units_per_second
+        self.clock = clock
+        self.sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self.messages: Dict[str, Dict] = {}
+        self.history: List[Dict] = []
+        self.history_id = FIRST_HISTORY_ID
+        self.history_floor = FIRST_HISTORY_ID
+        self._failures: Dict[str, List[HttpError]] = {}
+        self._quota_tokens = quota_units_per_second or 0.0
+        self._quota_updated = clock()
+        self.calls = Counter()
+        self.round_trips = 0
+        self.quota_rejections = 0
+        self.requests: List = []
+        self.batches: List[List[str]] = []
+        self.acknowledged: List[str] = []
+        self.listed_at: Dict[str, float] = {}
+        self.acknowledged_at: Dict[str, float] = {}
+        self.before_call: Optional[Callable[[str, Dict], None]] = None
+
+    # Mailbox setup
+
+    def add_message(self, message_id: Optional[str] = None, subject: str = 'Hello',
+                    sender: str = 'someone@example.com', thread_id: Optional[str] = None,
+                    body: str = '', unread: bool = True) -> str:
+        """Deliver a message to the inbox, recording a messageAdded history entry"""
+        with self._lock:
+            message_id = message_id or f"{len(self.messages) + 1:016x}"
+            self.history_id += 1
+            labels = ['INBOX', 'UNREAD'] if unread else ['INBOX']
+            self.messages[message_id] = {
+                'id': message_id,
+                'threadId': thread_id or message_id,
+                'labelIds': labels,
+                'historyId': str(self.history_id),
+                'subject': subject,
+                'from': sender,
+                'body': body or f"Message body of {subject}"
+            }
+            self.history.append({'id': str(self.history_id), 'message_id': message_id})
+            return message_id
+
+    def populate(self, count: int, thread_size: int = 3) -> List[str]:
+        """Deliver `count` synthetic messages mixing every category"""
+        message_ids = []
+        for n in range(count):
+            subject, sender = self._rng.choice(SYNTHETIC_MAIL)
+            thread = f"thread-{n // max(1, thread_size):06d}"
+            message_ids.append(self.add_message(subject=subject.format(n=n),
+                                                sender=sender.format(n=n), thread_id=thread))
+        return message_ids
+
+    def fail(self, message_id: str, *statuses: int):
+        """Make the next messages.get calls for `message_id` fail with `statuses`"""
+        with self._lock:
+            self._failures.setdefault(message_id, []).extend(
+                http_error(status, 'rateLimitExceeded' if status == 429 else 'backendError')
+                for status in statuses)
+
+    def expire_history(self):
+        """Drop all history so older startHistoryIds get a 404"""
+        with self._lock:
+            self.history_floor = self.history_id
+            self.history = []
+
+    def unread_ids(self) -> List[str]:
+        with self._lock:
+            return [m['id'] for m in self.messages.values() if 'UNREAD' in m['labelIds']]
+
+    def render(self, message_id: str, format: str = 'full',
+               metadataHeaders: Optional[List[str]] = None) -> Dict:
+        """The message resource as messages.get returns it"""
+        message = self.messages[message_id]
+        resource = {
+            'id': message_id,
+            'threadId': message['threadId'],
+            'labelIds': list(message['labelIds']),
+            'historyId': message['historyId'],
+            'snippet': message['body'][:100]
+        }
+        if format == 'minimal':
+            return resource
+        headers = [{'name': 'Subject', 'value': message['subject']},
+                   {'name': 'From', 'value': message['from']},
+                   {'name': 'To', 'value': 'ens.legis@example.com'}]
+        if format == 'metadata':
+            wanted = {name.lower() for name in (metadataHeaders or [])}
+            if wanted:
+                headers = [h for h in headers if h['name'].lower() in wanted]
+            resource['payload'] = {'mimeType': 'multipart/alternative', 'headers': headers}
+            return resource
+        resource['payload'] = {
+            'mimeType': 'multipart/alternative',
+            'headers': headers,
+            'parts': [
+                {'mimeType': 'text/plain', 'body': {'data': _encode(message['body'])}},
+                {'mimeType': 'text/html', 'body': {'data': _encode(f"<p>{message['body']}</p>")}}
+            ]
+        }
+        return resource
+
+    # googleapiclient interface
+
+    def users(self) -> '_Users':
+        return _Users(self)
+
+    def new_batch_http_request(self, callback: Optional[Callable] = None) -> FakeBatchRequest:
+        return FakeBatchRequest(self, callback)
+
+    # Transport simulation
+
+    def _round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            self.sleep(self.latency)
+
+    def _record_batch(self, message_ids: List[str]):
+        with self._lock:
+            self.batches.append(message_ids)
+
+    def _call(self, request: FakeRequest):
+        if self.before_call:
+            self.before_call(request.method, request.params)
+        with self._lock:
+            self.calls[request.method] += 1
+            self.requests.append((request.method, dict(request.params)))
+            self._charge(QUOTA_UNITS.get(request.method, DEFAULT_QUOTA_UNITS))
+            if self.error_rate and self._rng.random() < self.error_rate:
+                raise http_error(503, 'backendError')
+            return request.handler(**request.params)
+
+    def _charge(self, units: float):
+        if not self.quota_units_per_second:
+            return
+        now = self.clock()
+        self._quota_tokens = min(self.quota_units_per_second,
+                                 self._quota_tokens + (now - self._quota_updated) * self.quota_units_per_second)
+        self._quota_updated = now
+        if self._quota_tokens < units:
+            self.quota_rejections += 1
+            raise http_error(429, 'rateLimitExceeded')
+        self._quota_tokens -= units
+
+    # Method handlers (called with the lock held)
+
+    def _list(self, userId, q=None, maxResults=100, pageToken=None, labelIds=None):
+        if q not in (None, 'is:unread'):
+            raise http_error(400, f'unsupported query {q}')
+        matches = [m for m in self.messages.values() if q is None or 'UNREAD' in m['labelIds']]
+        offset = int(pageToken or 0)
+        page = matches[offset:offset + maxResults]
+        now = self.clock()
+        for message in page:
+            self.listed_at.setdefault(message['id'], now)
+        response = {
+            'messages': [{'id': m['id'], 'threadId': m['threadId']} for m in page],
+            'resultSizeEstimate': len(matches)
+        }
+        if offset + maxResults < len(matches):
+            response['nextPageToken'] = str(offset + maxResults)
+        if not page:
+            del response['messages']
+        return response
+
+    def _get(self, userId, id, format='full', metadataHeaders=None):
+        failures = self._failures.get(id)
+        if failures:
+            raise failures.pop(0)
+        if id not in self.messages:
+            raise http_error(404, 'notFound')
+        return self.render(id, format, metadataHeaders)
+
+    def _change_labels(self, message_id: str, body: Dict):
+        message = self.messages.get(message_id)
+        if message is None:
+            return
+        labels = [l for l in message['labelIds'] if l not in body.get('removeLabelIds', [])]
+        labels += [l for l in body.get('addLabelIds', []) if l not in labels]
+        if 'UNREAD' in message['labelIds'] and 'UNREAD' not in labels:
+            self.acknowledged.append(message_id)
+            self.acknowledged_at[message_id] = self.clock()
+        message['labelIds'] = labels
+        self.history_id += 1
+
+    def _modify(self, userId, id, body):
+        if id not in self.messages:
+            raise http_error(404, 'notFound')
+        self._change_labels(id, body)
+        return self.render(id, 'minimal')
+
+    def _batch_modify(self, userId, body):
+        ids = body.get('ids', [])
+        if len(ids) > 1000:
+            raise http_error(400, 'too many ids')
+        for message_id in ids:
+            self._change_labels(message_id, body)
+        return ''
+
+    def _history_list(self, userId, startHistoryId, historyTypes=None, labelId=None,
+                      pageToken=None, maxResults=100):
+        start = int(startHistoryId)
+        if start < self.history_floor:
+            raise http_error(404, 'notFound')
+        records = [r for r in self.history if int(r['id']) > start]
+        offset = int(pageToken or 0)
+        page = records[offset:offset + maxResults]
+        history = []
+        for record in page:
+            message = self.messages.get(record['message_id'])
+            if message is None or (labelId and labelId not in message['labelIds']):
+                continue
+            history.append({'id': record['id'], 'messagesAdded': [{'message': {
+                'id': message['id'], 'threadId': message['threadId'],
+                'labelIds': list(message['labelIds'])}}]})
+        response = {'history': history, 'historyId': str(self.history_id)}
+        if offset + maxResults < len(records):
+            response['nextPageToken'] = str(offset + maxResults)
+        return response
+
+    def _get_profile(self, userId):
+        return {'emailAddress': 'ens.legis@example.com', 'messagesTotal': len(self.messages),
+                'threadsTotal': len({m['threadId'] for m in self.messages.values()}),
+                'historyId': str(self.history_id)}
+
+
+class _Users:
+    def __init__(self, service: FakeGmailService):
+        self._service = service
+
+    def messages(self) -> _Resource:
+        s = self._service
+        return _Resource(s, 'messages.', {'list': s._list, 'get': s._get, 'modify': s._modify,
+                                          'batchModify': s._batch_modify})
+
+    def history(self) -> _Resource:
+        return _Resource(self._service, 'history.', {'list': self._service._history_list})
+
+    def getProfile(self, **params) -> FakeRequest:
+        return FakeRequest(self._service, 'getProfile', self._service._get_profile, params)
+
+
+def _encode(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Batch Categorization
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import random
+import pandas as pd
+from bots.email_bot import EmailBot, CATEGORY_KEYWORDS, CATEGORY_LEGAL, CATEGORY_MEDIA, CATEGORY_UNKNOWN
+from bots.batch_categorize import keyword_pattern, sender_domains, surveillance_frame
+from bots.domain_index import sender_domain
+
+
+def _bot(tmp_path, monkeypatch) -> EmailBot:
+    media_list = tmp_path / 'media_list.csv'
+    media_list.write_text('cnn.com\nnytimes.com\n')
+    monkeypatch.setattr('bots.email_bot.MEDIA_LIST_PATH', str(media_list))
+    return EmailBot("nonexistent_credentials.json")
+
+
+class TestCategorizeMany:
+    """Test suite for vectorized categorization"""
+
+    def test_matches_categorize_email(self, tmp_path, monkeypatch):
+        """Test that every row gets the same category as categorize_email"""
+        bot = _bot(tmp_path, monkeypatch)
+        rng = random.Random(3)
+        words = sum(CATEGORY_KEYWORDS.values(), []) + ['hello', 're:', 'weekly', 'news']
+        senders = ['Desk <desk@edition.cnn.com>', 'x@notcnn.com', 'a@nytimes.com',
+                   'friend@example.com', '', 'no address']
+        frame = pd.DataFrame({
+            'subject': [' '.join(rng.choice(words) for _ in range(rng.randint(0, 4))).title()
+                        for _ in range(2000)],
+            'from': [rng.choice(senders) for _ in range(2000)]
+        }, index=range(100, 2100))
+        result = bot.categorize_many(frame['subject'], frame['from'])
+        expected = [bot.categorize_email({'subject': s, 'from': f})
+                    for s, f in zip(frame['subject'], frame['from'])]
+        assert list(result.index) == list(frame.index)
+        assert result.tolist() == expected
+
+    def test_snippets_and_missing_values(self, tmp_path, monkeypatch):
+        """Test keyword matches in snippets and tolerance of missing values"""
+        bot = _bot(tmp_path, monkeypatch)
+        result = bot.categorize_many(['Hello', None, 'Hi'], ['a@b.com', None, 'x@cnn.com'],
+                                     snippets=['about my FCRA dispute', None, None])
+        assert result.tolist() == [CATEGORY_LEGAL, CATEGORY_UNKNOWN, CATEGORY_MEDIA]
+
+
+def test_sender_domains_matches_parseaddr():
+    """Test the vectorized fast path against the per-value parser"""
+    senders = ['a@B.com', 'Jane Doe <jane@Edition.CNN.com>', '"Doe, Jane" <j@x.org>',
+               'Reporter (cnn.com) <tips@gmail.com>', 'no address', '', None,
+               'a@b.com, c@d.com', '<x@y.z>', 'x@y.z.', 'Name <a@b.com', '  a@b.com  ']
+    expected = [sender_domain(sender or '') for sender in senders]
+    assert sender_domains(pd.Series(senders, dtype=object)).tolist() == expected
+
+
+def test_keyword_pattern_escapes_literals():
+    """Test that keywords are matched literally, not as regex"""
+    assert keyword_pattern(['a.b', 'C++']) in ('c\\+\\+|a\\.b', 'a\\.b|c\\+\\+')
+    assert keyword_pattern([]) is None
+
+
+def test_surveillance_frame():
+    """Test flattening surveillance entries, keeping only email events"""
+    frame = surveillance_frame([
+        {'incident_id': 'SL-1', 'source': 'email', 'category': 'Legal',
+         'details': {'from': 'a@b.com', 'subject': 'FCRA'}},
+        {'incident_id': 'SL-2', 'source': 'social', 'details': {}}
+    ])
+    assert frame.to_dict('records') == [
+        {'incident_id': 'SL-1', 'category': 'Legal', 'from': 'a@b.com', 'subject': 'FCRA'}]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Body Scan
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import base64
+from bots import body_scan
+from bots.body_scan import iter_text, text_parts
+
+
+def _data(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode().rstrip('=')
+
+
+def _payload(*parts):
+    return {'mimeType': 'multipart/mixed', 'parts': list(parts)}
+
+
+class TestIterText:
+    """Test suite for incremental text decoding"""
+
+    def test_plain_parts_only(self):
+        """Test that attachments and by-reference parts are skipped"""
+        payload = _payload(
+            {'mimeType': 'text/plain', 'body': {'data': _data('Hello there')}},
+            {'mimeType': 'text/html', 'body': {'data': _data('<p>Hello there</p>')}},
+            {'mimeType': 'text/plain', 'filename': 'notes.txt', 'body': {'data': _data('attached')}},
+            {'mimeType': 'application/pdf', 'filename': 'a.pdf', 'body': {'attachmentId': 'x'}}
+        )
+        assert len(text_parts(payload)) == 1
+        assert ''.join(iter_text(payload)).strip() == 'Hello there'
+
+    def test_html_fallback(self):
+        """Test that HTML is reduced to text when there is no plain part"""
+        payload = _payload({'mimeType': 'text/html', 'body': {'data': _data(
+            '<style>.support{}</style><p>Re: your <b>dispute</b></p>')}})
+        text = ''.join(iter_text(payload))
+        assert 'dispute' in text
+        assert 'support' not in text
+
+    def test_byte_budget(self, monkeypatch):
+        """Test that decoding stops once the budget is spent"""
+        monkeypatch.setattr(body_scan, 'DECODE_STEP', 8)
+        payload = _payload({'mimeType': 'text/plain', 'body': {'data': _data('x' * 1000)}})
+        assert len(''.join(iter_text(payload, max_bytes=20))) == 20
+
+    def test_multibyte_split_across_steps(self, monkeypatch):
+        """Test that characters split between decode steps survive"""
+        monkeypatch.setattr(body_scan, 'DECODE_STEP', 4)
+        text = 'café – naïve ☃' * 3
+        payload = _payload({'mimeType': 'text/plain', 'body': {'data': _data(text)}})
+        assert ''.join(iter_text(payload)).strip() == text
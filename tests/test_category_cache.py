@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Categorization Cache
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+from bots.category_cache import CategorizationCache, normalize_subject, overlaps_reply_prefix
+from tests.fake_gmail import FakeClock
+
+
+def test_normalize_subject():
+    """Test that reply prefixes and digit runs are folded away"""
+    assert normalize_subject('Re: Fwd: Invoice #4411 due 03/02') == 'invoice ## due #/#'
+    assert normalize_subject('RE[2]: invoice #4412 due 04/02') == 'invoice ## due #/#'
+    assert normalize_subject('AW:  Patreon pledge 12', keep_digits=True) == 'patreon pledge 12'
+    # Inner whitespace matters to keyword matching, so it is kept
+    assert normalize_subject('credit  report') != normalize_subject('credit report')
+    assert normalize_subject('Re: FCRA ', keep_prefixes=True) == 're: fcra '
+
+
+def test_overlaps_reply_prefix():
+    """Test which keywords could match the text normalize_subject strips"""
+    for keyword in ['re: fcra', ' fcra', 'fcra ', 'RE[', 'fw', 'E', '2']:
+        assert overlaps_reply_prefix(keyword), keyword
+    for keyword in ['fcra', 'credit report', 'invoice', 'refund', '']:
+        assert not overlaps_reply_prefix(keyword), keyword
+
+
+class TestCategorizationCache:
+    """Test suite for the LRU/TTL categorization cache"""
+
+    def test_hits_and_lru_eviction(self):
+        """Test hit counting and that the least recently used entry goes first"""
+        cache = CategorizationCache(max_entries=2, clock=FakeClock())
+        cache.put('a', 'Legal', 'v1')
+        cache.put('b', 'Vendor', 'v1')
+        assert cache.get('a', 'v1') == 'Legal'
+        cache.put('c', 'Media', 'v1')
+        assert cache.get('b', 'v1') is None
+        assert cache.get('a', 'v1') == 'Legal'
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+        assert stats['hit_rate'] == 0.6667
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = CategorizationCache(ttl=10, clock=clock)
+        cache.put('a', 'Legal', 'v1')
+        clock.now = 9.9
+        assert cache.get('a', 'v1') == 'Legal'
+        clock.now = 10
+        assert cache.get('a', 'v1') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_rule_change_invalidates(self):
+        """Test that a new rules version clears every entry"""
+        cache = CategorizationCache(clock=FakeClock())
+        cache.put('a', 'Legal', 'v1')
+        assert cache.get('a', 'v2') is None
+        assert cache.stats()['invalidations'] == 1
+        assert cache.stats()['size'] == 0
+
+    def test_disabled(self):
+        """Test that max_entries=0 turns caching off"""
+        cache = CategorizationCache(max_entries=0)
+        cache.put('a', 'Legal', 'v1')
+        assert cache.get('a', 'v1') is None
+        assert cache.stats()['misses'] == 0
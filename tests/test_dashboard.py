@@ -5,14 +5,21 @@ Tests for the ENS Legis Interactive Dashboard
 
 import os
 import sys
+import gzip
+import base64
 import json
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dashboard import app
+import dashboard
+from dashboard import app, SurveillanceFeed
+from bots.surveillance_store import JsonlSurveillanceStore, encode_cursor
+from bots.surveillance_stats import SurveillanceStatistics
 
 
 class TestDashboardAPI(unittest.TestCase):
@@ -45,6 +52,17 @@ class TestDashboardAPI(unittest.TestCase):
         self.assertIn('status', bot_state)
         self.assertIn('processed_count', bot_state)
         self.assertIn('error_count', bot_state)
+        self.assertIn('throttle', data)
+    
+    def test_status_reports_throttle_state(self):
+        """Test that the Gmail quota limiter and categorization cache state are exposed"""
+        bot = mock.Mock()
+        bot.quota.state.return_value = {'throttled': True, 'paused_for': 2.5}
+        bot.category_cache.stats.return_value = {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+        with mock.patch('dashboard.email_bot', bot):
+            data = json.loads(self.client.get('/api/status').data)
+        self.assertEqual(data['throttle'], {'throttled': True, 'paused_for': 2.5})
+        self.assertEqual(data['categorization_cache']['hit_rate'], 0.75)
     
     def test_logs_endpoint(self):
         """Test logs API endpoint"""
@@ -65,6 +83,152 @@ class TestDashboardAPI(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn('logs', data)
     
+    def test_logs_most_recent_first(self):
+        """Test logs endpoint returns the newest matching entries first"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append_many([
+                {'incident_id': f'SL-{n}', 'category': 'Legal' if n % 2 else 'Media',
+                 'timestamp': '2026-01-14T18:00:00Z'}
+                for n in range(10)
+            ])
+            statistics = SurveillanceStatistics(store, os.path.join(tmp_dir, 'stats.json'))
+            with mock.patch('dashboard.get_surveillance_store', return_value=store), \
+                    mock.patch('dashboard.get_surveillance_statistics', return_value=statistics):
+                response = self.client.get('/api/logs?category=Legal&limit=2')
+                data = json.loads(response.data)
+                self.assertEqual([log['incident_id'] for log in data['logs']], ['SL-9', 'SL-7'])
+                
+                response = self.client.get('/api/statistics')
+                stats = json.loads(response.data)
+                self.assertEqual(stats['total'], 10)
+                self.assertEqual(stats['by_category'], {'Legal': 5, 'Media': 5})
+                self.assertEqual(stats['by_date'], {'2026-01-14': 10})
+                self.assertEqual(stats['recent_activity'][0]['incident_id'], 'SL-9')
+    
+    def test_logs_cursor_pagination(self):
+        """Test paging through logs with before/after cursors"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append_many([{'incident_id': f'SL-{n}', 'category': 'Legal'} for n in range(5)])
+            with mock.patch('dashboard.get_surveillance_store', return_value=store):
+                data = json.loads(self.client.get('/api/logs?limit=3').data)
+                self.assertEqual([log['incident_id'] for log in data['logs']], ['SL-4', 'SL-3', 'SL-2'])
+                
+                older = json.loads(self.client.get(f"/api/logs?limit=3&before={data['next_cursor']}").data)
+                self.assertEqual([log['incident_id'] for log in older['logs']], ['SL-1', 'SL-0'])
+                self.assertIsNone(older['next_cursor'])
+                
+                store.append({'incident_id': 'SL-5', 'category': 'Legal'})
+                new = json.loads(self.client.get(f"/api/logs?after={data['latest_cursor']}").data)
+                self.assertEqual([log['incident_id'] for log in new['logs']], ['SL-5'])
+                
+                again = json.loads(self.client.get(f"/api/logs?after={new['latest_cursor']}").data)
+                self.assertEqual(again['logs'], [])
+    
+    def test_logs_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get('/api/logs?before=%%%')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_export_streams_ndjson_and_csv(self):
+        """Test bulk export in NDJSON, CSV and gzip with filters"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append_many([
+                {'incident_id': f'SL-{n}', 'category': 'Legal' if n % 2 else 'Media',
+                 'timestamp': f'2026-01-{10 + n:02d}T12:00:00Z',
+                 'details': {'subject': f'Subject, {n}'}}
+                for n in range(6)
+            ])
+            with mock.patch('dashboard.get_surveillance_store', return_value=store):
+                response = self.client.get('/api/logs/export?category=Legal')
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('attachment', response.headers['Content-Disposition'])
+                lines = response.data.decode().splitlines()
+                self.assertEqual([json.loads(line)['incident_id'] for line in lines], ['SL-1', 'SL-3', 'SL-5'])
+                
+                response = self.client.get('/api/logs/export?format=csv&since=2026-01-12&until=2026-01-14')
+                rows = response.data.decode().splitlines()
+                self.assertTrue(rows[0].startswith('incident_id,timestamp'))
+                self.assertEqual(len(rows), 3)
+                self.assertIn('"Subject, 2"', rows[1])
+                
+                response = self.client.get('/api/logs/export?gzip=1')
+                self.assertEqual(response.mimetype, 'application/gzip')
+                self.assertEqual(len(gzip.decompress(response.data).splitlines()), 6)
+    
+    def test_export_rejects_unknown_format(self):
+        """Test that unsupported export formats are rejected"""
+        response = self.client.get('/api/logs/export?format=xml')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_events_stream_pushes_new_entries(self):
+        """Test the SSE feed sends status on connect and entries as they are written"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append({'incident_id': 'SL-0', 'category': 'Legal'})
+            statistics = SurveillanceStatistics(store, os.path.join(tmp_dir, 'stats.json'))
+            feed = SurveillanceFeed(store, dashboard.broadcaster)
+            with mock.patch('dashboard.get_surveillance_feed', return_value=feed), \
+                    mock.patch('dashboard.get_surveillance_statistics', return_value=statistics):
+                response = self.client.get('/api/events', buffered=False)
+                self.assertEqual(response.mimetype, 'text/event-stream')
+                chunks = response.response
+                self.assertIn('event: status', self._next_chunk(chunks))
+                
+                store.append({'incident_id': 'SL-1', 'category': 'Media'})
+                message = self._next_chunk(chunks)
+                self.assertIn('event: entries', message)
+                self.assertIn('SL-1', message)
+                self.assertNotIn('SL-0', message)
+                self.assertIn('event: statistics', self._next_chunk(chunks))
+                response.close()
+    
+    def test_events_stream_replays_after_cursor(self):
+        """Test that a reconnecting client receives entries it missed"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append_many([{'incident_id': f'SL-{n}'} for n in range(3)])
+            first_key = next(store.iter_after(-1))[0]
+            feed = SurveillanceFeed(store, dashboard.broadcaster)
+            with mock.patch('dashboard.get_surveillance_feed', return_value=feed):
+                response = self.client.get('/api/events', buffered=False,
+                                           headers={'Last-Event-ID': encode_cursor(first_key)})
+                chunks = response.response
+                self._next_chunk(chunks)
+                message = self._next_chunk(chunks)
+                payload = json.loads(message.split('data: ', 1)[1])
+                self.assertEqual([entry['incident_id'] for entry in payload['entries']], ['SL-1', 'SL-2'])
+                response.close()
+    
+    def test_events_stream_replays_long_backlog_in_pages(self):
+        """Test that a client more than one replay page behind misses nothing"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = JsonlSurveillanceStore(os.path.join(tmp_dir, 'log.jsonl'))
+            store.append_many([{'incident_id': f'SL-{n}'} for n in range(2 * dashboard.SSE_REPLAY_LIMIT + 3)])
+            first_key = next(store.iter_after(-1))[0]
+            feed = SurveillanceFeed(store, dashboard.broadcaster)
+            with mock.patch('dashboard.get_surveillance_feed', return_value=feed):
+                response = self.client.get('/api/events', buffered=False,
+                                           headers={'Last-Event-ID': encode_cursor(first_key)})
+                chunks = response.response
+                self._next_chunk(chunks)
+                replayed = []
+                for _ in range(3):
+                    message = self._next_chunk(chunks)
+                    self.assertIn('event: entries', message)
+                    payload = json.loads(message.split('data: ', 1)[1])
+                    replayed.extend(entry['incident_id'] for entry in payload['entries'])
+                self.assertEqual(replayed, [f'SL-{n}' for n in range(1, 2 * dashboard.SSE_REPLAY_LIMIT + 3)])
+                self.assertEqual(payload['cursor'], encode_cursor(store.last_key()))
+                response.close()
+    
+    @staticmethod
+    def _next_chunk(chunks):
+        chunk = next(chunks)
+        return chunk.decode() if isinstance(chunk, bytes) else chunk
+    
     def test_statistics_endpoint(self):
         """Test statistics API endpoint"""
         response = self.client.get('/api/statistics')
@@ -84,6 +248,21 @@ class TestDashboardAPI(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIsInstance(data, dict)
     
+    def test_config_post_validates_and_writes_atomically(self):
+        """Test that config updates are validated and replace the file whole"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch('dashboard.CONFIG_DIR', Path(tmp)), \
+                mock.patch('dashboard.email_bot', None):
+            bad = self.client.post('/api/config', json={'rules': {'keywords': {'Legal': 'fcra'}}})
+            self.assertEqual(bad.status_code, 400)
+            self.assertFalse((Path(tmp) / 'email_config.json').exists())
+            
+            config = {'fetch_batch_size': 25, 'rules': {'keywords': {'Legal': ['subpoena']}}}
+            response = self.client.post('/api/config', json=config)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads((Path(tmp) / 'email_config.json').read_text()), config)
+            self.assertEqual(os.listdir(tmp), ['email_config.json'])
+    
     def test_bot_stop_when_not_running(self):
         """Test stopping bot when it's not running"""
         response = self.client.post('/api/bot/stop')
@@ -92,6 +271,54 @@ class TestDashboardAPI(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn('error', data)
 
+    
+    def test_bot_stop_wakes_scheduler(self):
+        """Test that stopping wakes the polling loop instead of waiting out its sleep"""
+        scheduler = mock.Mock()
+        with mock.patch.dict('dashboard.bot_state', running=True, status='running'), \
+                mock.patch('dashboard.poll_scheduler', scheduler):
+            response = self.client.post('/api/bot/stop')
+        self.assertEqual(response.status_code, 200)
+        scheduler.wake.assert_called_once_with(dashboard.WAKE_STOP)
+    
+    def test_process_now_wakes_running_bot(self):
+        """Test that process-now hands off to the running loop"""
+        scheduler = mock.Mock()
+        with mock.patch.dict('dashboard.bot_state', running=True), \
+                mock.patch('dashboard.poll_scheduler', scheduler):
+            response = self.client.post('/api/bot/process-now')
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(json.loads(response.data)['success'])
+        scheduler.wake.assert_called_once_with(dashboard.WAKE_PROCESS_NOW)
+    
+    def test_gmail_push_wakes_scheduler(self):
+        """Test that a Pub/Sub push notification triggers an immediate sync"""
+        scheduler = mock.Mock()
+        data = base64.b64encode(json.dumps({'emailAddress': 'a@b.c', 'historyId': 42}).encode()).decode()
+        envelope = {'message': {'data': data, 'messageId': '1'}, 'subscription': 'projects/p/subscriptions/s'}
+        with mock.patch.dict('dashboard.bot_state', running=True), \
+                mock.patch('dashboard.poll_scheduler', scheduler), \
+                mock.patch('dashboard.GMAIL_PUSH_TOKEN', 'secret'):
+            denied = self.client.post('/api/gmail/push', json=envelope)
+            malformed = self.client.post('/api/gmail/push?token=secret', json={'message': {'data': '!!'}})
+            scheduler.wake.assert_not_called()
+            response = self.client.post('/api/gmail/push?token=secret', json=envelope)
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(malformed.status_code, 400)
+        self.assertEqual(response.status_code, 204)
+        scheduler.wake.assert_called_once_with(dashboard.WAKE_PUSH)
+    
+    def test_gmail_push_disabled_without_token(self):
+        """Test that the push endpoint refuses every request when no token is configured"""
+        scheduler = mock.Mock()
+        data = base64.b64encode(json.dumps({'historyId': 42}).encode()).decode()
+        with mock.patch.dict('dashboard.bot_state', running=True), \
+                mock.patch('dashboard.poll_scheduler', scheduler), \
+                mock.patch('dashboard.GMAIL_PUSH_TOKEN', None):
+            response = self.client.post('/api/gmail/push?token=', json={'message': {'data': data}})
+        self.assertEqual(response.status_code, 404)
+        scheduler.wake.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
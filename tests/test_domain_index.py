@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Domain Index
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+from bots.domain_index import DomainSuffixIndex, normalize_domain, sender_domain
+
+
+class TestDomainSuffixIndex:
+    """Test suite for whole-label domain suffix matching"""
+
+    def test_matches_domain_and_subdomains(self):
+        """Test exact and subdomain matches, and no partial-label matches"""
+        index = DomainSuffixIndex(['cnn.com', 'NYTimes.com', 'bbc.co.uk'])
+        assert index.match('cnn.com') == 'cnn.com'
+        assert index.match('edition.cnn.com') == 'cnn.com'
+        assert index.match('mail.nytimes.com.') == 'nytimes.com'
+        assert 'news.bbc.co.uk' in index
+        assert 'notcnn.com' not in index
+        assert 'cnn.com.evil' not in index
+        assert 'co.uk' not in index
+        assert '' not in index
+
+    def test_from_file(self, tmp_path):
+        """Test loading a CSV with a header, comments and extra columns"""
+        path = tmp_path / 'media_list.csv'
+        path.write_text('domain,outlet\n# wire services\napnews.com,AP\n\n*.reuters.com,Reuters\n')
+        index = DomainSuffixIndex.from_file(str(path))
+        assert len(index) == 2
+        assert 'www.reuters.com' in index
+        assert 'apnews.com' in index
+        assert len(DomainSuffixIndex.from_file(str(tmp_path / 'missing.csv'))) == 0
+
+    def test_large_list(self):
+        """Test tens of thousands of domains"""
+        index = DomainSuffixIndex(f'outlet{i}.example' for i in range(50000))
+        assert index.match('desk.outlet49999.example') == 'outlet49999.example'
+        assert 'outlet50000.example' not in index
+
+
+def test_sender_domain_parses_from_header():
+    """Test extracting the domain from real From header values"""
+    assert sender_domain('"News Desk" <Desk@News.CNN.com>') == 'news.cnn.com'
+    assert sender_domain('reporter@nytimes.com') == 'nytimes.com'
+    assert sender_domain('Reporter (cnn.com) <tips@gmail.com>') == 'gmail.com'
+    assert sender_domain('no address here') == ''
+    assert normalize_domain(' @Example.COM. ') == 'example.com'
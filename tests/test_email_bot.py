@@ -5,8 +5,38 @@ Tests for ENS Legis Email Bot
 Part of AI Clone OS - Incrimination Nation Campaign
 """
 
+import json
+import threading
 import pytest
 from bots.email_bot import EmailBot, CATEGORY_LEGAL, CATEGORY_MEDIA, CATEGORY_SUPPORTER, CATEGORY_VENDOR, CATEGORY_UNKNOWN
+from bots.surveillance_store import JsonlSurveillanceStore
+from bots.incident_ids import IncidentIdAllocator
+from bots.gmail_sync import SyncCheckpoint
+from bots.gmail_quota import QuotaRateLimiter
+from bots.processed_index import ProcessedMessageIndex
+from tests.fake_gmail import FakeClock, FakeGmailService
+
+
+def _mailbox(message_ids, clock=None, **kwargs) -> FakeGmailService:
+    """Fake mailbox of unread vendor invoices with the given IDs"""
+    clock = clock or FakeClock()
+    service = FakeGmailService(clock=clock.time, sleep=clock.sleep, **kwargs)
+    service.fake_clock = clock
+    for message_id in message_ids:
+        service.add_message(message_id, subject='Invoice ' + message_id, sender='billing@vendor.com')
+    return service
+
+
+def _bot_with_service(tmp_path, service, **config) -> EmailBot:
+    store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+    incident_ids = IncidentIdAllocator(str(tmp_path / 'counter.json'))
+    clock = service.fake_clock
+    bot = EmailBot("nonexistent_credentials.json", store=store, incident_ids=incident_ids,
+                   sync_checkpoint=SyncCheckpoint(str(tmp_path / 'sync.json')),
+                   quota=QuotaRateLimiter(clock=clock.time, sleep=clock.sleep), service=service,
+                   processed_index=ProcessedMessageIndex(str(tmp_path / 'processed.db')))
+    bot.config.update(config)
+    return bot
 
 
 class TestEmailBot:
@@ -67,6 +97,74 @@ class TestEmailBot:
         category = bot.categorize_email(email)
         assert category == CATEGORY_VENDOR
     
+    def test_categorize_media_by_sender_domain(self, tmp_path, monkeypatch):
+        """Test media matching on the From address domain, and reloading the list"""
+        media_list = tmp_path / 'media_list.csv'
+        media_list.write_text('cnn.com\n')
+        monkeypatch.setattr('bots.email_bot.MEDIA_LIST_PATH', str(media_list))
+        bot = EmailBot("nonexistent_credentials.json")
+        
+        assert bot.categorize_email({'subject': 'Interview request',
+                                     'from': 'Jane Doe <jane@edition.cnn.com>'}) == CATEGORY_MEDIA
+        assert bot.categorize_email({'subject': 'Interview request',
+                                     'from': 'jane@notcnn.com.evil'}) == CATEGORY_UNKNOWN
+        # Legal still takes precedence over media
+        assert bot.categorize_email({'subject': 'FCRA question',
+                                     'from': 'jane@cnn.com'}) == CATEGORY_LEGAL
+        
+        media_list.write_text('cnn.com\nnytimes.com\n')
+        assert bot.reload_media_list() == 2
+        assert bot.categorize_email({'subject': 'Hi', 'from': 'x@nytimes.com'}) == CATEGORY_MEDIA
+    
+    def test_config_changes_apply_without_restart(self, tmp_path, monkeypatch):
+        """Test that editing email_config.json changes rules and templates mid-run"""
+        config_path = tmp_path / 'email_config.json'
+        monkeypatch.setattr('bots.email_bot.CONFIG_PATH', str(config_path))
+        service = _mailbox(['m0'])
+        bot = _bot_with_service(tmp_path, service)
+        assert bot.categorize_email({'subject': 'Invoice m0', 'from': 'a@b.com'}) == CATEGORY_VENDOR
+        
+        config_path.write_text(json.dumps({
+            'fetch_batch_size': 7,
+            'rules': {'templates': {CATEGORY_VENDOR: 'Thank-You-Patron'}}
+        }))
+        bot.process_inbox()
+        assert bot.config['fetch_batch_size'] == 7
+        entry = next(bot.store.iter_entries())
+        assert entry['details']['action_taken'] == f"auto_response_sent: {CATEGORY_VENDOR}"
+    
+    def test_categorize_caches_near_identical_mail(self, tmp_path, monkeypatch):
+        """Test cache hits for repeat notices and invalidation when rules change"""
+        config_path = tmp_path / 'email_config.json'
+        monkeypatch.setattr('bots.email_bot.CONFIG_PATH', str(config_path))
+        bot = EmailBot("nonexistent_credentials.json")
+        for number in range(5):
+            email = {'subject': f'Re: Invoice #{1000 + number}', 'from': f'Billing <b{number}@vendor.com>'}
+            assert bot.categorize_email(email) == CATEGORY_VENDOR
+        assert bot.category_cache.stats()['hits'] == 4
+        
+        config_path.write_text(json.dumps({'rules': {'keywords': {CATEGORY_LEGAL: ['invoice']}}}))
+        bot.refresh_rules()
+        assert bot.categorize_email({'subject': 'Invoice #1005', 'from': 'b@vendor.com'}) == CATEGORY_LEGAL
+        assert bot.category_cache.stats()['invalidations'] == 1
+    
+    def test_categorize_cache_keeps_prefixes_for_prefix_keywords(self, tmp_path, monkeypatch):
+        """Test that a keyword spanning a reply prefix is not folded into the cache key"""
+        config_path = tmp_path / 'email_config.json'
+        config_path.write_text(json.dumps({'rules': {'keywords': {CATEGORY_LEGAL: ['re: fcra']}}}))
+        monkeypatch.setattr('bots.email_bot.CONFIG_PATH', str(config_path))
+        bot = EmailBot("nonexistent_credentials.json")
+        assert bot.rules.prefix_sensitive
+        assert bot.categorize_email({'subject': 'Re: FCRA', 'from': 'a@b.com'}) == CATEGORY_LEGAL
+        assert bot.categorize_email({'subject': 'FCRA', 'from': 'a@b.com'}) == CATEGORY_UNKNOWN
+        assert bot.categorize_email({'subject': 'FCRA ', 'from': 'a@b.com'}) == CATEGORY_UNKNOWN
+    
+    def test_categorize_keeps_precedence(self):
+        """Test Legal > Supporter > Vendor when a subject matches several categories"""
+        bot = EmailBot("nonexistent_credentials.json")
+        assert bot.categorize_email({'subject': 'Invoice for your attorney', 'from': 'a@b.com'}) == CATEGORY_LEGAL
+        assert bot.categorize_email({'subject': 'Stripe payment: Patreon support', 'from': 'a@b.com'}) == CATEGORY_SUPPORTER
+    
     def test_categorize_unknown_email(self):
         """Test categorization of unknown emails"""
         bot = EmailBot("nonexistent_credentials.json")
@@ -89,3 +187,392 @@ class TestEmailBot:
         bot = EmailBot("nonexistent_credentials.json")
         template = bot.get_template("NonexistentTemplate")
         assert template is None
+    
+    def test_buffered_logging_groups_entries(self, tmp_path):
+        """Test that surveillance entries inside a run are written on flush"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        incident_ids = IncidentIdAllocator(str(tmp_path / 'counter.json'))
+        bot = EmailBot("nonexistent_credentials.json", store=store, incident_ids=incident_ids)
+        email = {'id': 'msg-1', 'subject': 'FCRA dispute', 'from': 'user@example.com'}
+        
+        with bot.buffered_logging():
+            bot.log_to_surveillance(email, CATEGORY_LEGAL, 'categorized_only: Legal')
+            bot.log_to_surveillance(email, CATEGORY_LEGAL, 'categorized_only: Legal')
+            assert list(store.iter_entries()) == []
+        
+        entries = list(store.iter_entries())
+        assert len(entries) == 2
+        assert entries[0]['incident_id'] != entries[1]['incident_id']
+    
+    def test_process_inbox_fetches_in_batches(self, tmp_path):
+        """Test that messages are fetched fetch_batch_size at a time"""
+        service = _mailbox([f'm{i}' for i in range(7)])
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=3)
+        
+        bot.process_inbox(max_results=7)
+        
+        assert service.batches == [['m0', 'm1', 'm2'], ['m3', 'm4', 'm5'], ['m6']]
+        assert service.acknowledged == [f'm{i}' for i in range(7)]
+        assert service.calls['messages.batchModify'] == 3
+        assert len(list(bot.store.iter_entries())) == 7
+    
+    def test_process_inbox_batch_item_errors(self, tmp_path):
+        """Test that failed batch items are retried or left unread"""
+        service = _mailbox(['m0', 'm1', 'm2'])
+        service.fail('m1', 429)
+        service.fail('m2', 404)
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=50)
+        
+        bot.process_inbox()
+        
+        # m1 was rate limited once and retried alone after a backoff; m2 is not retryable
+        assert service.batches == [['m0', 'm1', 'm2'], ['m1']]
+        sleeps = service.fake_clock.sleeps
+        assert len(sleeps) == 1 and 0.5 <= sleeps[0] <= 1.0
+        assert bot.quota.state()['last_error_status'] == 429
+        assert service.acknowledged == ['m0', 'm1']
+        logged = [entry['details']['message_id'] for entry in bot.store.iter_entries()]
+        assert logged == ['m0', 'm1']
+    
+    def test_process_inbox_acknowledges_after_logging(self, tmp_path):
+        """Test that log entries are flushed before a chunk is marked read"""
+        service = _mailbox(['m0', 'm1'])
+        bot = _bot_with_service(tmp_path, service, log_flush_entries=100)
+        logged_at_ack = []
+        
+        def before_call(method, params):
+            if method == 'messages.batchModify':
+                logged_at_ack.append(len(list(bot.store.iter_entries())))
+        
+        service.before_call = before_call
+        bot.process_inbox()
+        assert logged_at_ack == [2]
+    
+    def test_process_inbox_failed_processing_stays_unread(self, tmp_path):
+        """Test that a message whose handling raises is not acknowledged"""
+        service = _mailbox(['m0', 'm1', 'm2'])
+        bot = _bot_with_service(tmp_path, service)
+        original = bot._handle_message
+        
+        def handle(email_data, category):
+            if email_data['id'] == 'm1':
+                raise ValueError('boom')
+            return original(email_data, category)
+        
+        bot._handle_message = handle
+        bot.process_inbox()
+        assert service.acknowledged == ['m0', 'm2']
+        assert service.unread_ids() == ['m1']
+        assert service.calls['messages.batchModify'] == 1
+    
+    def test_history_sync(self, tmp_path):
+        """Test full sync on first run, then incremental history sync"""
+        service = _mailbox(['m0', 'm1'])
+        bot = _bot_with_service(tmp_path, service, sync_mode='history', fetch_retries=1)
+        
+        bot.process_inbox()
+        assert service.acknowledged == ['m0', 'm1']
+        checkpoint = bot.sync_checkpoint.load()
+        assert checkpoint['retry'] == [] and checkpoint['history_id'] == '1002'
+        assert service.calls['history.list'] == 0
+        
+        # A message already read in the Gmail UI is still picked up from history
+        service.add_message('m2', subject='FCRA dispute', unread=False)
+        service.fail('m2', 500, 500)
+        bot.process_inbox()
+        history_calls = [params for method, params in service.requests if method == 'history.list']
+        assert history_calls[0]['startHistoryId'] == '1002'
+        assert bot.sync_checkpoint.load() == {'history_id': str(service.history_id), 'retry': ['m2']}
+        
+        # The failed message is retried from the checkpoint even with no new history
+        bot.process_inbox()
+        assert [e['details']['message_id'] for e in bot.store.iter_entries()] == ['m0', 'm1', 'm2']
+        assert bot.sync_checkpoint.load()['retry'] == []
+        assert service.calls['messages.list'] == 1
+    
+    def test_history_sync_expired_checkpoint(self, tmp_path):
+        """Test that an expired historyId triggers a full resync"""
+        service = _mailbox(['m0'])
+        service.expire_history()
+        bot = _bot_with_service(tmp_path, service, sync_mode='history')
+        bot.sync_checkpoint.save('1')
+        
+        bot.process_inbox()
+        assert service.acknowledged == ['m0']
+        assert service.calls['history.list'] == 1
+        assert service.calls['getProfile'] == 1
+        assert bot.sync_checkpoint.load()['history_id'] == '1001'
+    
+    def test_history_full_sync_drains_all_pages(self, tmp_path):
+        """Test that a multi-page full resync in history mode leaves nothing unread"""
+        message_ids = [f'm{i:02d}' for i in range(25)]
+        service = _mailbox(message_ids)
+        bot = _bot_with_service(tmp_path, service, sync_mode='history',
+                                list_page_size=10, fetch_batch_size=5)
+        
+        assert bot.process_inbox() == 25
+        assert service.unread_ids() == []
+        assert sorted(service.acknowledged) == message_ids
+        assert len(list(bot.store.iter_entries())) == 25
+        assert bot.sync_checkpoint.load() == {'history_id': '1025', 'retry': []}
+        
+        # The next run syncs from history and finds nothing left behind
+        assert bot.process_inbox() == 0
+    
+    def test_process_inbox_drains_all_pages(self, tmp_path):
+        """Test that the whole backlog is processed in one run"""
+        service = _mailbox([f'm{i}' for i in range(25)])
+        bot = _bot_with_service(tmp_path, service, list_page_size=10, fetch_batch_size=4)
+        
+        bot.process_inbox()
+        
+        assert sorted(service.acknowledged) == sorted(service.messages)
+        assert len(service.acknowledged) == 25
+        assert max(len(batch) for batch in service.batches) == 4
+        assert len(list(bot.store.iter_entries())) == 25
+    
+    def test_process_inbox_max_results(self, tmp_path):
+        """Test that max_results caps how many messages one run lists"""
+        service = _mailbox([f'm{i}' for i in range(25)])
+        bot = _bot_with_service(tmp_path, service, list_page_size=10)
+        
+        bot.process_inbox(max_results=12)
+        
+        assert len(service.acknowledged) == 12
+    
+    def test_process_inbox_fetches_metadata_then_bodies(self, tmp_path):
+        """Test metadata-only fetches, with full bodies only for opted-in categories"""
+        service = _mailbox(['m0', 'm2'])
+        service.add_message('m1', subject='FCRA dispute', body='Body text')
+        bot = _bot_with_service(tmp_path, service)
+        bot.process_inbox()
+        assert {params['format'] for method, params in service.requests
+                if method == 'messages.get'} == {'metadata'}
+        metadata_hash = bot.processed_index.lookup('m1')['evidence_hash']
+        
+        service = _mailbox(['m0', 'm2'])
+        service.add_message('m1', subject='FCRA dispute', body='Body text')
+        bot = _bot_with_service(tmp_path / 'bodies', service, full_body_categories=[CATEGORY_LEGAL])
+        
+        bot.process_inbox()
+        
+        gets = [params for method, params in service.requests if method == 'messages.get']
+        assert [(g['id'], g['format']) for g in gets] == [
+            ('m0', 'metadata'), ('m2', 'metadata'), ('m1', 'metadata'), ('m1', 'full')]
+        assert gets[0]['metadataHeaders'] == ['Subject', 'From']
+        assert service.batches == [['m0', 'm2', 'm1'], ['m1']]
+        assert service.acknowledged == ['m0', 'm2', 'm1']
+        # The body is part of what the evidence hash covers
+        assert bot.processed_index.lookup('m1')['evidence_hash'] != metadata_hash
+    
+    def test_failed_log_write_is_not_indexed(self, tmp_path):
+        """Test that messages whose log entries could not be written are handled again"""
+        service = _mailbox(['m0', 'm1'])
+        bot = _bot_with_service(tmp_path, service)
+        write_entries = bot.store._write_entries
+        
+        def disk_full(entries, fsync=False):
+            raise OSError('No space left on device')
+        bot.store._write_entries = disk_full
+        with pytest.raises(OSError):
+            bot.process_inbox()
+        assert list(bot.store.iter_entries()) == []
+        assert 'm0' not in bot.processed_index
+        assert 'm0' not in ProcessedMessageIndex(str(tmp_path / 'processed.db'))
+        assert service.unread_ids() == ['m0', 'm1']
+        
+        bot.store._write_entries = write_entries
+        assert bot.process_inbox() == 2
+        assert [e['details']['message_id'] for e in bot.store.iter_entries()] == ['m0', 'm1']
+        assert service.unread_ids() == []
+    
+    def test_crash_before_mark_read_is_not_reprocessed(self, tmp_path):
+        """Test that messages logged before a crash are only acknowledged on the next run"""
+        service = _mailbox(['m0', 'm1', 'm2'])
+        bot = _bot_with_service(tmp_path, service)
+        
+        def crash(method, params):
+            if method == 'messages.batchModify':
+                raise RuntimeError('killed before marking read')
+        service.before_call = crash
+        with pytest.raises(RuntimeError):
+            bot.process_inbox()
+        assert len(list(bot.store.iter_entries())) == 3
+        assert service.unread_ids() == ['m0', 'm1', 'm2']
+        
+        # A fresh bot (new process) sharing the same index file
+        service.before_call = None
+        service.requests.clear()
+        rerun = _bot_with_service(tmp_path, service)
+        assert rerun.process_inbox() == 3
+        assert len(list(rerun.store.iter_entries())) == 3
+        assert not [p for method, p in service.requests if method == 'messages.get']
+        assert service.unread_ids() == []
+        assert rerun.processed_index.lookup('m1')['category'] == CATEGORY_VENDOR
+    
+    def test_body_analysis_recategorizes_unknown(self, tmp_path):
+        """Test that a generic subject is categorized from its body when enabled"""
+        service = _mailbox([])
+        service.add_message('m0', subject='Quick question', body='Is this an FCRA violation?')
+        service.add_message('m1', subject='Quick question', body='Nothing special')
+        bot = _bot_with_service(tmp_path, service)
+        bot.process_inbox()
+        assert {e['category'] for e in bot.store.iter_entries()} == {CATEGORY_UNKNOWN}
+        
+        service = _mailbox([])
+        service.add_message('m0', subject='Quick question', body='Is this an FCRA violation?')
+        service.add_message('m1', subject='Quick question', body='Nothing special')
+        bot = _bot_with_service(tmp_path / 'analyzed', service, body_analysis={'max_bytes': 4096})
+        bot.process_inbox()
+        categories = {e['details']['message_id']: e['category'] for e in bot.store.iter_entries()}
+        assert categories == {'m0': CATEGORY_LEGAL, 'm1': CATEGORY_UNKNOWN}
+        assert service.acknowledged == ['m0', 'm1']
+    
+    def test_categorize_body_respects_budget(self):
+        """Test that keywords beyond the byte budget are not seen"""
+        bot = EmailBot("nonexistent_credentials.json")
+        service = _mailbox([])
+        message_id = service.add_message(body='x' * 100 + ' invoice')
+        payload = service.render(message_id)['payload']
+        assert bot.categorize_body(payload) == CATEGORY_VENDOR
+        bot.config['body_analysis'] = {'max_bytes': 50}
+        assert bot.categorize_body(payload) is None
+    
+    def test_parse_email_headers_case_insensitive(self):
+        """Test that header lookup ignores case and keeps the first value"""
+        bot = EmailBot("nonexistent_credentials.json")
+        email = bot._parse_email({'id': 'm0', 'payload': {'headers': [
+            {'name': 'SUBJECT', 'value': 'First'},
+            {'name': 'subject', 'value': 'Second'},
+            {'name': 'from', 'value': 'user@example.com'}
+        ]}})
+        assert email['subject'] == 'First'
+        assert email['from'] == 'user@example.com'
+    
+    def test_extract_text_plain_parts_only(self):
+        """Test that only text/plain parts are decoded into the body"""
+        service = _mailbox([])
+        message_id = service.add_message(body='Body text')
+        assert EmailBot._extract_text(service.render(message_id)['payload']) == 'Body text'
+    
+    def test_process_inbox_concurrently(self, tmp_path):
+        """Test the worker-pool mode: every message handled, logged once, in thread order"""
+        service = _mailbox([])
+        message_ids = [f'm{i:02d}' for i in range(40)]
+        for i, message_id in enumerate(message_ids):
+            service.add_message(message_id, subject='FCRA dispute' if i % 5 == 0 else 'Invoice',
+                                thread_id=f't{i % 4}')
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=6, list_page_size=500,
+                                concurrency={'fetch': 3, 'handle': 4})
+        
+        bot.process_inbox()
+        
+        assert sorted(service.acknowledged) == message_ids
+        logged = [entry['details']['message_id'] for entry in bot.store.iter_entries()]
+        assert sorted(logged) == message_ids
+        for thread in range(4):
+            in_thread = [m for m in logged if service.messages[m]['threadId'] == f't{thread}']
+            assert in_thread == sorted(in_thread)
+    
+    def test_process_inbox_acknowledges_chunks_in_parallel(self, tmp_path):
+        """Test that acknowledge workers mark different chunks read at the same time"""
+        service = _mailbox([f'm{i}' for i in range(12)])
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=3,
+                                concurrency={'fetch': 2, 'handle': 2, 'acknowledge': 2})
+        # The first two batchModify calls only return once both are in flight
+        both_in_flight = threading.Barrier(2, timeout=5)
+        waiting = []
+        
+        def overlap(method, params):
+            if method == 'messages.batchModify' and len(waiting) < 2:
+                waiting.append(params['body']['ids'])
+                both_in_flight.wait()
+        service.before_call = overlap
+        
+        assert bot.process_inbox() == 12
+        assert not both_in_flight.broken
+        assert service.unread_ids() == []
+    
+    def test_process_inbox_concurrently_keeps_failures_unread(self, tmp_path):
+        """Test that failed messages are not acknowledged in worker-pool mode"""
+        service = _mailbox([f'm{i}' for i in range(10)])
+        service.fail('m4', 400)
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=3,
+                                concurrency={'fetch': 2, 'handle': 2})
+        
+        bot.process_inbox()
+        
+        assert service.unread_ids() == ['m4']
+    
+    def test_acknowledge_commits_only_logged_records(self, tmp_path):
+        """Test that records staged during the log flush are not committed ahead of their entries"""
+        service = _mailbox(['m1'])
+        bot = _bot_with_service(tmp_path, service)
+        
+        with bot.buffered_logging() as writer:
+            flush = writer.flush
+            
+            def flush_while_handling(fsync=None):
+                flush(fsync)
+                # Another handle worker logs and stages a message meanwhile
+                writer.write({'incident_id': 'SL-late', 'details': {'message_id': 'late'}})
+                bot.processed_index.add('late')
+            
+            writer.flush = flush_while_handling
+            bot.processed_index.add('m1')
+            assert bot._acknowledge(['m1']) == ['m1']
+            writer.flush = flush
+            
+            committed = ProcessedMessageIndex(str(tmp_path / 'processed.db'))
+            assert 'm1' in committed
+            assert 'late' not in committed
+        
+        bot.processed_index.flush()
+        committed.refresh()
+        assert 'late' in committed
+        assert [entry['incident_id'] for entry in bot.store.iter_entries()] == ['SL-late']
+    
+    def test_concurrent_fetch_error_is_retried_in_history_mode(self, tmp_path):
+        """Test that a chunk whose fetch raises stays in the checkpoint's retry list"""
+        service = _mailbox([f'm{i}' for i in range(9)])
+        bot = _bot_with_service(tmp_path, service, sync_mode='history', fetch_batch_size=3,
+                                concurrency={'fetch': 2, 'handle': 2})
+        
+        def drop_connection(method, params):
+            if method == 'messages.get' and params['id'] == 'm6':
+                service.before_call = None
+                raise ConnectionError('connection reset')
+        service.before_call = drop_connection
+        
+        bot.process_inbox()
+        assert service.unread_ids() == ['m6', 'm7', 'm8']
+        assert sorted(bot.sync_checkpoint.load()['retry']) == ['m6', 'm7', 'm8']
+        
+        bot.process_inbox()
+        assert service.unread_ids() == []
+        assert bot.sync_checkpoint.load()['retry'] == []
+    
+    def test_process_inbox_synthetic_mailbox_with_errors(self, tmp_path):
+        """Test a mixed synthetic backlog under random errors and a tight quota"""
+        clock = FakeClock()
+        service = FakeGmailService(error_rate=0.05, quota_units_per_second=250, seed=3,
+                                   clock=clock.time, sleep=clock.sleep)
+        service.fake_clock = clock
+        message_ids = service.populate(120)
+        bot = _bot_with_service(tmp_path, service, fetch_batch_size=50)
+        
+        bot.process_inbox()
+        
+        logged = [entry['details']['message_id'] for entry in bot.store.iter_entries()]
+        assert len(logged) == len(set(logged))
+        assert sorted(logged + service.unread_ids()) == sorted(message_ids)
+        assert len(logged) >= 100
+        assert {entry['category'] for entry in bot.store.iter_entries()} >= {CATEGORY_LEGAL, CATEGORY_VENDOR}
+    
+    def test_benchmark_harness(self):
+        """Test that the offline benchmark runs and reports per-message costs"""
+        from tests.benchmark_process_inbox import run_benchmark
+        result = run_benchmark(messages=30, latency=0.0, concurrency=2, config={'fetch_batch_size': 10})
+        assert result['processed'] == result['logged'] == 30
+        assert result['round_trips_per_message'] < 0.5
+        assert result['p99_latency'] >= result['p50_latency'] >= 0.0
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Gmail Quota
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import random
+import pytest
+from unittest import mock
+from httplib2 import Response
+from googleapiclient.errors import HttpError
+from bots.gmail_quota import QuotaRateLimiter, is_retryable
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    return QuotaRateLimiter(clock=clock.time, sleep=clock.sleep, rng=random.Random(7), **kwargs)
+
+
+def _http_error(status, headers=None):
+    return HttpError(Response(dict(headers or {}, status=status)), b'{}')
+
+
+class TestQuotaRateLimiter:
+    """Test suite for the Gmail quota token bucket"""
+
+    def test_burst_then_rate(self):
+        """Test that calls beyond the burst wait for the bucket to refill"""
+        clock = FakeClock()
+        limiter = _limiter(clock, units_per_second=10, burst=20)
+        limiter.acquire(20)
+        assert clock.sleeps == []
+        limiter.acquire(5)
+        assert clock.sleeps == [0.5]
+        assert limiter.state()['waits'] == 1
+
+    def test_refill_is_capped(self):
+        """Test that idle time does not bank more than the burst"""
+        clock = FakeClock()
+        limiter = _limiter(clock, units_per_second=10, burst=20)
+        clock.now += 100
+        limiter.acquire(20)
+        limiter.acquire(10)
+        assert clock.sleeps == [1.0]
+
+    def test_execute_retries_with_backoff(self):
+        """Test jittered exponential backoff on retryable errors"""
+        clock = FakeClock()
+        limiter = _limiter(clock, units_per_second=1000, base_delay=1.0)
+        request = mock.MagicMock()
+        request.execute.side_effect = [_http_error(503), _http_error(500), {'ok': True}]
+        assert limiter.execute(request, 'messages.list') == {'ok': True}
+        assert len(clock.sleeps) == 2
+        assert 0.5 <= clock.sleeps[0] <= 1.0
+        assert 1.0 <= clock.sleeps[1] <= 2.0
+        assert limiter.state()['retries'] == 2
+
+    def test_execute_gives_up(self):
+        """Test that non-retryable errors and exhausted retries raise"""
+        clock = FakeClock()
+        limiter = _limiter(clock, max_retries=2)
+        request = mock.MagicMock()
+        request.execute.side_effect = _http_error(400)
+        with pytest.raises(HttpError):
+            limiter.execute(request, 'messages.get')
+        assert request.execute.call_count == 1
+
+        request.execute.side_effect = _http_error(500)
+        with pytest.raises(HttpError):
+            limiter.execute(request, 'messages.get')
+        assert request.execute.call_count == 1 + 3
+
+    def test_rate_limit_pauses_all_callers(self):
+        """Test that a 429 holds back the next acquire and honours Retry-After"""
+        clock = FakeClock()
+        limiter = _limiter(clock)
+        delay = limiter.backoff(0, _http_error(429, {'retry-after': '3'}))
+        assert delay == 3.0
+        state = limiter.state()
+        assert state['throttled'] and state['paused_for'] == 3.0
+        assert state['last_error_status'] == 429
+        limiter.acquire(1)
+        assert clock.sleeps == [3.0]
+        assert not limiter.state()['throttled']
+
+    def test_server_error_does_not_pause_others(self):
+        """Test that a 5xx only delays the request that failed"""
+        clock = FakeClock()
+        limiter = _limiter(clock)
+        limiter.backoff(0, _http_error(503))
+        limiter.acquire(1)
+        assert clock.sleeps == []
+
+    def test_is_retryable(self):
+        """Test which errors are retried"""
+        assert is_retryable(_http_error(429))
+        assert is_retryable(_http_error(502))
+        assert not is_retryable(_http_error(404))
+        assert not is_retryable(ValueError())
+        assert not is_retryable(None)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Gmail Sync
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import pytest
+from unittest import mock
+from httplib2 import Response
+from googleapiclient.errors import HttpError
+from bots.gmail_sync import HistoryExpired, SyncCheckpoint, list_added_message_ids
+
+
+def _added(*message_ids, labels=('INBOX', 'UNREAD')):
+    return {'messagesAdded': [{'message': {'id': m, 'labelIds': list(labels)}} for m in message_ids]}
+
+
+def _history_service(pages):
+    service = mock.MagicMock()
+    service.users.return_value.history.return_value.list.return_value.execute.side_effect = pages
+    return service
+
+
+class TestSyncCheckpoint:
+    """Test suite for the on-disk historyId checkpoint"""
+
+    def test_missing_checkpoint(self, tmp_path):
+        """Test that a missing file means no history and nothing to retry"""
+        checkpoint = SyncCheckpoint(str(tmp_path / 'sync.json'))
+        assert checkpoint.load() == {'history_id': None, 'retry': []}
+
+    def test_save_and_load(self, tmp_path):
+        """Test that the checkpoint round-trips through disk"""
+        checkpoint = SyncCheckpoint(str(tmp_path / 'sync.json'))
+        checkpoint.save(1234, ['m1'])
+        assert SyncCheckpoint(str(tmp_path / 'sync.json')).load() == {'history_id': '1234', 'retry': ['m1']}
+        checkpoint.clear()
+        assert checkpoint.load()['history_id'] is None
+
+    def test_corrupt_checkpoint(self, tmp_path):
+        """Test that an unreadable checkpoint forces a full sync"""
+        path = tmp_path / 'sync.json'
+        path.write_text('{not json')
+        assert SyncCheckpoint(str(path)).load()['history_id'] is None
+
+
+class TestListAddedMessageIds:
+    """Test suite for users.history.list paging"""
+
+    def test_follows_pages_and_dedupes(self):
+        """Test that every page is read and repeated IDs collapse"""
+        service = _history_service([
+            {'history': [_added('m1', 'm2')], 'historyId': '110', 'nextPageToken': 'p2'},
+            {'history': [_added('m2'), _added('m3', labels=('SENT',))], 'historyId': '120'}
+        ])
+        message_ids, history_id = list_added_message_ids(service, '100')
+        assert message_ids == ['m1', 'm2']
+        assert history_id == '120'
+        calls = service.users.return_value.history.return_value.list.call_args_list
+        assert [c.kwargs['pageToken'] for c in calls] == [None, 'p2']
+        assert calls[0].kwargs['startHistoryId'] == '100'
+
+    def test_no_changes(self):
+        """Test that a quiet mailbox keeps a usable checkpoint"""
+        service = _history_service([{'historyId': '100'}])
+        assert list_added_message_ids(service, '100') == ([], '100')
+
+    def test_expired_history(self):
+        """Test that a 404 is reported as an expired checkpoint"""
+        service = _history_service([HttpError(Response({'status': 404}), b'{}')])
+        with pytest.raises(HistoryExpired):
+            list_added_message_ids(service, '1')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the ENS Legis Incident ID Allocator
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import threading
+from datetime import datetime
+from multiprocessing import Pool
+from bots.incident_ids import IncidentIdAllocator
+
+DAY = datetime(2026, 1, 14, 18, 0, 0)
+
+
+def allocate_ids(counter_path):
+    allocator = IncidentIdAllocator(counter_path, block_size=5)
+    return [allocator.next_id(DAY) for _ in range(30)]
+
+
+class TestIncidentIdAllocator:
+    """Test suite for block-reserved incident IDs"""
+
+    def test_sequential_ids(self, tmp_path):
+        """Test IDs increase within a day and restart on the next day"""
+        allocator = IncidentIdAllocator(str(tmp_path / 'counter.json'), block_size=2)
+        ids = [allocator.next_id(DAY) for _ in range(3)]
+        assert ids == ['SL-2026-0114-001', 'SL-2026-0114-002', 'SL-2026-0114-003']
+        assert allocator.next_id(datetime(2026, 1, 15)) == 'SL-2026-0115-001'
+
+    def test_blocks_survive_restart(self, tmp_path):
+        """Test a new allocator continues after the previously reserved block"""
+        counter_path = str(tmp_path / 'counter.json')
+        first = IncidentIdAllocator(counter_path, block_size=10)
+        first.next_id(DAY)
+        second = IncidentIdAllocator(counter_path, block_size=10)
+        assert second.next_id(DAY) == 'SL-2026-0114-011'
+
+    def test_no_reuse_across_midnight(self, tmp_path):
+        """Test a process still on yesterday continues its sequence after another moved on"""
+        counter_path = str(tmp_path / 'counter.json')
+        late = IncidentIdAllocator(counter_path, block_size=2)
+        assert [late.next_id(DAY) for _ in range(2)] == ['SL-2026-0114-001', 'SL-2026-0114-002']
+        early = IncidentIdAllocator(counter_path, block_size=2)
+        assert early.next_id(datetime(2026, 1, 15)) == 'SL-2026-0115-001'
+        assert late.next_id(DAY) == 'SL-2026-0114-003'
+        assert early.next_id(datetime(2026, 1, 15)) == 'SL-2026-0115-002'
+
+    def test_unique_across_threads(self, tmp_path):
+        """Test concurrent threads never receive the same ID"""
+        allocator = IncidentIdAllocator(str(tmp_path / 'counter.json'), block_size=3)
+        ids = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(50):
+                incident_id = allocator.next_id(DAY)
+                with lock:
+                    ids.append(incident_id)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(ids)) == 400
+
+    def test_unique_across_processes(self, tmp_path):
+        """Test separate processes sharing a counter file never collide"""
+        counter_path = str(tmp_path / 'counter.json')
+        with Pool(4) as pool:
+            results = pool.map(allocate_ids, [counter_path] * 4)
+        ids = [incident_id for result in results for incident_id in result]
+        assert len(set(ids)) == 120
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Keyword Matcher
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+from bots.keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test suite for the Aho-Corasick keyword matcher"""
+
+    def test_reports_every_group_in_one_pass(self):
+        """Test that all matching groups are found, case-insensitively"""
+        matcher = KeywordMatcher({
+            'Legal': ['dispute', 'attorney'],
+            'Vendor': ['invoice', 'payment'],
+            'Supporter': ['patreon']
+        })
+        assert matcher.categories('Invoice DISPUTE from your attorney') == {'Legal', 'Vendor'}
+        assert matcher.categories('nothing to see') == frozenset()
+
+    def test_overlapping_keywords(self):
+        """Test keywords that are suffixes or overlaps of one another"""
+        matcher = KeywordMatcher({'A': ['she', 'hers'], 'B': ['he'], 'C': ['ushe']})
+        assert matcher.categories('ushers') == {'A', 'B', 'C'}
+        assert matcher.categories('hishe') == {'A', 'B'}
+
+    def test_first_uses_precedence(self):
+        """Test that the highest-precedence match wins regardless of position"""
+        matcher = KeywordMatcher({'Legal': ['fcra'], 'Vendor': ['billing']})
+        assert matcher.first('billing question re FCRA', ['Legal', 'Vendor']) == 'Legal'
+        assert matcher.first('billing question', ['Legal', 'Vendor']) == 'Vendor'
+        assert matcher.first('hello', ['Legal', 'Vendor']) is None
+
+    def test_thousands_of_keywords(self):
+        """Test that large keyword lists compile and match correctly"""
+        matcher = KeywordMatcher({
+            'Legal': [f'case{i:05d}' for i in range(5000)],
+            'Vendor': [f'order{i:05d}' for i in range(5000)]
+        })
+        assert matcher.categories('re: case04999 and order00000') == {'Legal', 'Vendor'}
+        assert matcher.categories('case5000x') == frozenset()
+
+    def test_incremental_scan(self):
+        """Test that keywords split across fed pieces are found, and early stop"""
+        matcher = KeywordMatcher({'Legal': ['credit report'], 'Vendor': ['invoice']})
+        scan = matcher.scan(stop_at='Legal')
+        assert not scan.feed('your inv')
+        assert not scan.feed('oice and cred')
+        assert scan.feed('it REPORT attached')
+        assert scan.found == {'Legal', 'Vendor'}
+        assert scan.feed('anything')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Processing Pipeline
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import random
+import threading
+import time
+import pytest
+from bots.pipeline import Stage, StagedExecutor
+
+
+class TestStagedExecutor:
+    """Test suite for the staged worker-pool executor"""
+
+    def test_outputs_keep_source_order(self):
+        """Test that parallel workers still release results in order"""
+        def slow_double(n):
+            time.sleep(random.random() / 200)
+            yield n * 2
+
+        executor = StagedExecutor([Stage('double', slow_double, workers=8),
+                                   Stage('inc', lambda n: [n + 1], workers=3)], queue_size=2)
+        assert executor.run(range(100)) == [n * 2 + 1 for n in range(100)]
+
+    def test_fan_out_and_drop(self):
+        """Test that a handler may emit several items or none"""
+        executor = StagedExecutor([Stage('split', lambda n: [n] * (n % 3), workers=2)])
+        assert executor.run(range(5)) == [1, 2, 2, 4]
+
+    def test_keyed_stage_serializes_each_key(self):
+        """Test that items sharing a key are handled one at a time, in order"""
+        seen = {}
+        active = set()
+        lock = threading.Lock()
+
+        def handle(item):
+            key, seq = item
+            with lock:
+                assert key not in active
+                active.add(key)
+            time.sleep(random.random() / 500)
+            seen.setdefault(key, []).append(seq)
+            with lock:
+                active.discard(key)
+            return ()
+
+        items = [(seq % 5, seq) for seq in range(200)]
+        StagedExecutor([Stage('handle', handle, workers=4, key=lambda item: item[0])]).run(items)
+        for key, seqs in seen.items():
+            assert seqs == sorted(seqs)
+        assert sum(len(seqs) for seqs in seen.values()) == 200
+
+    def test_workers_run_concurrently(self):
+        """Test that wall time shrinks with the worker count"""
+        def wait(n):
+            time.sleep(0.02)
+            yield n
+
+        start = time.monotonic()
+        StagedExecutor([Stage('wait', wait, workers=10)]).run(range(20))
+        assert time.monotonic() - start < 0.2
+
+    def test_handler_errors_are_recorded(self):
+        """Test that a failing item is dropped without stopping the run"""
+        def handle(n):
+            if n == 3:
+                raise ValueError('bad item')
+            yield n
+
+        executor = StagedExecutor([Stage('check', handle, workers=2)])
+        assert executor.run(range(5)) == [0, 1, 2, 4]
+        assert [(name, item) for name, item, _ in executor.errors] == [('check', 3)]
+
+    def test_source_error_drains_and_propagates(self):
+        """Test that items queued before a source failure are still handled"""
+        handled = []
+
+        def source():
+            yield 1
+            yield 2
+            raise RuntimeError('listing failed')
+
+        executor = StagedExecutor([Stage('record', lambda n: handled.append(n) or (), workers=2)])
+        with pytest.raises(RuntimeError):
+            executor.run(source())
+        assert sorted(handled) == [1, 2]
+
+    def test_worker_init_runs_per_thread(self):
+        """Test that worker_init is called once in every worker thread"""
+        names = []
+        executor = StagedExecutor([Stage('a', lambda n: [n], workers=3), Stage('b', lambda n: [n])],
+                                  worker_init=names.append)
+        executor.run(range(3))
+        assert sorted(names) == ['a', 'a', 'a', 'b']
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Poll Scheduler
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import threading
+from bots.poll_scheduler import (PollScheduler, WAKE_PROCESS_NOW, WAKE_PUSH,
+                                 WAKE_STOP, WAKE_TIMER)
+from tests.fake_gmail import FakeClock
+
+
+class TestPollScheduler:
+    """Test suite for the adaptive polling schedule"""
+
+    def test_backs_off_when_idle(self):
+        """Test that empty runs double the interval up to the maximum"""
+        scheduler = PollScheduler(min_interval=30, max_interval=300, clock=FakeClock())
+        intervals = []
+        for _ in range(5):
+            scheduler.record_run(0)
+            intervals.append(scheduler.interval)
+        assert intervals == [60, 120, 240, 300, 300]
+
+    def test_speeds_up_when_mail_arrives(self):
+        """Test that a run finding mail resets to the minimum interval"""
+        clock = FakeClock()
+        scheduler = PollScheduler(min_interval=30, max_interval=300, clock=clock)
+        scheduler.record_run(0)
+        scheduler.record_run(0)
+        scheduler.record_run(3)
+        assert scheduler.interval == 30
+        assert scheduler.state()['next_run_in'] == 30
+
+    def test_errors_back_off_from_error_interval(self):
+        """Test error backoff and that a good run clears it"""
+        scheduler = PollScheduler(min_interval=30, max_interval=300, error_interval=60,
+                                  clock=FakeClock())
+        scheduler.record_error()
+        assert scheduler.interval == 60
+        scheduler.record_error()
+        scheduler.record_error()
+        assert scheduler.interval == 240
+        assert scheduler.state()['consecutive_errors'] == 3
+        scheduler.record_run(1)
+        assert scheduler.interval == 30
+        assert scheduler.consecutive_errors == 0
+
+    def test_wait_returns_when_due(self):
+        """Test that wait does not block once the next run is due"""
+        clock = FakeClock()
+        scheduler = PollScheduler(min_interval=30, clock=clock)
+        scheduler.record_run(1)
+        clock.now += 30
+        assert scheduler.wait() == WAKE_TIMER
+
+    def test_wake_interrupts_wait(self):
+        """Test that a wake-up from another thread ends a long wait"""
+        scheduler = PollScheduler(min_interval=3600, max_interval=3600)
+        scheduler.record_run(1)
+        reasons = []
+        waiter = threading.Thread(target=lambda: reasons.append(scheduler.wait()))
+        waiter.start()
+        scheduler.wake(WAKE_PUSH)
+        waiter.join(timeout=5)
+        assert not waiter.is_alive()
+        assert reasons == [WAKE_PUSH]
+        assert scheduler.state()['last_reason'] == WAKE_PUSH
+
+    def test_stop_is_not_overridden(self):
+        """Test that a later wake-up cannot replace a pending stop"""
+        scheduler = PollScheduler(clock=FakeClock())
+        scheduler.wake(WAKE_STOP)
+        scheduler.wake(WAKE_PROCESS_NOW)
+        assert scheduler.wait() == WAKE_STOP
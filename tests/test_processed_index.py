@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Processed Message Index
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+from bots.processed_index import BloomFilter, ProcessedMessageIndex
+
+
+class TestBloomFilter:
+    """Test suite for the Bloom filter front"""
+
+    def test_no_false_negatives(self):
+        """Test that every added item is reported present"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'msg-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Test that unseen items are rarely reported present"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'msg-{i}')
+        false_positives = sum(1 for i in range(10000) if f'other-{i}' in bloom)
+        assert false_positives < 300
+
+
+class TestProcessedMessageIndex:
+    """Test suite for the persistent processed-message index"""
+
+    def test_staged_records_visible_before_flush(self, tmp_path):
+        """Test that add() is visible at once but only persisted by flush()"""
+        path = str(tmp_path / 'processed.db')
+        index = ProcessedMessageIndex(path)
+        index.add('m1', 'abc123', 'SL-2026-0101-001', 'Legal')
+        assert 'm1' in index
+        assert 'm1' not in ProcessedMessageIndex(path)
+
+        index.flush()
+        reopened = ProcessedMessageIndex(path)
+        assert 'm1' in reopened
+        assert 'm2' not in reopened
+        record = reopened.lookup('m1')
+        assert record['evidence_hash'] == 'abc123'
+        assert record['incident_id'] == 'SL-2026-0101-001'
+        assert reopened.find_by_hash('abc123') == ['m1']
+
+    def test_refresh_sees_other_writers(self, tmp_path):
+        """Test that rows committed by another process reach the filter on refresh"""
+        path = str(tmp_path / 'processed.db')
+        reader = ProcessedMessageIndex(path)
+        assert 'm1' not in reader
+        writer = ProcessedMessageIndex(path)
+        writer.add('m1')
+        writer.flush()
+        assert 'm1' not in reader
+        reader.refresh()
+        assert 'm1' in reader
+
+    def test_filter_grows_with_index(self, tmp_path):
+        """Test that the filter is rebuilt larger once its capacity is exceeded"""
+        index = ProcessedMessageIndex(str(tmp_path / 'processed.db'))
+        index.refresh()
+        index._bloom = index._bloom.__class__(capacity=10)
+        for i in range(25):
+            index.add(f'm{i}')
+        index.flush()
+        assert index._bloom.capacity >= 50
+        assert all(f'm{i}' in index for i in range(25))
+        index.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Rule Set
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import pytest
+from bots.domain_index import DomainSuffixIndex
+from bots.rule_set import RuleSet, RuleSetLoader
+
+DEFAULTS = {
+    'keywords': {'Legal': ['fcra'], 'Vendor': ['invoice']},
+    'precedence': ['Legal', 'Media', 'Vendor'],
+    'templates': {'Legal': 'FCRA-Initial-Guidance'}
+}
+
+
+def _write(path, config):
+    path.write_text(json.dumps(config))
+    # Make sure the change is visible even on coarse-mtime filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _loader(tmp_path) -> RuleSetLoader:
+    media = tmp_path / 'media_list.csv'
+    media.write_text('cnn.com\n')
+    return RuleSetLoader(str(tmp_path / 'email_config.json'), str(media), DEFAULTS, 'Media', 'Unknown')
+
+
+class TestRuleSet:
+    """Test suite for compiled rules"""
+
+    def test_precedence(self):
+        """Test that the first applicable category in the precedence list wins"""
+        rules = RuleSet(DEFAULTS, DomainSuffixIndex(['cnn.com']), 'Media', 'Unknown')
+        assert rules.categorize('Invoice re FCRA', 'a@cnn.com') == 'Legal'
+        assert rules.categorize('Invoice', 'a@cnn.com') == 'Media'
+        assert rules.categorize('Invoice', 'a@b.com') == 'Vendor'
+        assert rules.categorize('Hello', 'a@b.com') == 'Unknown'
+
+    def test_rejects_malformed_rules(self):
+        """Test validation of the rules object"""
+        with pytest.raises(ValueError):
+            RuleSet({'keywords': {'Legal': 'fcra'}}, DomainSuffixIndex(), 'Media', 'Unknown')
+        with pytest.raises(ValueError):
+            RuleSet({'precedence': 'Legal'}, DomainSuffixIndex(), 'Media', 'Unknown')
+
+
+class TestRuleSetLoader:
+    """Test suite for hot reloading"""
+
+    def test_defaults_without_config(self, tmp_path):
+        """Test that a missing config file gives the default rules"""
+        loader = _loader(tmp_path)
+        assert loader.config == {}
+        assert loader.rules.categorize('FCRA', 'x@y.z') == 'Legal'
+        assert not loader.refresh()
+
+    def test_reload_on_change(self, tmp_path):
+        """Test that edited rules are compiled and swapped in once"""
+        loader = _loader(tmp_path)
+        old_rules = loader.rules
+        config_path = tmp_path / 'email_config.json'
+        _write(config_path, {'fetch_batch_size': 10,
+                             'rules': {'keywords': {'Legal': ['subpoena'], 'Vendor': ['invoice']}}})
+        assert loader.refresh()
+        assert loader.config['fetch_batch_size'] == 10
+        assert loader.rules.categorize('Subpoena', 'x@y.z') == 'Legal'
+        assert loader.rules.categorize('FCRA', 'x@y.z') == 'Unknown'
+        # Unchanged keys keep their defaults
+        assert loader.rules.templates == DEFAULTS['templates']
+        assert old_rules.categorize('FCRA', 'x@y.z') == 'Legal'
+        assert loader.rules.version != old_rules.version
+
+        # Same contents, new mtime: hashed, not recompiled
+        rules = loader.rules
+        _write(config_path, json.loads(config_path.read_text()))
+        assert not loader.refresh()
+        assert loader.rules is rules
+
+    def test_media_list_change_reloads(self, tmp_path):
+        """Test that editing the media list swaps in a new domain index"""
+        loader = _loader(tmp_path)
+        media = tmp_path / 'media_list.csv'
+        media.write_text('cnn.com\nnytimes.com\n')
+        assert loader.refresh()
+        assert loader.rules.categorize('Hi', 'a@nytimes.com') == 'Media'
+
+    def test_invalid_config_keeps_rules(self, tmp_path):
+        """Test that a broken config is ignored until fixed"""
+        loader = _loader(tmp_path)
+        rules = loader.rules
+        config_path = tmp_path / 'email_config.json'
+        config_path.write_text('{"rules": ')
+        assert not loader.refresh()
+        assert loader.rules is rules
+        _write(config_path, {'rules': {'keywords': {'Legal': []}}})
+        assert loader.refresh()
+        assert loader.rules.categorize('FCRA', 'x@y.z') == 'Unknown'
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for ENS Legis Surveillance Statistics
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import json
+import pytest
+from bots.surveillance_store import JsonlSurveillanceStore, SqliteSurveillanceStore
+from bots.surveillance_stats import SurveillanceStatistics
+
+
+def make_entry(n, category='Legal'):
+    return {
+        'incident_id': f'SL-2026-0114-{n:03d}',
+        'timestamp': f'2026-01-{14 + n % 2}T18:00:00Z',
+        'category': category
+    }
+
+
+class TestSurveillanceStatistics:
+    """Test suite for the incremental statistics aggregator"""
+
+    def test_counts_follow_appends(self, tmp_path):
+        """Test that counters update as entries are appended"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        stats = SurveillanceStatistics(store, str(tmp_path / 'stats.json'), recent_count=2)
+
+        store.append(make_entry(0))
+        store.append_many([make_entry(1, 'Media'), make_entry(2, 'Media')])
+
+        assert stats.total == 3
+        result = stats.statistics()
+        assert result['by_category'] == {'Legal': 1, 'Media': 2}
+        assert result['by_date'] == {'2026-01-14': 2, '2026-01-15': 1}
+        assert [e['incident_id'] for e in result['recent_activity']] == [
+            'SL-2026-0114-002', 'SL-2026-0114-001'
+        ]
+
+    @pytest.mark.parametrize('backend', ['jsonl', 'sqlite'])
+    def test_restart_replays_only_tail(self, tmp_path, backend):
+        """Test that a restart loads the snapshot and counts only newer entries"""
+        def open_store():
+            if backend == 'sqlite':
+                return SqliteSurveillanceStore(f"sqlite:///{tmp_path / 'log.db'}")
+            return JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+
+        store = open_store()
+        stats = SurveillanceStatistics(store, str(tmp_path / 'stats.json'))
+        store.append_many([make_entry(n) for n in range(5)])
+        stats.save()
+
+        # Written by another process after the snapshot
+        open_store().append_many([make_entry(n, 'Vendor') for n in range(5, 7)])
+
+        store = open_store()
+        replayed = []
+        original_iter_after = store.iter_after
+        store.iter_after = lambda key: (replayed.append(key) or original_iter_after(key))
+        stats = SurveillanceStatistics(store, str(tmp_path / 'stats.json'))
+
+        assert replayed[0] != -1
+        assert stats.statistics()['by_category'] == {'Legal': 5, 'Vendor': 2}
+
+    def test_snapshot_for_replaced_log_is_ignored(self, tmp_path):
+        """Test that a snapshot ahead of a truncated log triggers a rebuild"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        stats = SurveillanceStatistics(store, str(tmp_path / 'stats.json'))
+        store.append_many([make_entry(n) for n in range(5)])
+        stats.save()
+
+        (tmp_path / 'log.jsonl').write_text(json.dumps(make_entry(9, 'Media')) + '\n')
+
+        stats = SurveillanceStatistics(JsonlSurveillanceStore(str(tmp_path / 'log.jsonl')),
+                                       str(tmp_path / 'stats.json'))
+        assert stats.statistics()['by_category'] == {'Media': 1}
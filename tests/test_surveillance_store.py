@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Tests for the ENS Legis Surveillance Store
+
+Part of AI Clone OS - Incrimination Nation Campaign
+"""
+
+import os
+import json
+import stat
+import time
+import pytest
+from sqlalchemy import inspect
+from datetime import datetime
+from bots.surveillance_store import (BACKEND_JSONL, BACKEND_SEGMENTED, BACKEND_SQLITE, FSYNC_NEVER,
+                                     BufferedSurveillanceWriter, JsonlSurveillanceStore,
+                                     SegmentedSurveillanceStore,
+                                     SqliteSurveillanceStore, create_surveillance_store,
+                                     decode_cursor, encode_cursor)
+
+
+def make_entry(n, category='Legal', timestamp='2026-01-14T18:00:00Z'):
+    return {
+        'incident_id': f'SL-2026-0114-{n:03d}',
+        'timestamp': timestamp,
+        'category': category,
+        'details': {'subject': f'Subject {n}'}
+    }
+
+
+class TestJsonlSurveillanceStore:
+    """Test suite for the append-only JSONL store"""
+
+    def test_append_and_iterate(self, tmp_path):
+        """Test that entries are appended one per line and streamed in order"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        store.append(make_entry(1))
+        store.append_many([make_entry(2), make_entry(3)])
+
+        entries = list(store.iter_entries())
+        assert [e['incident_id'] for e in entries] == [
+            'SL-2026-0114-001', 'SL-2026-0114-002', 'SL-2026-0114-003'
+        ]
+        with open(tmp_path / 'log.jsonl') as f:
+            assert len(f.readlines()) == 3
+
+    def test_iterate_missing_file(self, tmp_path):
+        """Test reading a store that has never been written"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        assert list(store.iter_entries()) == []
+
+    def test_migrates_legacy_array(self, tmp_path):
+        """Test one-time migration from the legacy JSON array file"""
+        legacy_path = tmp_path / 'log.json'
+        with open(legacy_path, 'w') as f:
+            json.dump([make_entry(1), make_entry(2)], f, indent=2)
+
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'), legacy_path=str(legacy_path))
+        store.append(make_entry(3))
+
+        assert len(list(store.iter_entries())) == 3
+        assert not legacy_path.exists()
+        assert os.path.exists(str(legacy_path) + '.migrated')
+
+        # A second store instance must not migrate again
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'), legacy_path=str(legacy_path))
+        assert len(list(store.iter_entries())) == 3
+
+    def test_torn_trailing_line_is_skipped(self, tmp_path):
+        """Test that a partial write from a crash does not corrupt later appends"""
+        path = tmp_path / 'log.jsonl'
+        with open(path, 'w') as f:
+            f.write(json.dumps(make_entry(1)) + '\n')
+            f.write('{"incident_id": "SL-2026-01')
+
+        store = JsonlSurveillanceStore(str(path))
+        store.append(make_entry(2))
+
+        entries = list(store.iter_entries())
+        assert [e['incident_id'] for e in entries] == ['SL-2026-0114-001', 'SL-2026-0114-002']
+
+
+class TestSqliteSurveillanceStore:
+    """Test suite for the indexed SQLite store"""
+
+    def test_indexes_created(self, tmp_path):
+        """Test that category, timestamp and incident_id are indexed"""
+        store = SqliteSurveillanceStore(f"sqlite:///{tmp_path / 'log.db'}")
+        indexed = {
+            tuple(index['column_names'])
+            for index in inspect(store.engine).get_indexes('surveillance_log')
+        }
+        assert ('category', 'seq') in indexed
+        assert ('timestamp',) in indexed
+        assert ('incident_id',) in indexed
+
+    @pytest.mark.parametrize('backend', [BACKEND_JSONL, BACKEND_SQLITE, BACKEND_SEGMENTED])
+    def test_backends_agree(self, tmp_path, backend):
+        """Test that every backend answers queries and statistics identically"""
+        store = create_surveillance_store(backend, str(tmp_path / 'log.jsonl'))
+        store.append_many([
+            make_entry(n, category='Legal' if n % 3 == 0 else 'Vendor',
+                       timestamp=f'2026-01-{14 + n % 2}T18:00:00Z')
+            for n in range(12)
+        ])
+
+        logs = store.query(category='Legal', limit=2)
+        assert [log['incident_id'] for log in logs] == ['SL-2026-0114-009', 'SL-2026-0114-006']
+        assert len(store.query(limit=100)) == 12
+
+        stats = store.statistics(recent_count=3)
+        assert stats['total'] == 12
+        assert stats['by_category'] == {'Legal': 4, 'Vendor': 8}
+        assert stats['by_date'] == {'2026-01-14': 6, '2026-01-15': 6}
+        assert [log['incident_id'] for log in stats['recent_activity']] == [
+            'SL-2026-0114-011', 'SL-2026-0114-010', 'SL-2026-0114-009'
+        ]
+
+    @pytest.mark.parametrize('backend', [BACKEND_JSONL, BACKEND_SQLITE, BACKEND_SEGMENTED])
+    def test_cursor_pagination(self, tmp_path, backend):
+        """Test paging back with `before` and polling forward with `after`"""
+        store = create_surveillance_store(backend, str(tmp_path / 'log.jsonl'))
+        store.append_many([
+            make_entry(n, category='Legal' if n % 2 else 'Media') for n in range(20)
+        ])
+
+        seen = []
+        page = store.page(category='Legal', limit=3)
+        while page:
+            seen.extend(entry['incident_id'] for _, entry in page)
+            page = store.page(category='Legal', limit=3, before=page[-1][0])
+        assert seen == [f'SL-2026-0114-{n:03d}' for n in range(19, 0, -2)]
+
+        latest = store.last_key()
+        store.append_many([make_entry(20, 'Legal'), make_entry(21, 'Media'), make_entry(22, 'Legal')])
+        new = store.page(category='Legal', limit=10, after=latest)
+        assert [entry['incident_id'] for _, entry in new] == ['SL-2026-0114-022', 'SL-2026-0114-020']
+        assert store.page(limit=10, after=store.last_key()) == []
+
+    @pytest.mark.parametrize('backend', [BACKEND_JSONL, BACKEND_SQLITE, BACKEND_SEGMENTED])
+    def test_date_range_filter(self, tmp_path, backend):
+        """Test since (inclusive) and until (exclusive) timestamp bounds"""
+        store = create_surveillance_store(backend, str(tmp_path / 'log.jsonl'))
+        store.append_many([make_entry(n, timestamp=f'2026-01-{10 + n:02d}T12:00:00Z') for n in range(6)])
+
+        logs = store.page(since='2026-01-12', until='2026-01-14')
+        assert [entry['incident_id'] for _, entry in logs] == ['SL-2026-0114-003', 'SL-2026-0114-002']
+        logs = store.page(since='2026-01-12', until='2026-01-14', after=-1)
+        assert len(logs) == 2
+        exported = store.iter_filtered(category='Legal', since='2026-01-12', until='2026-01-14')
+        assert [entry['incident_id'] for entry in exported] == ['SL-2026-0114-002', 'SL-2026-0114-003']
+
+    def test_sqlite_imports_existing_log(self, tmp_path):
+        """Test that switching to sqlite keeps the history already in the JSONL log"""
+        path = str(tmp_path / 'log.jsonl')
+        JsonlSurveillanceStore(path).append_many([make_entry(n) for n in range(3)])
+        store = create_surveillance_store(BACKEND_SQLITE, path)
+        assert [entry['incident_id'] for entry in store.iter_entries()] == [
+            'SL-2026-0114-000', 'SL-2026-0114-001', 'SL-2026-0114-002']
+        assert os.path.exists(path + '.migrated')
+        assert create_surveillance_store(BACKEND_SQLITE, path).statistics()['total'] == 3
+
+    def test_unknown_backend(self, tmp_path):
+        """Test that an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            create_surveillance_store('csv', str(tmp_path / 'log.jsonl'))
+
+
+class TestCursors:
+    """Test suite for tail reads and opaque cursors"""
+
+    def test_reverse_read_across_blocks(self, tmp_path):
+        """Test reading lines backwards with blocks smaller than a line"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        store.append_many([make_entry(n) for n in range(5)])
+        with open(tmp_path / 'log.jsonl', 'ab') as f:
+            f.write(b'{"incident_id": "torn')
+
+        offsets = [offset for offset, _ in store._iter_lines_reversed(block_size=7)]
+        keys = [key for key, _ in store.iter_after(-1)]
+        assert offsets == list(reversed(keys))
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the encoded key and reject garbage"""
+        for key in (-1, 0, 123456789):
+            assert decode_cursor(encode_cursor(key)) == key
+        with pytest.raises(ValueError):
+            decode_cursor('not a cursor!')
+
+
+class TestBufferedSurveillanceWriter:
+    """Test suite for group-commit writes"""
+
+    def test_groups_writes(self, tmp_path):
+        """Test that a 500-entry run becomes a handful of appends"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        groups = []
+        original_write = store._write_entries
+        store._write_entries = lambda entries, fsync=False: (groups.append(len(entries)),
+                                                            original_write(entries, fsync))
+
+        with BufferedSurveillanceWriter(store, max_entries=200, max_delay=None) as writer:
+            for n in range(500):
+                writer.write(make_entry(n))
+
+        assert groups == [200, 200, 100]
+        assert len(list(store.iter_entries())) == 500
+
+    def test_time_threshold_flushes(self, tmp_path):
+        """Test that buffered entries are written once max_delay elapses"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        writer = BufferedSurveillanceWriter(store, max_entries=100, max_delay=0.05, fsync=FSYNC_NEVER)
+        writer.write(make_entry(1))
+        assert list(store.iter_entries()) == []
+
+        time.sleep(0.3)
+        assert len(list(store.iter_entries())) == 1
+        writer.close()
+
+    def test_failed_flush_keeps_entries(self, tmp_path):
+        """Test that entries survive a failed append and are written by the next flush"""
+        store = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        original_write = store._write_entries
+
+        def failing_write(entries, fsync=False):
+            raise OSError("disk full")
+
+        writer = BufferedSurveillanceWriter(store, max_entries=100, max_delay=None)
+        writer.write(make_entry(1))
+        store._write_entries = failing_write
+        with pytest.raises(OSError):
+            writer.flush()
+        writer.write(make_entry(2))
+
+        store._write_entries = original_write
+        writer.close()
+        assert [entry['incident_id'] for entry in store.iter_entries()] == [
+            'SL-2026-0114-001', 'SL-2026-0114-002']
+
+    def test_rejects_unknown_fsync_policy(self, tmp_path):
+        """Test that fsync policies are validated"""
+        with pytest.raises(ValueError):
+            BufferedSurveillanceWriter(JsonlSurveillanceStore(str(tmp_path / 'log.jsonl')), fsync='sometimes')
+
+
+class Clock:
+    """Settable clock for driving segment rollover"""
+
+    def __init__(self, day):
+        self.now = datetime(2026, 1, day, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+
+class TestSegmentedSurveillanceStore:
+    """Test suite for the daily-segmented store"""
+
+    def fill(self, store, clock):
+        for day in (14, 15, 16):
+            clock.now = datetime(2026, 1, day, 12, 0, 0)
+            store.append_many([
+                make_entry(n, category='Media' if day == 15 else 'Legal',
+                           timestamp=f'2026-01-{day}T12:00:{n:02d}Z')
+                for n in range(3)
+            ])
+
+    def test_rollover_seals_previous_segment(self, tmp_path):
+        """Test one segment per day with old segments sealed and compressed"""
+        clock = Clock(14)
+        store = SegmentedSurveillanceStore(str(tmp_path / 'log'), compress_sealed=True, clock=clock)
+        self.fill(store, clock)
+
+        segments = store.segments()
+        assert [s['day'] for s in segments] == ['2026-01-14', '2026-01-15', '2026-01-16']
+        assert [s['sealed'] for s in segments] == [True, True, False]
+        assert segments[0]['name'].endswith('.jsonl.gz')
+        assert segments[1]['by_category'] == {'Media': 3}
+        assert stat.S_IMODE(os.stat(tmp_path / 'log' / segments[0]['name']).st_mode) == 0o444
+
+        assert len(list(store.iter_entries())) == 9
+        keys = [key for key, _ in store.iter_after(-1)]
+        assert keys == sorted(keys)
+        assert store.last_key() == keys[-1]
+        assert store.statistics()['by_category'] == {'Legal': 6, 'Media': 3}
+
+    def test_filtered_queries_open_only_matching_segments(self, tmp_path):
+        """Test that the manifest prunes segments before any file is opened"""
+        clock = Clock(14)
+        store = SegmentedSurveillanceStore(str(tmp_path / 'log'), clock=clock)
+        self.fill(store, clock)
+
+        opened = []
+        original_open = store._open_segment
+        store._open_segment = lambda segment: (opened.append(segment['day']), original_open(segment))[1]
+
+        logs = store.page(category='Media', limit=10)
+        assert len(logs) == 3
+        assert opened == ['2026-01-15']
+
+        opened.clear()
+        logs = store.page(since='2026-01-16', limit=10)
+        assert len(logs) == 3
+        assert opened == ['2026-01-16']
+
+    def test_pages_across_segments(self, tmp_path):
+        """Test before-cursors continue into older (compressed) segments"""
+        clock = Clock(14)
+        store = SegmentedSurveillanceStore(str(tmp_path / 'log'), compress_sealed=True, clock=clock)
+        self.fill(store, clock)
+
+        seen = []
+        page = store.page(limit=2)
+        while page:
+            seen.extend(entry['timestamp'] for _, entry in page)
+            page = store.page(limit=2, before=page[-1][0])
+        assert seen == sorted(seen, reverse=True)
+        assert len(seen) == 9
+
+    def test_imports_flat_log_and_recovers_unsaved_tail(self, tmp_path):
+        """Test importing a flat JSONL log and counting lines missing from the manifest"""
+        flat = JsonlSurveillanceStore(str(tmp_path / 'log.jsonl'))
+        flat.append_many([
+            make_entry(n, timestamp=f'2026-01-{14 + n // 2}T12:00:00Z') for n in range(4)
+        ])
+
+        clock = Clock(15)
+        store = SegmentedSurveillanceStore(str(tmp_path / 'log'), legacy_path=str(tmp_path / 'log.jsonl'),
+                                           clock=clock)
+        assert [s['count'] for s in store.segments()] == [2, 2]
+        assert os.path.exists(str(tmp_path / 'log.jsonl') + '.migrated')
+
+        # Simulate a crash after the segment write but before the manifest save
+        active = store.segments()[-1]
+        with open(tmp_path / 'log' / active['name'], 'ab') as f:
+            f.write((json.dumps(make_entry(8)) + '\n').encode())
+        store.append(make_entry(9))
+
+        assert store.segments()[-1]['count'] == 4
+        assert store.statistics()['total'] == 6